@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+ForkMonkey CLI Startup Benchmark
+
+Runs each `cli.py` subcommand against a throwaway monkey with
+`python -X importtime` and reports wall time, total import time and the
+slowest top-level imports per command, so a heavy module creeping back
+into a fast command's import path shows up here. No network access needed.
+
+Usage:
+    python benchmarks/cli_startup.py --runs 5 --report startup.json
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import statistics
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+CLI = ROOT / "src" / "cli.py"
+
+# `visualize` and `share --copy` are left out: they open a browser / the clipboard
+DEFAULT_COMMANDS = [
+    "--help",
+    "show",
+    "history",
+    "streak",
+    "achievements",
+    "leaderboard",
+    "share",
+    "update-readme",
+    "evolve --strength 0.1",
+]
+
+
+def parse_importtime(stderr: str) -> Dict[str, int]:
+    """Cumulative microseconds of every top-level import in `-X importtime` output"""
+    top_level = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line.split(":", 1)[1].split("|")
+        # Nested imports are indented under the module that pulled them in
+        if name.startswith("  "):
+            continue
+        top_level[name.strip()] = int(cumulative_us)
+    return top_level
+
+
+def prepare_monkey(workdir: Path) -> None:
+    """A local monkey with DNA, history and a README, without touching GitHub"""
+    from src.genetics import GeneticsEngine
+    from src.storage import MonkeyStorage
+
+    storage = MonkeyStorage(data_dir=workdir / "monkey_data")
+    dna = GeneticsEngine.generate_random_dna()
+    storage.save_dna_locally(dna)
+    storage.save_stats(dna, age_days=0)
+    storage.save_history_entry(dna, "Your monkey was born!")
+    shutil.copy(ROOT / "README.md", workdir / "README.md")
+
+
+def time_command(command: str, workdir: Path, runs: int) -> dict:
+    """Median wall and import time of one subcommand"""
+    env = {**os.environ, "GITHUB_TOKEN": "", "AI_PROVIDER": "rules", "PYTHONDONTWRITEBYTECODE": "1"}
+    walls, imports = [], []
+    top_level: Dict[str, int] = {}
+
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", str(CLI), *command.split()],
+            cwd=workdir, env=env, capture_output=True, text=True,
+        )
+        walls.append(time.perf_counter() - start)
+        if proc.returncode != 0:
+            raise RuntimeError(f"`{command}` failed:\n{proc.stderr[-2000:]}")
+
+        top_level = parse_importtime(proc.stderr)
+        imports.append(sum(top_level.values()) / 1e6)
+
+    slowest = sorted(top_level.items(), key=lambda item: item[1], reverse=True)[:3]
+    return {
+        "command": command,
+        "wall_seconds": round(statistics.median(walls), 4),
+        "import_seconds": round(statistics.median(imports), 4),
+        "slowest_imports": {name: round(us / 1e6, 4) for name, us in slowest},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CLI startup per subcommand")
+    parser.add_argument("commands", nargs="*", help="Subcommands to time (default: every command that runs offline, including evolve and update-readme in the throwaway monkey dir)")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per command (median is reported)")
+    parser.add_argument("--report", type=Path, help="Write the JSON results here")
+    args = parser.parse_args()
+
+    commands: List[str] = args.commands or DEFAULT_COMMANDS
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        prepare_monkey(workdir)
+        for command in commands:
+            rows.append(time_command(command, workdir, args.runs))
+
+    print(f"\n📊 CLI startup, median of {args.runs} runs")
+    print(f"{'command':<24}{'wall s':>9}{'import s':>10}  slowest imports")
+    for row in rows:
+        slowest = ", ".join(f"{name} {seconds:.3f}" for name, seconds in row["slowest_imports"].items())
+        print(f"{row['command']:<24}{row['wall_seconds']:>9.3f}{row['import_seconds']:>10.3f}  {slowest}")
+
+    if args.report:
+        args.report.write_text(json.dumps(rows, indent=2))
+        print(f"✅ Report written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+ForkMonkey Evolution Throughput Benchmark
+
+Compares per-monkey AI evolution (one decision + story call per monkey)
+with batched evolution against a local fake provider that simulates
+network latency. No API keys or network access needed.
+
+Usage:
+    python benchmarks/evolution_throughput.py --monkeys 100 --latency 0.3
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.genetics import GeneticsEngine
+from src.evolution import AIProvider, EvolutionAgent, DEFAULT_BATCH_SIZE
+
+
+class FakeLatencyProvider(AIProvider):
+    """Answers every prompt with a valid decision after a simulated round-trip"""
+
+    def __init__(self, latency: float, per_token: float):
+        self.latency = latency
+        self.per_token = per_token
+        self.calls = 0
+
+    def generate_response(self, prompt: str, max_tokens: int = 1024) -> str:
+        self.calls += 1
+        if "Monkeys (id: traits):" in prompt:
+            ids = prompt.split("Monkeys (id: traits):\n", 1)[1].split("\n\n", 1)[0].splitlines()
+            body = json.dumps({"m": [
+                {"id": i, "c": ["s1"], "s": "Your monkey sparkles!"} for i in range(len(ids))
+            ]})
+        elif "Reply with JSON only" in prompt:
+            body = json.dumps({"c": ["s1"], "s": "Your monkey sparkles!"})
+        else:
+            body = "Your monkey found a sparkly new look today!"
+
+        # Output tokens dominate generation time; ~4 characters per token
+        time.sleep(self.latency + self.per_token * len(body) / 4)
+        return body
+
+    def name(self) -> str:
+        return "Fake"
+
+
+def run_sequential(agent: EvolutionAgent, monkeys) -> None:
+    """Per-monkey flow used by `cli.py evolve --ai`"""
+    for dna in monkeys:
+        agent.evolve_with_story(dna)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched AI evolution")
+    parser.add_argument("--monkeys", type=int, default=50, help="Fleet size")
+    parser.add_argument("--latency", type=float, default=0.3, help="Simulated round-trip seconds")
+    parser.add_argument("--per-token", type=float, default=0.0005, help="Simulated seconds per output token")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Monkeys per request")
+    args = parser.parse_args()
+
+    monkeys = [GeneticsEngine.generate_random_dna() for _ in range(args.monkeys)]
+    rows = []
+
+    for label, run in [
+        ("sequential", lambda agent: run_sequential(agent, monkeys)),
+        ("batched", lambda agent: agent.evolve_batch(monkeys, batch_size=args.batch_size)),
+    ]:
+        provider = FakeLatencyProvider(args.latency, args.per_token)
+        agent = EvolutionAgent(provider=provider)
+        start = time.perf_counter()
+        run(agent)
+        elapsed = time.perf_counter() - start
+        usage = agent.usage_summary()
+        rows.append((label, provider.calls, usage["prompt_tokens"] + usage["completion_tokens"],
+                     elapsed, args.monkeys / elapsed))
+
+    print(f"\n📊 {args.monkeys} monkeys, {args.latency:.2f}s latency, batch size {args.batch_size}")
+    print(f"{'mode':<12}{'calls':>8}{'~tokens':>10}{'seconds':>10}{'monkeys/s':>12}")
+    for label, calls, tokens, elapsed, rate in rows:
+        print(f"{label:<12}{calls:>8}{tokens:>10}{elapsed:>10.2f}{rate:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+ForkMonkey Backend Load Test
+
+Runs the Flask API against a mocked GitHub (every call answers after a fixed
+delay) and drives it with simulated adoption-form users: each one types a
+username (one validation request per keystroke), starts a trustless
+adoption and polls its job until it finishes. Reports p50/p99 latency per
+request kind and end-to-end adoption time, to size workers and threads.
+
+By default the app runs in-process on a threaded Werkzeug server.
+`--gunicorn` runs it under gunicorn.conf.py with the given workers and
+threads, then stops it with SIGTERM and reports how long the drain took.
+No network access needed.
+
+Usage:
+    python benchmarks/server_load.py --clients 32 --latency 0.2
+    python benchmarks/server_load.py --gunicorn --workers 2 --threads 8
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import signal
+import argparse
+import tempfile
+import threading
+import subprocess
+import http.client
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).parent.parent
+SERVER = ROOT / "server"
+sys.path.insert(0, str(SERVER))
+
+from web_load import percentile
+
+STEPS = ["validating", "forking", "enabling_actions", "enabling_pages",
+         "triggering_workflow", "adding_collaborator"]
+
+
+def fake_app():
+    """The Flask app with GitHub replaced by fixed-latency fakes (also a gunicorn factory)."""
+    os.environ.setdefault("GITHUB_TOKEN", "load-test")
+    latency = float(os.getenv("FAKE_GITHUB_LATENCY", 0.2))
+
+    import app as app_module
+    from github_service import GitHubService
+
+    def lookup_user(self, username):
+        time.sleep(latency)
+        return {"valid": True, "login": username, "name": None, "avatar_url": None}
+
+    def full_setup_for_trustless(self, username, customization=None, progress=None):
+        for step in STEPS:
+            if progress:
+                progress(step)
+            time.sleep(latency)
+        return {"success": True, "repo_name": f"forkMonkey-{username}"}
+
+    GitHubService._lookup_user = lookup_user
+    GitHubService.full_setup_for_trustless = full_setup_for_trustless
+    return app_module.app
+
+
+def start_in_process():
+    """Threaded Werkzeug server on a free port; returns (port, stop)."""
+    from werkzeug.serving import make_server
+
+    server = make_server("127.0.0.1", 0, fake_app(), threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server.server_port, server.shutdown
+
+
+def start_gunicorn(port: int, workers: int, threads: int, store_dir: str):
+    """gunicorn with the production config; returns the process once it answers."""
+    env = {**os.environ, "PYTHONPATH": str(Path(__file__).parent), "JOB_STORE_DIR": store_dir,
+           "WEB_CONCURRENCY": str(workers), "GUNICORN_THREADS": str(threads)}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--bind", f"127.0.0.1:{port}",
+         "--access-logfile", "/dev/null", "server_load:fake_app()"],
+        cwd=SERVER, env=env,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/api/health")
+            if conn.getresponse().status == 200:
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("gunicorn did not start")
+
+
+def request(conn, method: str, path: str, headers: Dict[str, str], body=None):
+    payload = json.dumps(body) if body is not None else None
+    if payload:
+        headers = {**headers, "Content-Type": "application/json"}
+    conn.request(method, path, body=payload, headers=headers)
+    response = conn.getresponse()
+    data = response.read()
+    return response.status, json.loads(data) if data else {}
+
+
+def user(port: int, sessions: int, names: List[str], poll_interval: float, seed: int,
+         latencies: Dict[str, List[float]]):
+    """One adoption-form user on their own connection and IP."""
+    rng = random.Random(seed)
+    headers = {"X-Forwarded-For": f"10.0.{seed // 256}.{seed % 256}"}
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+
+    def timed(kind, method, path, body=None):
+        start = time.perf_counter()
+        try:
+            status, data = request(conn, method, path, headers, body)
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            status, data = 0, {}
+        if status == 0 or status >= 500:
+            kind = "error"
+        elif status == 429:
+            kind = "limited"
+        latencies[kind].append(time.perf_counter() - start)
+        return status, data
+
+    for _ in range(sessions):
+        name = rng.choice(names)
+        for end in range(3, len(name) + 1):
+            timed("validate", "GET", f"/api/validate/username?username={name[:end]}")
+
+        started = time.perf_counter()
+        status, data = timed("adopt", "POST", "/api/adopt/trustless", {"github_username": name})
+        if status != 202:
+            continue
+        while True:
+            time.sleep(poll_interval)
+            status, job = timed("poll", "GET", data["status_url"])
+            if status != 200 or job.get("status") in ("succeeded", "failed"):
+                break
+        latencies["adoption"].append(time.perf_counter() - started)
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the adoption API against a mocked GitHub")
+    parser.add_argument("--clients", type=int, default=32, help="Concurrent users")
+    parser.add_argument("--sessions", type=int, default=3, help="Adoptions per user")
+    parser.add_argument("--users", type=int, default=50, help="Distinct usernames typed")
+    parser.add_argument("--latency", type=float, default=0.2, help="Simulated seconds per GitHub call")
+    parser.add_argument("--poll-interval", type=float, default=0.5, help="Seconds between job polls")
+    parser.add_argument("--job-workers", type=int, default=4, help="Adoption job threads per server process")
+    parser.add_argument("--gunicorn", action="store_true", help="Serve with gunicorn.conf.py instead of in-process")
+    parser.add_argument("--workers", type=int, default=1, help="gunicorn worker processes")
+    parser.add_argument("--threads", type=int, default=8, help="gunicorn threads per worker")
+    parser.add_argument("--port", type=int, default=18080, help="gunicorn port")
+    args = parser.parse_args()
+
+    os.environ["FAKE_GITHUB_LATENCY"] = str(args.latency)
+    os.environ["JOB_WORKERS"] = str(args.job_workers)
+    store_dir = tempfile.mkdtemp(prefix="forkmonkey-jobs-")
+    if args.gunicorn:
+        process = start_gunicorn(args.port, args.workers, args.threads, store_dir)
+        port = args.port
+    else:
+        port, stop = start_in_process()
+
+    names = [f"monkeyfan{i:03d}" for i in range(args.users)]
+    latencies: Dict[str, List[float]] = {"validate": [], "adopt": [], "poll": [], "adoption": [], "limited": [], "error": []}
+    threads = [
+        threading.Thread(target=user, args=(port, args.sessions, names, args.poll_interval, seed, latencies))
+        for seed in range(args.clients)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    mode = f"gunicorn {args.workers}×{args.threads}" if args.gunicorn else "in-process threaded"
+    mode += f", {args.job_workers} job workers"
+    print(f"\n📊 {args.clients} users × {args.sessions} adoptions, {args.latency * 1000:.0f} ms GitHub latency, {mode}")
+    print(f"{'kind':<10}{'count':>8}{'p50 ms':>10}{'p99 ms':>10}")
+    for kind, values in latencies.items():
+        if values:
+            print(f"{kind:<10}{len(values):>8}{percentile(values, 50) * 1000:>10.1f}"
+                  f"{percentile(values, 99) * 1000:>10.1f}")
+    requests = sum(len(values) for kind, values in latencies.items() if kind != "adoption")
+    print(f"\n{requests / elapsed:.1f} requests/s over {elapsed:.2f}s")
+
+    if args.gunicorn:
+        # Start one more adoption so the shutdown has a job to drain
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        request(conn, "POST", "/api/adopt/trustless", {}, {"github_username": "lastmonkey"})
+        conn.close()
+        stopping = time.perf_counter()
+        process.send_signal(signal.SIGTERM)
+        process.wait()
+        print(f"🛑 gunicorn drained and stopped in {time.perf_counter() - stopping:.2f}s")
+    else:
+        stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+ForkMonkey Web Server Load Test
+
+Starts web/serve.py on a free port with live /api/forks crawls answering
+after a simulated GitHub delay, then drives it with concurrent keep-alive
+clients mixing static assets, indexed /api/forks queries and live crawls. Reports p50/p99 latency per kind of
+request. `--single` runs the same load against the old one-request-at-a-time
+socketserver.TCPServer for comparison. No network access needed.
+
+Usage:
+    python benchmarks/web_load.py --clients 16 --requests 50 --api-share 0.1
+"""
+
+import sys
+import time
+import random
+import argparse
+import http.client
+import socketserver
+import statistics
+import threading
+from functools import partial
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from web import serve
+
+STATIC_PATHS = ["/web/index.html", "/web/style.css", "/web/script.js", "/web/leaderboard.json"]
+INDEX_PATHS = ["/api/forks?limit=20", "/api/forks?sort=generation&degree=1", "/api/forks?min_score=30&offset=10"]
+
+
+class SlowForksHandler(serve.MyHTTPRequestHandler):
+    """Serves /api/forks?live=1 after a delay standing in for the GitHub round-trips"""
+    api_latency = 0.5
+
+    def forks_payload(self, cursor=None):
+        time.sleep(self.api_latency)
+        return {"forks": self._get_dummy_forks()}
+
+    def log_message(self, format, *args):
+        pass
+
+
+class LegacyHandler(SlowForksHandler):
+    # The old server closed the connection after every response
+    protocol_version = "HTTP/1.0"
+
+
+def start_server(single: bool, api_workers: int):
+    """Server on a free port, running in a background thread"""
+    if single:
+        server = socketserver.TCPServer(("127.0.0.1", 0), partial(LegacyHandler, directory=str(ROOT)))
+    else:
+        server = serve.make_server(0, ROOT, handler=SlowForksHandler, api_workers=api_workers)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def client(port: int, requests: int, api_share: float, index_share: float, seed: int,
+           latencies: Dict[str, List[float]]):
+    """One browser-like client reusing its connection where the server allows it"""
+    rng = random.Random(seed)
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    for _ in range(requests):
+        roll = rng.random()
+        if roll < api_share:
+            kind, path = "live", "/api/forks?live=1"
+        elif roll < api_share + index_share:
+            kind, path = "index", rng.choice(INDEX_PATHS)
+        else:
+            kind, path = "static", rng.choice(STATIC_PATHS)
+        start = time.perf_counter()
+        try:
+            conn.request("GET", path)
+            response = conn.getresponse()
+            response.read()
+            if response.will_close:
+                conn.close()
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            kind = "error"
+        latencies[kind].append(time.perf_counter() - start)
+    conn.close()
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[int(pct) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test web/serve.py with mixed static and API traffic")
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent clients")
+    parser.add_argument("--requests", type=int, default=50, help="Requests per client")
+    parser.add_argument("--api-share", type=float, default=0.1, help="Fraction of requests crawling live")
+    parser.add_argument("--index-share", type=float, default=0.2, help="Fraction of indexed /api/forks queries")
+    parser.add_argument("--api-latency", type=float, default=0.5, help="Simulated seconds per live crawl")
+    parser.add_argument("--api-workers", type=int, default=serve.API_WORKERS, help="Server API pool size")
+    parser.add_argument("--single", action="store_true", help="Use the old single-threaded TCPServer")
+    args = parser.parse_args()
+
+    SlowForksHandler.api_latency = args.api_latency
+    server = start_server(args.single, args.api_workers)
+    port = server.server_address[1]
+
+    latencies: Dict[str, List[float]] = {"static": [], "index": [], "live": [], "error": []}
+    threads = [
+        threading.Thread(target=client, args=(port, args.requests, args.api_share, args.index_share, seed, latencies))
+        for seed in range(args.clients)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    server.shutdown()
+    server.server_close()
+
+    total = sum(len(values) for values in latencies.values())
+    mode = "single-threaded TCPServer" if args.single else f"threaded, {args.api_workers} API workers"
+    print(f"\n📊 {args.clients} clients × {args.requests} requests, {args.api_share:.0%} live, {args.index_share:.0%} index, {mode}")
+    print(f"{'kind':<8}{'count':>8}{'p50 ms':>10}{'p99 ms':>10}")
+    for kind, values in latencies.items():
+        if values:
+            print(f"{kind:<8}{len(values):>8}{percentile(values, 50) * 1000:>10.1f}"
+                  f"{percentile(values, 99) * 1000:>10.1f}")
+    print(f"\n{total / elapsed:.1f} requests/s over {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
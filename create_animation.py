@@ -1,54 +1,65 @@
-import os
-import glob
+import sys
+import argparse
 from pathlib import Path
-from PIL import Image
-import io
-import subprocess
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.raster import RasterExporter
+from src.archive import SnapshotArchive
+from src.animation import ANIMATION_FORMATS, DEFAULT_DURATION, FrameStore, encode_animation
 
 EVOLUTION_DIR = "monkey_evolution"
 OUTPUT_FILE = "monkey_evolution/evolution.gif"
-DURATION = 500  # ms between frames
+FRAME_MANIFEST = ".raster_cache/frames.json"
+DURATION = DEFAULT_DURATION  # ms between frames
 
-def create_animation():
-    svg_files = sorted(glob.glob(os.path.join(EVOLUTION_DIR, "*_monkey*.svg")))
-    
-    if not svg_files:
+def create_animation(fmt="gif", output=None, dedupe=False, rebuild=False, size=None):
+    # Snapshots may be loose SVGs or compact archive records
+    archive = SnapshotArchive(EVOLUTION_DIR)
+    names = archive.names()
+
+    if not names:
         print("No SVG files found in monkey_evolution/")
         return
 
-    print(f"Found {len(svg_files)} evolution steps.")
-    
-    frames = []
-    for svg_path in svg_files:
-        print(f"Processing {os.path.basename(svg_path)}...")
-        try:
-            # Use rsvg-convert CLI to convert SVG to PNG
-            result = subprocess.run(
-                ["rsvg-convert", svg_path], 
-                capture_output=True, 
-                check=True
-            )
-            png_data = result.stdout
-            img = Image.open(io.BytesIO(png_data))
-            frames.append(img)
-        except subprocess.CalledProcessError as e:
-            print(f"rsvg-convert failed for {svg_path}: {e}")
-        except Exception as e:
-            print(f"Error processing {svg_path}: {e}")
-
-    if frames:
-        print(f"Generating GIF with {len(frames)} frames...")
-        # Save as GIF
-        frames[0].save(
-            OUTPUT_FILE,
-            save_all=True,
-            append_images=frames[1:],
-            duration=DURATION,
-            loop=0
-        )
-        print(f"✅ Animation saved to {OUTPUT_FILE}")
-    else:
+    print(f"Found {len(names)} evolution steps.")
+
+    # Only snapshots missing from the frame store get rasterized
+    store = FrameStore(FRAME_MANIFEST, exporter=RasterExporter(), size=size)
+    if rebuild:
+        store.reset()
+    known = {entry["source"] for entry in store.entries}
+    added = store.sync(
+        [(name, archive.materialize(name)) for name in names if name not in known],
+        duration=DURATION,
+    )
+    store.save()
+    print(f"Appended {added} new frames ({len(store.entries)} total).")
+
+    frames = store.frames(dedupe=dedupe)
+    if not frames:
         print("No valid frames generated.")
+        return
+
+    output = output or str(Path(OUTPUT_FILE).with_suffix(f".{fmt}"))
+    print(f"Encoding {fmt.upper()} with {len(frames)} frames...")
+    encode_animation(frames, output, fmt=fmt)
+    print(f"✅ Animation saved to {output}")
 
 if __name__ == "__main__":
-    create_animation()
+    parser = argparse.ArgumentParser(description="Build the monkey evolution animation")
+    parser.add_argument("--format", choices=ANIMATION_FORMATS, default="gif", help="Output format")
+    parser.add_argument("--output", help="Output file (default: monkey_evolution/evolution.<format>)")
+    parser.add_argument("--dedupe", action="store_true", help="Merge identical consecutive frames")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild the frame store from scratch")
+    parser.add_argument("--size", type=int, help="Frame size in pixels (default: native)")
+    args = parser.parse_args()
+
+    create_animation(
+        fmt=args.format,
+        output=args.output,
+        dedupe=args.dedupe,
+        rebuild=args.rebuild,
+        size=args.size,
+    )
@@ -2,111 +2,288 @@
 """
 Regenerate missing SVG files from history.json entries.
 Uses stored trait data to recreate the visual appearance.
+
+Renders fan out across a process pool, entries with identical render
+inputs (traits, seed, generation) are rendered once, and a manifest of
+finished files lets an interrupted run resume where it stopped. The
+manifest is removed once a run finishes, so the next run checks everything.
+
+Usage:
+    python regenerate_svgs.py             # write missing SVGs
+    python regenerate_svgs.py --verify    # re-render and compare with existing files
+    python regenerate_svgs.py --dry-run   # report what would be created or changed
 """
 
+import os
+import sys
 import json
+import difflib
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-import sys
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from src.genetics import MonkeyDNA, Trait, TraitCategory, Rarity, GeneticsEngine
+from src.genetics import MonkeyDNA, GeneticsEngine
 from src.visualizer import MonkeyVisualizer
+from src.archive import INDEX_FILE, SnapshotArchive
 
 
-def find_rarity_for_trait(category: TraitCategory, value: str) -> Rarity:
-    """Look up the rarity for a trait value by searching TRAIT_POOL."""
-    trait_pool = GeneticsEngine.TRAIT_POOL.get(category, {})
-    
-    for rarity, values in trait_pool.items():
-        if value in values:
-            return rarity
-    
-    # Default to common if not found
-    return Rarity.COMMON
+HISTORY_FILE = Path("monkey_data/history.json")
+EVOLUTION_DIR = Path("monkey_evolution")
+MANIFEST_FILE = Path(".regenerate_manifest.json")
+MANIFEST_FLUSH_EVERY = 25
+
+RenderKey = Tuple[Tuple[Tuple[str, str], ...], str, int]
 
 
 def create_dna_from_traits(traits_dict: dict, entry: dict) -> MonkeyDNA:
     """Create a MonkeyDNA object from a history entry's trait data."""
-    
-    category_map = {
-        "body_color": TraitCategory.BODY_COLOR,
-        "face_expression": TraitCategory.FACE_EXPRESSION,
-        "accessory": TraitCategory.ACCESSORY,
-        "pattern": TraitCategory.PATTERN,
-        "background": TraitCategory.BACKGROUND,
-        "special": TraitCategory.SPECIAL,
-    }
-    
-    traits = {}
-    for trait_key, trait_value in traits_dict.items():
-        if trait_key in category_map:
-            category = category_map[trait_key]
-            rarity = find_rarity_for_trait(category, trait_value)
-            traits[category] = Trait(
-                category=category,
-                value=trait_value,
-                rarity=rarity,
-                gene_sequence=f"regen_{trait_value}"
-            )
-    
-    return MonkeyDNA(
+    return GeneticsEngine.dna_from_traits(
+        traits_dict,
         generation=entry.get("generation", 1),
-        parent_id=None,
-        traits=traits,
         mutation_count=entry.get("mutation_count", 0),
-        birth_timestamp=0,
         dna_hash=entry.get("dna_hash", "")
     )
 
 
-def main():
-    history_file = Path("monkey_data/history.json")
-    evolution_dir = Path("monkey_evolution")
-    evolution_dir.mkdir(exist_ok=True)
-    
-    with open(history_file) as f:
-        history = json.load(f)
-    
-    regenerated = 0
-    skipped = 0
-    
-    for entry in history["entries"]:
+def render_key(entry: dict) -> RenderKey:
+    """Everything the visualizer output depends on for a history entry"""
+    return (
+        tuple(sorted(entry["traits"].items())),
+        entry.get("dna_hash", ""),
+        entry.get("generation", 1),
+    )
+
+
+def render_entry(key: RenderKey) -> str:
+    """Render one distinct key (process pool entry point)"""
+    traits, dna_hash, generation = key
+    dna = create_dna_from_traits(dict(traits), {"generation": generation, "dna_hash": dna_hash})
+    return MonkeyVisualizer.generate_svg(dna)
+
+
+def render_chunk(keys: List[RenderKey]) -> List[str]:
+    """Render a chunk of keys (process pool entry point)"""
+    return [render_entry(key) for key in keys]
+
+
+def sha256(data: str) -> str:
+    """Hash SVG markup"""
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def renderer_signature() -> str:
+    """Hash of the renderer source; a changed visualizer invalidates the manifest"""
+    digest = hashlib.sha256()
+    for module in ("visualizer.py", "genetics.py"):
+        digest.update((Path(__file__).parent / "src" / module).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+class Manifest:
+    """Resume state: filename -> hash of the SVG rendered for it"""
+
+    def __init__(self, path: Path, signature: str):
+        self.path = path
+        self.signature = signature
+        self.done: Dict[str, str] = {}
+        self._pending = 0
+        if path.exists():
+            try:
+                data = json.loads(path.read_text())
+            except (OSError, json.JSONDecodeError):
+                data = {}
+            if data.get("renderer") == signature:
+                self.done = data.get("files", {})
+
+    def mark(self, filename: str, digest: str):
+        """Record a finished file, flushing periodically"""
+        self.done[filename] = digest
+        self._pending += 1
+        if self._pending >= MANIFEST_FLUSH_EVERY:
+            self.save()
+
+    def clear(self):
+        """Forget resume state once a run completes"""
+        self.done = {}
+        self._pending = 0
+        self.path.unlink(missing_ok=True)
+
+    def save(self):
+        """Write the manifest atomically"""
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"renderer": self.signature, "files": self.done}, indent=1))
+        os.replace(tmp, self.path)
+        self._pending = 0
+
+
+def list_existing(evolution_dir: Path) -> Set[str]:
+    """One directory listing instead of an exists() call per entry"""
+    if not evolution_dir.exists():
+        return set()
+    with os.scandir(evolution_dir) as it:
+        return {e.name for e in it if e.is_file() and e.name.endswith(".svg")}
+
+
+def plan(entries: List[dict], existing: Set[str], archived: Set[str], manifest: Manifest,
+         evolution_dir: Path, check_existing: bool) -> Tuple[Dict[str, RenderKey], dict]:
+    """
+    Decide which files need rendering
+
+    Returns:
+        (filename -> render key, counts of skipped entries)
+    """
+    targets: Dict[str, RenderKey] = {}
+    skipped = {"no_filename": 0, "no_traits": 0, "exists": 0, "archived": 0, "resumed": 0}
+
+    for entry in entries:
         svg_filename = entry.get("svg_filename")
         if not svg_filename:
-            print(f"⚠️  Entry {entry['timestamp']}: No svg_filename, skipping")
-            skipped += 1
+            skipped["no_filename"] += 1
             continue
-        
-        svg_path = evolution_dir / svg_filename
-        
-        # Skip if already exists
-        if svg_path.exists():
-            print(f"✓ {svg_filename} already exists")
-            skipped += 1
+        if not entry.get("traits"):
+            print(f"⚠️  Entry {entry.get('timestamp')}: No traits data, skipping")
+            skipped["no_traits"] += 1
             continue
-        
-        # Reconstruct DNA from traits
-        traits = entry.get("traits", {})
-        if not traits:
-            print(f"⚠️  Entry {entry['timestamp']}: No traits data, skipping")
-            skipped += 1
+        if svg_filename in archived and svg_filename not in existing:
+            skipped["archived"] += 1
             continue
-        
-        # Create DNA and generate SVG
-        try:
-            dna = create_dna_from_traits(traits, entry)
-            svg = MonkeyVisualizer.generate_svg(dna)
-            svg_path.write_text(svg)
-            print(f"✅ Regenerated {svg_filename}")
-            regenerated += 1
-        except Exception as e:
-            print(f"❌ Error regenerating {svg_filename}: {e}")
-            import traceback
-            traceback.print_exc()
-    
-    print(f"\n📊 Summary: {regenerated} regenerated, {skipped} skipped")
+
+        if svg_filename in existing:
+            if not check_existing:
+                skipped["exists"] += 1
+                continue
+            # Already verified in an earlier (interrupted) run
+            digest = manifest.done.get(svg_filename)
+            if digest and digest == sha256((evolution_dir / svg_filename).read_text()):
+                skipped["resumed"] += 1
+                continue
+
+        targets[svg_filename] = render_key(entry)
+
+    return targets, skipped
+
+
+def render_all(keys: List[RenderKey], workers: Optional[int]) -> Iterator[Tuple[RenderKey, str]]:
+    """Yield (key, svg) as renders finish, in parallel when there is more than one"""
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(keys) <= 1:
+        for key in keys:
+            yield key, render_entry(key)
+        return
+    chunksize = max(1, len(keys) // (workers * 4))
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        chunks = {
+            pool.submit(render_chunk, keys[i:i + chunksize]): keys[i:i + chunksize]
+            for i in range(0, len(keys), chunksize)
+        }
+        for future in as_completed(chunks):
+            yield from zip(chunks[future], future.result())
+    finally:
+        # Don't wait for renders an interrupted run will never write
+        pool.shutdown(cancel_futures=True)
+
+
+def diff_summary(old: str, new: str) -> str:
+    """Short +/- line count between two renders"""
+    added = removed = 0
+    for line in difflib.unified_diff(old.splitlines(), new.splitlines(), lineterm="", n=0):
+        if line.startswith("+") and not line.startswith("+++"):
+            added += 1
+        elif line.startswith("-") and not line.startswith("---"):
+            removed += 1
+    return f"+{added} -{removed} lines"
+
+
+def regenerate(history_file: Path = HISTORY_FILE, evolution_dir: Path = EVOLUTION_DIR,
+               manifest_file: Path = MANIFEST_FILE, verify: bool = False, dry_run: bool = False,
+               workers: Optional[int] = None) -> dict:
+    """
+    Regenerate, verify or plan SVG snapshots from history
+
+    Returns:
+        Summary counts
+    """
+    with open(history_file) as f:
+        history = json.load(f)
+
+    if not dry_run:
+        evolution_dir.mkdir(exist_ok=True)
+    existing = list_existing(evolution_dir)
+    archived = set(SnapshotArchive(evolution_dir).snapshots) if (evolution_dir / INDEX_FILE).exists() else set()
+    manifest = Manifest(manifest_file, renderer_signature())
+
+    targets, skipped = plan(history["entries"], existing, archived, manifest,
+                            evolution_dir, check_existing=verify or dry_run)
+
+    files_by_key: Dict[RenderKey, List[str]] = {}
+    for svg_filename, key in sorted(targets.items()):
+        files_by_key.setdefault(key, []).append(svg_filename)
+    distinct = sorted(files_by_key)
+    print(f"🎨 Rendering {len(distinct)} distinct snapshots for {len(targets)} files...")
+
+    summary = {"created": 0, "unchanged": 0, "changed": 0, "rendered": len(distinct), **skipped}
+    finished = False
+    try:
+        # Files are written and marked as each render finishes, so an
+        # interrupted run keeps everything completed so far
+        for key, svg in render_all(distinct, workers):
+            digest = sha256(svg)
+            for svg_filename in files_by_key[key]:
+                svg_path = evolution_dir / svg_filename
+
+                if svg_filename not in existing:
+                    summary["created"] += 1
+                    if dry_run or verify:
+                        print(f"➕ {svg_filename} would be created")
+                        continue
+                    svg_path.write_text(svg)
+                    print(f"✅ Regenerated {svg_filename}")
+                else:
+                    current = svg_path.read_text()
+                    if sha256(current) == digest:
+                        summary["unchanged"] += 1
+                    else:
+                        summary["changed"] += 1
+                        print(f"❌ {svg_filename} differs from a fresh render ({diff_summary(current, svg)})")
+                        continue
+
+                if not dry_run:
+                    manifest.mark(svg_filename, digest)
+        finished = True
+    finally:
+        # Keep progress only for an interrupted run; a dry run writes nothing
+        if not dry_run and finished:
+            manifest.clear()
+        elif not dry_run:
+            manifest.save()
+
+    print(f"\n📊 Summary: {summary['created']} {'missing' if dry_run or verify else 'regenerated'}, "
+          f"{summary['unchanged']} unchanged, {summary['changed']} changed, "
+          f"{summary['exists'] + summary['resumed'] + summary['archived']} skipped "
+          f"({summary['rendered']} renders)")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regenerate evolution SVGs from history.json")
+    parser.add_argument("--verify", action="store_true", help="Re-render existing files and compare hashes")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be created or changed")
+    parser.add_argument("--workers", type=int, help="Render processes (default: CPU count)")
+    parser.add_argument("--restart", action="store_true", help="Ignore the resume manifest")
+    args = parser.parse_args()
+
+    if args.restart:
+        MANIFEST_FILE.unlink(missing_ok=True)
+
+    summary = regenerate(verify=args.verify, dry_run=args.dry_run, workers=args.workers)
+    if args.verify and summary["changed"]:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
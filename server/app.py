@@ -7,14 +7,24 @@ Flask API for managed adoption flows (Trustless and Full-Trust OAuth).
 import os
 from flask import Flask, request, jsonify, redirect
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 from dotenv import load_dotenv
 
+from clients import default_pool
 from github_service import GitHubService
+from jobs import JobRunner, ShuttingDown
+from usernames import RateLimiter
 
 # Load environment variables
 load_dotenv()
 
 app = Flask(__name__)
+
+# Proxies in front of the app that append to X-Forwarded-For (Cloud Run: 1).
+# Only their hops are trusted; anything further left is client-supplied.
+TRUSTED_PROXIES = int(os.getenv('TRUSTED_PROXIES', 1))
+if TRUSTED_PROXIES:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXIES)
 CORS(app, origins=[
     'http://localhost:*',
     'https://roeiba.github.io',
@@ -27,11 +37,63 @@ GITHUB_CLIENT_SECRET = os.getenv('GITHUB_APP_CLIENT_SECRET', '')
 GITHUB_APP_ID = os.getenv('GITHUB_APP_ID', '')
 GITHUB_PRIVATE_KEY = os.getenv('GITHUB_PRIVATE_KEY', '')
 
+# Adoptions take tens of seconds of GitHub calls; they run here, not in request threads
+jobs = JobRunner()
+
+# Username checks fire per keystroke; cap them per client IP
+validate_limiter = RateLimiter()
+
+_service = None
+
+
+def client_ip() -> str:
+    """Caller's IP as seen by the trusted proxy (see TRUSTED_PROXIES)."""
+    return request.remote_addr or 'unknown'
+
+
+def github_service():
+    """
+    Process-wide GitHubService, created on first use.
+    
+    Raises:
+        ValueError: GITHUB_TOKEN is not configured.
+    """
+    global _service
+    if _service is None:
+        _service = GitHubService()
+    return _service
+
+
+def accepted(job):
+    """202 response pointing the client at the job's status endpoint."""
+    status_url = f"/api/adopt/jobs/{job.id}"
+    response = jsonify({
+        'success': True,
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': status_url
+    })
+    response.headers['Location'] = status_url
+    return response, 202
+
+
+def shutting_down():
+    """503 while the worker drains; the client retries on another instance."""
+    response = jsonify({'success': False, 'error': 'Server is restarting, please retry'})
+    response.headers['Retry-After'] = '5'
+    return response, 503
+
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint."""
-    return jsonify({'status': 'healthy', 'service': 'forkmonkey-api'})
+    return jsonify({
+        'status': 'healthy',
+        'service': 'forkmonkey-api',
+        'github_clients': default_pool().stats(),
+        'username_cache': _service.usernames.stats() if _service else None,
+        'jobs_in_flight': jobs.in_flight()
+    })
 
 
 @app.route('/api/adopt/trustless', methods=['POST'])
@@ -39,6 +101,9 @@ def trustless_adoption():
     """
     Trustless adoption endpoint.
     
+    Starts the adoption in the background and returns 202 with a job ID;
+    poll /api/adopt/jobs/<job_id> for progress and the result.
+    
     Expected JSON body:
     {
         "github_username": "string",
@@ -62,20 +127,18 @@ def trustless_adoption():
         
         customization = data.get('customization', {})
         
-        # Initialize GitHub service
+        # Shared GitHub service
         try:
-            github_service = GitHubService()
+            service = github_service()
         except ValueError as e:
             return jsonify({'success': False, 'error': str(e)}), 500
         
-        # Perform full trustless setup
-        result = github_service.full_setup_for_trustless(username, customization)
-        
-        if result.get('success'):
-            return jsonify(result), 200
-        else:
-            return jsonify(result), 400
-            
+        # Perform full trustless setup in the background
+        job = jobs.submit('trustless', service.full_setup_for_trustless, username, customization)
+        return accepted(job)
+    
+    except ShuttingDown:
+        return shutting_down()
     except Exception as e:
         app.logger.error(f"Trustless adoption error: {e}")
         return jsonify({'success': False, 'error': 'Internal server error'}), 500
@@ -132,7 +195,8 @@ def oauth_complete():
     Complete OAuth adoption.
     
     Uses the GitHub App installation to fork and set up the repository
-    directly in the user's account.
+    directly in the user's account. Runs in the background like the
+    trustless flow and returns 202 with a job ID.
     
     Expected JSON body:
     {
@@ -152,31 +216,39 @@ def oauth_complete():
         if not installation_id:
             return jsonify({'success': False, 'error': 'Installation ID required'}), 400
         
-        # Initialize GitHub service
-        # Token is not needed here as we use app credentials from env
+        # Shared GitHub service
+        # The token is unused here as we use app credentials from env, but
+        # GitHubService requires one; fall back to a placeholder without GITHUB_TOKEN
         try:
-            github_service = GitHubService(token="dummy") # Token required by init check but unused for app flow
+            service = github_service()
         except ValueError:
-            # Bypass token check if possible or mock it, 
-            # actually GitHubService requires token in init.
-            # We can pass a dummy token since we won't use self.github for this flow
-            # or better, refactor GitHubService to make token optional.
-            # For now, passing a dummy if GITHUB_TOKEN env var is missing (which it shouldn't be).
-            github_service = GitHubService(token="app-flow-placeholder")
-        
-        # Perform full OAuth setup
-        result = github_service.full_setup_for_oauth(installation_id, customization)
-        
-        if result.get('success'):
-            return jsonify(result), 200
-        else:
-            return jsonify(result), 400
+            service = GitHubService(token="app-flow-placeholder")
         
+        # Perform full OAuth setup in the background
+        job = jobs.submit('oauth', service.full_setup_for_oauth, installation_id, customization)
+        return accepted(job)
+    
+    except ShuttingDown:
+        return shutting_down()
     except Exception as e:
         app.logger.error(f"OAuth completion error: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+@app.route('/api/adopt/jobs/<job_id>', methods=['GET'])
+def adoption_status(job_id):
+    """
+    Status of a background adoption.
+    
+    Returns the job's status ('queued', 'running', 'succeeded' or 'failed'),
+    its current step, and once finished the adoption result.
+    """
+    job = jobs.store.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Unknown or expired job'}), 404
+    return jsonify(job.to_dict()), 200
+
+
 @app.route('/api/validate/username', methods=['GET'])
 def validate_username():
     """
@@ -190,9 +262,16 @@ def validate_username():
     if not username:
         return jsonify({'valid': False, 'error': 'Username is required'}), 400
     
+    allowed, retry_after = validate_limiter.allow(client_ip())
+    if not allowed:
+        response = jsonify({'valid': False, 'error': 'Too many requests'})
+        response.headers['Retry-After'] = str(max(1, round(retry_after)))
+        return response, 429
+    
     try:
-        github_service = GitHubService()
-        result = github_service.validate_username(username)
+        result = github_service().validate_username(username)
+        if result.get('retryable'):
+            return jsonify(result), 503
         return jsonify(result), 200 if result.get('valid') else 404
     except Exception as e:
         return jsonify({'valid': False, 'error': str(e)}), 500
@@ -202,5 +281,6 @@ if __name__ == '__main__':
     port = int(os.getenv('PORT', 5000))
     debug = os.getenv('FLASK_DEBUG', 'false').lower() == 'true'
     
+    # Development server; production runs `gunicorn -c gunicorn.conf.py app:app`
     print(f"🐵 ForkMonkey API starting on port {port}")
     app.run(host='0.0.0.0', port=port, debug=debug)
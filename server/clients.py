@@ -0,0 +1,135 @@
+"""
+ForkMonkey GitHub Client Pool
+
+One process-wide place to get GitHub clients. Clients are kept per token so
+their HTTP sessions (and open connections) are reused across requests, and
+GitHub App installation tokens are cached until shortly before they expire
+instead of being minted on every call.
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from github import Auth, Github, GithubIntegration
+
+
+# Connections kept open per client, and how many clients (tokens) to keep
+POOL_SIZE = int(os.getenv('GITHUB_POOL_SIZE', 10))
+MAX_CLIENTS = int(os.getenv('GITHUB_MAX_CLIENTS', 64))
+# Mint a new installation token this many seconds before the old one expires
+TOKEN_REFRESH_MARGIN = int(os.getenv('TOKEN_REFRESH_MARGIN', 300))
+
+
+class ClientPool:
+    """Reusable GitHub clients keyed by token, plus an installation token cache."""
+
+    def __init__(self, pool_size: int = POOL_SIZE, max_clients: int = MAX_CLIENTS,
+                 refresh_margin: int = TOKEN_REFRESH_MARGIN):
+        self.pool_size = pool_size
+        self.max_clients = max_clients
+        self.refresh_margin = refresh_margin
+        self._clients: "OrderedDict[str, Github]" = OrderedDict()
+        self._integrations: Dict[str, GithubIntegration] = {}
+        self._tokens: Dict[Tuple[str, int], Tuple[str, float]] = {}
+        self._mint_locks: Dict[Tuple[str, int], threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.counters = {'client_hits': 0, 'client_misses': 0, 'token_hits': 0, 'token_mints': 0}
+
+    def _new_client(self, token: str) -> Github:
+        return Github(auth=Auth.Token(token), pool_size=self.pool_size)
+
+    def client(self, token: str) -> Github:
+        """
+        Shared client for a token.
+
+        Args:
+            token: Personal access or installation token.
+
+        Returns:
+            A Github client whose connections are reused by every caller.
+        """
+        with self._lock:
+            client = self._clients.get(token)
+            if client is not None:
+                self._clients.move_to_end(token)
+                self.counters['client_hits'] += 1
+                return client
+            self.counters['client_misses'] += 1
+            client = self._clients[token] = self._new_client(token)
+            # Evicted clients aren't closed: a running job may still hold one
+            if len(self._clients) > self.max_clients:
+                self._clients.popitem(last=False)
+            return client
+
+    def _integration(self, app_id: str, private_key: str) -> GithubIntegration:
+        with self._lock:
+            integration = self._integrations.get(app_id)
+            if integration is None:
+                integration = self._integrations[app_id] = GithubIntegration(
+                    auth=Auth.AppAuth(app_id, private_key), pool_size=self.pool_size
+                )
+            return integration
+
+    def installation_token(self, app_id: str, private_key: str, installation_id: int) -> str:
+        """
+        Access token for a GitHub App installation, minted only when needed.
+
+        Args:
+            app_id: GitHub App ID.
+            private_key: GitHub App private key.
+            installation_id: Installation ID from the callback.
+
+        Returns:
+            A token valid for at least the refresh margin.
+        """
+        key = (app_id, installation_id)
+        with self._lock:
+            cached = self._tokens.get(key)
+            if cached and cached[1] - time.time() > self.refresh_margin:
+                self.counters['token_hits'] += 1
+                return cached[0]
+            mint_lock = self._mint_locks.setdefault(key, threading.Lock())
+
+        # One mint per installation at a time; latecomers reuse its token
+        with mint_lock:
+            with self._lock:
+                cached = self._tokens.get(key)
+                if cached and cached[1] - time.time() > self.refresh_margin:
+                    self.counters['token_hits'] += 1
+                    return cached[0]
+
+            authorization = self._integration(app_id, private_key).get_access_token(installation_id)
+            expires_at = authorization.expires_at.timestamp()
+            with self._lock:
+                stale = self._tokens.get(key)
+                self._tokens[key] = (authorization.token, expires_at)
+                self.counters['token_mints'] += 1
+                # New callers get a client for the new token
+                if stale:
+                    self._clients.pop(stale[0], None)
+            return authorization.token
+
+    def installation_client(self, app_id: str, private_key: str, installation_id: int) -> Github:
+        """Shared client authenticated as an App installation."""
+        return self.client(self.installation_token(app_id, private_key, installation_id))
+
+    def stats(self) -> Dict[str, int]:
+        """Pool size and hit/mint counters."""
+        with self._lock:
+            return {**self.counters, 'clients': len(self._clients), 'installation_tokens': len(self._tokens)}
+
+
+_default_pool: Optional[ClientPool] = None
+_default_lock = threading.Lock()
+
+
+def default_pool() -> ClientPool:
+    """The process-wide pool."""
+    global _default_pool
+    with _default_lock:
+        if _default_pool is None:
+            _default_pool = ClientPool()
+        return _default_pool
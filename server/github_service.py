@@ -6,27 +6,35 @@ Handles all GitHub API interactions for the managed adoption flows.
 
 import os
 import time
-from typing import Optional, Dict, Any
-from github import Github, GithubException
+from typing import Optional, Dict, Any, Callable
+from github import Github, GithubException, UnknownObjectException
+
+from clients import ClientPool, default_pool
+from readiness import ReadinessWaiter
+from usernames import UsernameCache
 
 
 class GitHubService:
     """Service for GitHub API operations."""
     
-    def __init__(self, token: Optional[str] = None):
+    def __init__(self, token: Optional[str] = None, pool: Optional[ClientPool] = None):
         """
         Initialize the GitHub service.
         
         Args:
             token: GitHub personal access token. If not provided, uses GITHUB_TOKEN env var.
+            pool: Client pool to share connections and tokens through (default: process-wide).
         """
         self.token = token or os.getenv('GITHUB_TOKEN')
         if not self.token:
             raise ValueError("GitHub token is required. Set GITHUB_TOKEN environment variable.")
         
-        self.github = Github(self.token)
+        self.pool = pool or default_pool()
+        self.github = self.pool.client(self.token)
+        self.usernames = UsernameCache(self._lookup_user)
         self.source_repo = os.getenv('FORKMONKEY_SOURCE_REPO', 'roeiba/forkMonkey')
         self.staging_org = os.getenv('FORKMONKEY_STAGING_ORG', 'forkZoo')
+        self.waiter = ReadinessWaiter()
     
     def fork_repository(self, repo_name: Optional[str] = None, organization: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -46,9 +54,6 @@ class GitHubService:
             target_org = organization or self.staging_org
             fork = source.create_fork(organization=target_org)
             
-            # Wait for fork to be ready
-            time.sleep(5)
-            
             # Safety check: Ensure we actually created a fork (not returned source repo)
             if fork.full_name == self.source_repo:
                 return {
@@ -56,6 +61,11 @@ class GitHubService:
                     'error': f'Fork failed - repository already exists or cannot fork to {target_org}'
                 }
             
+            # Wait for fork to be ready
+            ready = self.waiter.fork(self.github, fork.full_name)
+            if not ready:
+                return {'success': False, 'error': f'Fork {fork.full_name} was not ready after {ready.seconds:.0f}s'}
+            
             # Rename if custom name provided
             if repo_name and repo_name != fork.name:
                 fork.edit(name=repo_name)
@@ -65,7 +75,8 @@ class GitHubService:
                 'repo_name': fork.name,
                 'full_name': fork.full_name,
                 'url': fork.html_url,
-                'clone_url': fork.clone_url
+                'clone_url': fork.clone_url,
+                'ready_seconds': ready.seconds
             }
             
         except GithubException as e:
@@ -220,8 +231,12 @@ class GitHubService:
             username: GitHub username to validate.
             
         Returns:
-            Dictionary with validation result.
+            Dictionary with validation result (cached; see UsernameCache).
         """
+        return self.usernames.get(username)
+    
+    def _lookup_user(self, username: str) -> Dict[str, Any]:
+        """Look a username up on GitHub; errors other than 404 are marked retryable."""
         try:
             user = self.github.get_user(username)
             return {
@@ -230,13 +245,20 @@ class GitHubService:
                 'name': user.name,
                 'avatar_url': user.avatar_url
             }
-        except GithubException:
+        except UnknownObjectException:
             return {
                 'valid': False,
                 'error': f'User {username} not found'
             }
+        except GithubException as e:
+            return {
+                'valid': False,
+                'retryable': True,
+                'error': f'Could not check user {username}: {e.status}'
+            }
     
-    def full_setup_for_trustless(self, target_username: str, customization: Optional[Dict] = None) -> Dict[str, Any]:
+    def full_setup_for_trustless(self, target_username: str, customization: Optional[Dict] = None,
+                                 progress: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
         """
         Complete trustless adoption flow:
         1. Fork repo to our account
@@ -248,11 +270,15 @@ class GitHubService:
         Args:
             target_username: GitHub username to transfer to.
             customization: Optional trait customization.
+            progress: Optional callback receiving the name of each step.
             
         Returns:
             Dictionary with operation results.
         """
+        progress = progress or (lambda step: None)
+        
         # Validate username first
+        progress('validating')
         validation = self.validate_username(target_username)
         if not validation.get('valid'):
             return {'success': False, 'error': validation.get('error')}
@@ -261,39 +287,41 @@ class GitHubService:
         timestamp = int(time.time())
         repo_name = f"forkMonkey-{target_username}-{timestamp}"
         
-        # Fork repository
+        # Fork repository (returns once the fork is ready)
+        progress('forking')
         fork_result = self.fork_repository(repo_name)
         if not fork_result.get('success'):
             return fork_result
         
         repo_full_name = fork_result['full_name']
         
-        # Wait for fork to be ready
-        time.sleep(5)
-        
         # Enable Actions
+        progress('enabling_actions')
         actions_result = self.enable_github_actions(repo_full_name)
         if not actions_result.get('success'):
             return {'success': False, 'error': f"Failed to enable Actions: {actions_result.get('error')}"}
         
         # Enable Pages
+        progress('enabling_pages')
         pages_result = self.enable_github_pages(repo_full_name)
         
-        # Wait before triggering workflow
-        time.sleep(3)
-        
-        # Trigger initialization workflow
-        workflow_result = self.trigger_workflow(repo_full_name)
-        
-        # Wait for workflow to start
-        time.sleep(5)
+        # Trigger initialization workflow once Actions has picked it up
+        progress('triggering_workflow')
+        workflow_ready = self.waiter.workflow(self.github, repo_full_name)
+        if workflow_ready:
+            workflow_result = self.trigger_workflow(repo_full_name)
+        else:
+            # Dispatching a workflow Actions hasn't registered yet just 404s
+            workflow_result = {'success': False,
+                               'error': f'Workflow was not ready after {workflow_ready.seconds:.0f}s'}
         
         # Add user as admin collaborator (transfer API doesn't work for org->user)
+        progress('adding_collaborator')
         collab_result = self.add_collaborator(repo_full_name, target_username, 'admin')
         if not collab_result.get('success'):
             return {'success': False, 'error': f"Failed to add collaborator: {collab_result.get('error')}"}
         
-        return {
+        result = {
             'success': True,
             'repo_name': repo_name,
             'repo_url': fork_result.get('url'),
@@ -301,8 +329,14 @@ class GitHubService:
             'pages_url': pages_result.get('pages_url'),
             'message': f'Repository created! {target_username} added as admin collaborator.',
             'claim_url': f"https://github.com/{repo_full_name}/settings",
-            'ownership': 'collaborator'
+            'ownership': 'collaborator',
+            'workflow_triggered': workflow_result.get('success', False),
+            'readiness': {'fork': fork_result.get('ready_seconds'), 'workflow': workflow_ready.seconds}
         }
+        if not workflow_result.get('success'):
+            result['warning'] = (f"Initialization workflow not started ({workflow_result.get('error')}); "
+                                 "run it from the repository's Actions tab.")
+        return result
     
     def get_installation_client(self, app_id: str, private_key: str, installation_id: int) -> Github:
         """
@@ -314,15 +348,12 @@ class GitHubService:
             installation_id: Installation ID from the callback.
             
         Returns:
-            Authenticated Github client.
+            Authenticated Github client (shared; its token is cached until near expiry).
         """
-        from github import GithubIntegration
-        
-        integration = GithubIntegration(app_id, private_key)
-        access_token = integration.get_access_token(installation_id).token
-        return Github(access_token)
+        return self.pool.installation_client(app_id, private_key, installation_id)
 
-    def full_setup_for_oauth(self, installation_id: str, customization: Optional[Dict] = None) -> Dict[str, Any]:
+    def full_setup_for_oauth(self, installation_id: str, customization: Optional[Dict] = None,
+                             progress: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
         """
         Complete full-trust adoption flow via GitHub App.
         
@@ -334,10 +365,12 @@ class GitHubService:
         Args:
             installation_id: GitHub App installation ID.
             customization: Optional trait customization.
+            progress: Optional callback receiving the name of each step.
             
         Returns:
             Dictionary with operation results.
         """
+        progress = progress or (lambda step: None)
         app_id = os.getenv('GITHUB_APP_ID')
         private_key = os.getenv('GITHUB_PRIVATE_KEY')
         
@@ -346,21 +379,25 @@ class GitHubService:
             
         try:
             # 1. Authenticate as the installation (acting as the user)
+            progress('authenticating')
             gh_client = self.get_installation_client(app_id, private_key, int(installation_id))
             user = gh_client.get_user()
             username = user.login
             
             # 2. Fork repository directly to user's account
             # We use the installation client, so create_fork forks to the installation target (the user)
+            progress('forking')
             source_repo = gh_client.get_repo(self.source_repo)
             fork = source_repo.create_fork()
+            repo_full_name = fork.full_name
             
             # Wait for fork to be ready
-            time.sleep(5)
-            
-            repo_full_name = fork.full_name
+            fork_ready = self.waiter.fork(gh_client, repo_full_name)
+            if not fork_ready:
+                return {'success': False, 'error': f'Fork {repo_full_name} was not ready after {fork_ready.seconds:.0f}s'}
             
             # 3. Enable Actions (using the installation client)
+            progress('enabling_actions')
             # Installations usually have write access, so we can set permissions
             try:
                 fork._requester.requestJsonAndCheck(
@@ -373,6 +410,7 @@ class GitHubService:
                 print(f"Warning enabling actions: {e}")
                 
             # 4. Enable Pages
+            progress('enabling_pages')
             try:
                 fork._requester.requestJsonAndCheck(
                     "POST",
@@ -383,10 +421,9 @@ class GitHubService:
                 if "already exists" not in str(e).lower():
                     print(f"Warning enabling pages: {e}")
             
-            # Wait before triggering workflow
-            time.sleep(3)
-            
-            # 5. Trigger initialization workflow
+            # 5. Trigger initialization workflow once Actions has picked it up
+            progress('triggering_workflow')
+            workflow_ready = self.waiter.workflow(gh_client, repo_full_name)
             try:
                 workflow = fork.get_workflow('on-create.yml')
                 
@@ -407,7 +444,8 @@ class GitHubService:
                 'repo_url': fork.html_url,
                 'github_username': username,
                 'pages_url': f"https://{username}.github.io/{fork.name}/",
-                'message': 'Monkey successfully adopted!'
+                'message': 'Monkey successfully adopted!',
+                'readiness': {'fork': fork_ready.seconds, 'workflow': workflow_ready.seconds}
             }
             
         except Exception as e:
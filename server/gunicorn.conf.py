@@ -0,0 +1,53 @@
+"""
+ForkMonkey Backend Production Server
+
+Gunicorn settings for the Flask API:
+
+    gunicorn -c gunicorn.conf.py app:app
+
+Requests only start adoptions (the GitHub work runs on each worker's job
+pool), so threaded workers are enough: a thread is held for milliseconds,
+not for the tens of seconds an adoption takes. On shutdown each worker
+stops taking requests, then drains its in-flight adoption jobs for up to
+JOB_DRAIN_TIMEOUT seconds and marks the rest failed. Pollers only see
+that (or any job, once the worker is gone) with a shared JOB_STORE_DIR.
+"""
+
+import os
+import sys
+
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8080')}"
+# Processes and threads per process; size with benchmarks/server_load.py
+workers = int(os.getenv('WEB_CONCURRENCY', 1))
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+worker_class = 'gthread'
+# 0 disables the worker timeout (Cloud Run enforces its own request timeout)
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 0))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+# Leave time for worker_exit to drain adoption jobs before the worker is killed;
+# the drain default (8s) plus 1 stays inside Cloud Run's 10s shutdown grace
+graceful_timeout = float(os.getenv('JOB_DRAIN_TIMEOUT', 8)) + 1
+# Each worker builds its own job pool threads, which don't survive a fork
+preload_app = False
+accesslog = '-'
+
+
+def on_starting(server):
+    if os.getenv('JOB_STORE_DIR'):
+        return
+    if workers > 1:
+        server.log.warning("%d workers without JOB_STORE_DIR: job status polls may reach "
+                           "a worker that doesn't know the job", workers)
+    server.log.warning("No JOB_STORE_DIR: jobs live in worker memory, so adoptions "
+                       "abandoned on shutdown can't be reported as failed")
+
+
+def worker_exit(server, worker):
+    # Only drain if this worker got as far as loading the app
+    app_module = sys.modules.get('app')
+    if app_module is None:
+        return
+    abandoned = app_module.jobs.drain()
+    if abandoned:
+        server.log.warning("Worker %s abandoned %d adoption job(s)", worker.pid, abandoned)
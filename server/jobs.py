@@ -0,0 +1,252 @@
+"""
+ForkMonkey Adoption Jobs
+
+Runs slow adoption flows in the background. A request creates a job and
+returns its ID right away; a worker pool runs the flow and records each
+step, and clients poll the job's status until it finishes.
+"""
+
+import os
+import abc
+import json
+import time
+import uuid
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+FINISHED = (SUCCEEDED, FAILED)
+
+# Finished jobs are kept this long so clients can still read the result
+JOB_TTL = int(os.getenv('JOB_TTL', 3600))
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', 4))
+# Seconds a stopping server waits for in-flight adoptions before abandoning them;
+# below Cloud Run's 10s between SIGTERM and SIGKILL so the deadline is reached
+JOB_DRAIN_TIMEOUT = float(os.getenv('JOB_DRAIN_TIMEOUT', 8))
+
+
+class ShuttingDown(RuntimeError):
+    """Raised when a job is submitted to a runner that is draining."""
+
+
+@dataclass
+class Job:
+    """State of one background adoption."""
+    id: str
+    kind: str
+    status: str = QUEUED
+    step: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Public view of the job for the status endpoint."""
+        data = asdict(self)
+        data['job_id'] = data.pop('id')
+        if self.started_at:
+            end = self.finished_at or time.time()
+            data['elapsed_seconds'] = round(end - self.started_at, 2)
+        return data
+
+
+class JobStore(abc.ABC):
+    """
+    Where jobs live between the request that creates them and the status polls.
+
+    Subclasses implement save/load; swap in a shared store (files on a
+    shared volume, a database) when several server processes answer polls.
+    """
+
+    @abc.abstractmethod
+    def save(self, job: Job) -> None:
+        """Store a copy of the job, replacing any earlier version."""
+
+    @abc.abstractmethod
+    def load(self, job_id: str) -> Optional[Job]:
+        """A copy of the stored job, or None if unknown."""
+
+    def create(self, kind: str) -> Job:
+        """Create and store a queued job."""
+        job = Job(id=uuid.uuid4().hex, kind=kind)
+        self.save(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Job by ID, or None if unknown or expired."""
+        job = self.load(job_id)
+        if job and job.finished_at and time.time() - job.finished_at > JOB_TTL:
+            return None
+        return job
+
+    def update(self, job: Job, **changes) -> Job:
+        """Apply changes to a job and store it."""
+        for name, value in changes.items():
+            setattr(job, name, value)
+        self.save(job)
+        return job
+
+
+class MemoryJobStore(JobStore):
+    """In-process store; enough for a single server process and for local runs."""
+
+    def __init__(self):
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def save(self, job: Job) -> None:
+        with self._lock:
+            self._jobs[job.id] = Job(**asdict(job))
+            # Drop expired jobs as new ones arrive
+            now = time.time()
+            for job_id in [j.id for j in self._jobs.values()
+                           if j.finished_at and now - j.finished_at > JOB_TTL]:
+                del self._jobs[job_id]
+
+    def load(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return Job(**asdict(job)) if job else None
+
+
+class FileJobStore(JobStore):
+    """One JSON file per job, so every worker process on a host sees every job."""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, job_id: str) -> Path:
+        return self.directory / f"{job_id}.json"
+
+    def save(self, job: Job) -> None:
+        tmp = self._path(job.id).with_suffix('.tmp')
+        tmp.write_text(json.dumps(asdict(job)))
+        os.replace(tmp, self._path(job.id))
+
+    def load(self, job_id: str) -> Optional[Job]:
+        # IDs are hex; anything else can't name a job file
+        if not job_id.isalnum():
+            return None
+        try:
+            return Job(**json.loads(self._path(job_id).read_text()))
+        except (OSError, ValueError):
+            return None
+
+
+def store_from_env() -> JobStore:
+    """FileJobStore when JOB_STORE_DIR is set, otherwise an in-memory store."""
+    directory = os.getenv('JOB_STORE_DIR')
+    return FileJobStore(directory) if directory else MemoryJobStore()
+
+
+class JobRunner:
+    """Runs adoption flows on a bounded worker pool and tracks them in a store."""
+
+    def __init__(self, store: Optional[JobStore] = None, workers: int = JOB_WORKERS):
+        self.store = store or store_from_env()
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='adopt')
+        self.closed = False
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, flow: Callable[..., Dict[str, Any]], *args, **kwargs) -> Job:
+        """
+        Queue a flow and return its job immediately.
+
+        Args:
+            kind: Job type, e.g. 'trustless' or 'oauth'.
+            flow: Callable returning a result dict with a 'success' key. It is
+                called with a `progress` keyword to report the current step.
+
+        Returns:
+            The queued job.
+
+        Raises:
+            ShuttingDown: The runner is draining and takes no new jobs.
+        """
+        with self._lock:
+            if self.closed:
+                raise ShuttingDown("Server is shutting down")
+            job = self.store.create(kind)
+            future = self._futures[job.id] = self.pool.submit(self._run, job.id, flow, args, kwargs)
+        future.add_done_callback(lambda _: self._forget(job.id))
+        return job
+
+    def _forget(self, job_id: str) -> None:
+        with self._lock:
+            self._futures.pop(job_id, None)
+
+    def _run(self, job_id: str, flow, args, kwargs) -> None:
+        # Work on the worker's own copy; the caller keeps the queued snapshot
+        job = self.store.load(job_id)
+        self.store.update(job, status=RUNNING, started_at=time.time())
+
+        def progress(step: str) -> None:
+            self.store.update(job, step=step)
+
+        try:
+            result = flow(*args, progress=progress, **kwargs)
+        except Exception as e:
+            result = {'success': False, 'error': str(e)}
+
+        if result.get('success'):
+            self.store.update(job, status=SUCCEEDED, result=result, finished_at=time.time())
+        else:
+            self.store.update(job, status=FAILED, result=result, error=result.get('error'),
+                              finished_at=time.time())
+
+    def in_flight(self) -> int:
+        """Jobs queued or running."""
+        with self._lock:
+            return len(self._futures)
+
+    def drain(self, timeout: float = JOB_DRAIN_TIMEOUT) -> int:
+        """
+        Stop accepting jobs and wait for queued and running ones to finish.
+
+        Jobs still unfinished at the deadline are marked failed so clients
+        polling them get an answer instead of waiting forever. That answer
+        only outlives the process with a shared store (FileJobStore via
+        JOB_STORE_DIR); a MemoryJobStore's jobs vanish with the worker.
+
+        Args:
+            timeout: Most seconds to wait.
+
+        Returns:
+            Number of jobs abandoned.
+        """
+        with self._lock:
+            self.closed = True
+            pending = dict(self._futures)
+        if pending:
+            print(f"Draining {len(pending)} adoption job(s), up to {timeout:.0f}s")
+        wait(pending.values(), timeout=timeout)
+
+        abandoned = 0
+        for job_id, future in pending.items():
+            if future.done():
+                continue
+            future.cancel()
+            job = self.store.load(job_id)
+            if job and job.status not in FINISHED:
+                abandoned += 1
+                self.store.update(job, status=FAILED, error="Server shut down before the adoption finished",
+                                  finished_at=time.time())
+        self.pool.shutdown(wait=False)
+        return abandoned
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting jobs, optionally waiting for running ones to finish."""
+        with self._lock:
+            self.closed = True
+        self.pool.shutdown(wait=wait)
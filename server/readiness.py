@@ -0,0 +1,101 @@
+"""
+ForkMonkey Readiness Waiter
+
+GitHub creates forks and registers their workflows asynchronously. Rather
+than sleeping a fixed time and hoping, poll the thing we need with
+exponential backoff until it answers or a total deadline passes, and record
+how long it actually took.
+"""
+
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from github import GithubException
+
+
+# Total seconds to poll before giving up on a fork or workflow
+READY_TIMEOUT = float(os.getenv('READY_TIMEOUT', 60))
+
+
+@dataclass
+class Readiness:
+    """Outcome of one wait."""
+    name: str
+    ready: bool
+    seconds: float
+    attempts: int
+
+    def __bool__(self) -> bool:
+        return self.ready
+
+
+class ReadinessWaiter:
+    """Polls a readiness check with exponential backoff and a total deadline."""
+
+    def __init__(self, timeout: Optional[float] = None, interval: float = 0.5,
+                 factor: float = 2.0, max_interval: float = 8.0,
+                 sleep: Callable[[float], None] = time.sleep,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            timeout: Total seconds per wait (default READY_TIMEOUT).
+            interval: First delay between attempts.
+            factor: Delay multiplier after each failed attempt.
+            max_interval: Longest delay between attempts.
+        """
+        self.timeout = timeout
+        self.interval = interval
+        self.factor = factor
+        self.max_interval = max_interval
+        self.sleep = sleep
+        self.clock = clock
+
+    def wait(self, name: str, check: Callable[[], Any]) -> Readiness:
+        """
+        Poll until `check` returns truthy.
+
+        Args:
+            name: What is being waited for, for logs and timings.
+            check: Readiness probe; a GithubException means not ready yet.
+
+        Returns:
+            Readiness with whether it became ready and how long it took.
+        """
+        timeout = READY_TIMEOUT if self.timeout is None else self.timeout
+        start = self.clock()
+        deadline = start + timeout
+        interval = self.interval
+        attempts = 0
+
+        while True:
+            attempts += 1
+            try:
+                if check():
+                    return self._done(name, True, start, attempts)
+            except GithubException:
+                pass
+            remaining = deadline - self.clock()
+            if remaining <= 0:
+                return self._done(name, False, start, attempts)
+            self.sleep(min(interval, remaining))
+            interval = min(interval * self.factor, self.max_interval)
+
+    def _done(self, name: str, ready: bool, start: float, attempts: int) -> Readiness:
+        result = Readiness(name, ready, round(self.clock() - start, 3), attempts)
+        status = "ready" if ready else "NOT ready"
+        print(f"{name} {status} after {result.seconds:.1f}s ({attempts} checks)")
+        return result
+
+    def fork(self, github, repo_full_name: str) -> Readiness:
+        """Wait until a new fork's default branch can be read."""
+        def check():
+            repo = github.get_repo(repo_full_name)
+            return repo.get_branch(repo.default_branch)
+        return self.wait(f"fork {repo_full_name}", check)
+
+    def workflow(self, github, repo_full_name: str, workflow_file: str = 'on-create.yml') -> Readiness:
+        """Wait until Actions has registered a fork's workflow file."""
+        return self.wait(f"workflow {workflow_file}",
+                         lambda: github.get_repo(repo_full_name).get_workflow(workflow_file))
@@ -0,0 +1,156 @@
+"""
+ForkMonkey Username Lookups
+
+The adoption form validates the username as the user types, so the same
+handful of names is looked up over and over. Results are kept in a bounded
+TTL cache (misses too, for less time, since the account may be created
+soon), concurrent lookups of one name share a single GitHub call, and each
+client IP gets a token bucket so one page can't spend the API quota.
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+# Seconds to remember users that exist / don't exist, and how many names to keep
+USERNAME_CACHE_TTL = int(os.getenv('USERNAME_CACHE_TTL', 3600))
+USERNAME_NEGATIVE_TTL = int(os.getenv('USERNAME_NEGATIVE_TTL', 60))
+USERNAME_CACHE_SIZE = int(os.getenv('USERNAME_CACHE_SIZE', 10000))
+# Per-IP validation budget: sustained requests per second and burst size
+VALIDATE_RATE = float(os.getenv('VALIDATE_RATE', 2))
+VALIDATE_BURST = int(os.getenv('VALIDATE_BURST', 20))
+
+
+class _Flight:
+    """A lookup in progress that other callers can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[BaseException] = None
+
+
+class UsernameCache:
+    """TTL + LRU cache of username lookups with request coalescing."""
+
+    def __init__(self, lookup: Callable[[str], Dict[str, Any]], ttl: int = USERNAME_CACHE_TTL,
+                 negative_ttl: int = USERNAME_NEGATIVE_TTL, max_size: int = USERNAME_CACHE_SIZE,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            lookup: Function returning a validation result with a 'valid' key.
+                Results marked 'retryable' (rate limits, outages) are not cached.
+            ttl: Seconds to keep results for users that exist.
+            negative_ttl: Seconds to keep results for users that don't.
+            max_size: Most usernames kept; the least recently used go first.
+        """
+        self.lookup = lookup
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_size = max_size
+        self.clock = clock
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._inflight: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+        self.counters = {'hits': 0, 'negative_hits': 0, 'misses': 0, 'coalesced': 0}
+
+    def get(self, username: str) -> Dict[str, Any]:
+        """
+        Validation result for a username, from memory when possible.
+
+        Args:
+            username: GitHub username (case-insensitive).
+
+        Returns:
+            The lookup's result dictionary.
+        """
+        key = username.lower()
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached and cached[1] > self.clock():
+                self._entries.move_to_end(key)
+                self.counters['hits' if cached[0].get('valid') else 'negative_hits'] += 1
+                return dict(cached[0])
+
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+                self.counters['misses'] += 1
+            else:
+                self.counters['coalesced'] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error:
+                raise flight.error
+            return dict(flight.result)
+
+        try:
+            flight.result = self.lookup(username)
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+                if flight.result is not None and not flight.result.get('retryable'):
+                    self._store(key, flight.result)
+            flight.done.set()
+        return dict(flight.result)
+
+    def _store(self, key: str, result: Dict[str, Any]) -> None:
+        ttl = self.ttl if result.get('valid') else self.negative_ttl
+        self._entries[key] = (result, self.clock() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        """Entry count and hit/miss counters."""
+        with self._lock:
+            return {**self.counters, 'entries': len(self._entries)}
+
+
+class RateLimiter:
+    """Token bucket per client key (e.g. IP address), bounded in memory."""
+
+    def __init__(self, rate: float = VALIDATE_RATE, burst: int = VALIDATE_BURST,
+                 max_keys: int = USERNAME_CACHE_SIZE, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            rate: Tokens added per second.
+            burst: Bucket size, i.e. requests allowed back to back.
+            max_keys: Most clients tracked; idle ones are forgotten first.
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def allow(self, key: str) -> Tuple[bool, float]:
+        """
+        Spend one token for a client.
+
+        Args:
+            key: Client identifier.
+
+        Returns:
+            (allowed, seconds until the next token if not allowed).
+        """
+        now = self.clock()
+        with self._lock:
+            tokens, last = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, 0.0 if allowed else (1 - tokens) / self.rate
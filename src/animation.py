@@ -0,0 +1,208 @@
+"""
+ForkMonkey Evolution Animation
+
+Builds the evolution animation incrementally. A persisted frame store
+remembers which snapshots have already been rasterized, so each run only
+appends new frames. Encoders stream frames one at a time instead of
+holding every decoded image in memory.
+"""
+
+import json
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple, Union
+
+from src.raster import RasterExporter
+
+
+DEFAULT_DURATION = 500  # ms between frames
+ANIMATION_FORMATS = ("gif", "webp", "mp4")
+
+Frame = Tuple[Path, int]  # (raster path, duration in ms)
+
+
+class FrameStore:
+    """Ordered, persisted list of animation frames backed by the raster cache"""
+
+    def __init__(self, manifest_path: Union[str, Path], exporter: Optional[RasterExporter] = None,
+                 size: Optional[int] = None):
+        """
+        Args:
+            manifest_path: JSON file recording the frames appended so far
+            exporter: Raster exporter holding the frame images
+            size: Frame size in pixels (None = native SVG size)
+        """
+        self.manifest_path = Path(manifest_path)
+        self.exporter = exporter or RasterExporter()
+        self.size = size
+        self.entries: List[dict] = []
+        self._load()
+
+    def _load(self):
+        """Load the manifest, discarding it if it was built at another size"""
+        if not self.manifest_path.exists():
+            return
+        try:
+            with open(self.manifest_path, "r") as f:
+                manifest = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️  Ignoring unreadable frame manifest: {e}")
+            return
+        if manifest.get("size") == self.size:
+            self.entries = manifest.get("frames", [])
+
+    def save(self):
+        """Persist the manifest"""
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.manifest_path, "w") as f:
+            json.dump({"size": self.size, "frames": self.entries}, f, indent=2)
+
+    def reset(self):
+        """Forget all frames (forces a full rebuild on the next sync)"""
+        self.entries = []
+
+    def sync(self, sources: Iterable[Tuple[str, Union[str, bytes, Path]]],
+             duration: int = DEFAULT_DURATION) -> int:
+        """
+        Append frames for sources not yet in the store
+
+        Args:
+            sources: (name, svg) pairs in playback order; svg may be markup or a file path
+            duration: Display time for newly added frames
+
+        Returns:
+            Number of frames appended
+        """
+        known = {entry["source"] for entry in self.entries}
+        new = [
+            (name, svg.read_bytes() if isinstance(svg, Path) else svg)
+            for name, svg in sources
+            if name not in known
+        ]
+        if not new:
+            return 0
+
+        paths = self.exporter.render_many([svg for _, svg in new], size=self.size)
+        added = 0
+        for (name, svg), path in zip(new, paths):
+            if path is None:
+                print(f"Skipping {name} (rasterization failed)")
+                continue
+            self.entries.append({
+                "source": name,
+                "key": self.exporter.cache_key(svg, self.size),
+                "duration": duration,
+            })
+            added += 1
+
+        self.entries.sort(key=lambda entry: entry["source"])
+        return added
+
+    def frames(self, dedupe: bool = False) -> List[Frame]:
+        """
+        Frames in playback order
+
+        Args:
+            dedupe: Merge identical consecutive frames into one longer frame
+        """
+        result: List[Frame] = []
+        last_key = None
+        for entry in self.entries:
+            path = self.exporter.cache_path(entry["key"])
+            if not path.exists():
+                # Raster evicted from the cache; skip rather than fail the build
+                continue
+            if dedupe and entry["key"] == last_key:
+                prev_path, prev_duration = result[-1]
+                result[-1] = (prev_path, prev_duration + entry["duration"])
+            else:
+                result.append((path, entry["duration"]))
+            last_key = entry["key"]
+        return result
+
+
+def write_gif(frames: List[Frame], output: Union[str, Path], loop: int = 0):
+    """Encode frames as an animated GIF, one frame in memory at a time"""
+    from PIL import Image, GifImagePlugin
+
+    with open(output, "wb") as fp:
+        for index, (path, duration) in enumerate(frames):
+            with Image.open(path) as img:
+                frame = img.convert("RGB").quantize(colors=256)
+            if index == 0:
+                header, _ = GifImagePlugin.getheader(frame, info={"loop": loop, "duration": duration})
+                fp.writelines(header)
+            fp.writelines(GifImagePlugin.getdata(frame, duration=duration, include_color_table=True))
+        fp.write(b";")
+
+
+def _write_with_ffmpeg(frames: List[Frame], output: Path, codec_args: List[str]):
+    """Stream frames through ffmpeg's concat demuxer (ffmpeg reads one file at a time)"""
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as listing:
+        for path, duration in frames:
+            listing.write(f"file '{Path(path).resolve()}'\nduration {duration / 1000:.3f}\n")
+        # The concat demuxer ignores the last duration unless the file is repeated
+        listing.write(f"file '{Path(frames[-1][0]).resolve()}'\n")
+        list_path = listing.name
+
+    try:
+        subprocess.run(
+            ["ffmpeg", "-y", "-loglevel", "error", "-f", "concat", "-safe", "0",
+             "-i", list_path, *codec_args, str(output)],
+            check=True,
+        )
+    finally:
+        Path(list_path).unlink(missing_ok=True)
+
+
+def write_webp(frames: List[Frame], output: Union[str, Path], quality: int = 80, loop: int = 0):
+    """Encode frames as an animated WebP"""
+    output = Path(output)
+    if shutil.which("ffmpeg"):
+        _write_with_ffmpeg(frames, output, [
+            "-c:v", "libwebp_anim", "-lossless", "0", "-quality", str(quality), "-loop", str(loop),
+        ])
+        return
+
+    # Pillow's WebP encoder needs every frame up front
+    from PIL import Image
+
+    print("⚠️  ffmpeg not found, encoding WebP in memory")
+    images = [Image.open(path).convert("RGB") for path, _ in frames]
+    images[0].save(
+        output,
+        save_all=True,
+        append_images=images[1:],
+        duration=[duration for _, duration in frames],
+        loop=loop,
+        quality=quality,
+    )
+
+
+def write_mp4(frames: List[Frame], output: Union[str, Path]):
+    """Encode frames as an H.264 MP4 (requires ffmpeg)"""
+    if not shutil.which("ffmpeg"):
+        raise RuntimeError("MP4 output requires ffmpeg on PATH")
+    # yuv420p subsamples chroma 2x2, so libx264 rejects odd widths and heights
+    _write_with_ffmpeg(frames, Path(output), [
+        "-vsync", "vfr", "-vf", "scale=trunc(iw/2)*2:trunc(ih/2)*2",
+        "-c:v", "libx264", "-pix_fmt", "yuv420p", "-movflags", "+faststart",
+    ])
+
+
+def encode_animation(frames: List[Frame], output: Union[str, Path], fmt: str = "gif"):
+    """Write frames to output in the requested animation format"""
+    if fmt not in ANIMATION_FORMATS:
+        raise ValueError(f"Unsupported animation format: {fmt}")
+    if not frames:
+        raise ValueError("No frames to encode")
+
+    Path(output).parent.mkdir(parents=True, exist_ok=True)
+    if fmt == "gif":
+        write_gif(frames, output)
+    elif fmt == "webp":
+        write_webp(frames, output)
+    else:
+        write_mp4(frames, output)
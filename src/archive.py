@@ -0,0 +1,282 @@
+"""
+ForkMonkey Snapshot Archive
+
+Compact storage for monkey_evolution/ snapshots. Instead of one full SVG
+per evolution, each snapshot is recorded as its trait tuple plus visual
+seed in snapshots.json. SVGs that can't be reproduced from traits (e.g.
+renders from older visualizer versions) go into a content-addressed
+renders/ store, so identical renders are kept once. SVGs are materialized
+on demand and cached.
+"""
+
+import os
+import json
+import hashlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from src.genetics import GeneticsEngine, MonkeyDNA, TraitCategory
+from src.visualizer import MonkeyVisualizer
+
+
+INDEX_FILE = "snapshots.json"
+RENDER_DIR = "renders"
+SNAPSHOT_GLOB = "*_monkey*.svg"
+ARCHIVE_MODES = ("full", "compact")
+CATEGORIES = [cat.value for cat in TraitCategory]
+
+
+def archive_mode() -> str:
+    """Archive mode from MONKEY_ARCHIVE_MODE ("full" writes every SVG, "compact" records traits)"""
+    mode = os.getenv("MONKEY_ARCHIVE_MODE", "full").lower()
+    return mode if mode in ARCHIVE_MODES else "full"
+
+
+class SnapshotArchive:
+    """Trait-based snapshot index with a deduplicated render store"""
+
+    def __init__(self, evolution_dir: Union[str, Path] = "monkey_evolution", cache_size: int = 128):
+        """
+        Args:
+            evolution_dir: Directory holding snapshots (loose SVGs, index and render store)
+            cache_size: Number of materialized SVGs kept in memory
+        """
+        self.evolution_dir = Path(evolution_dir)
+        self.index_file = self.evolution_dir / INDEX_FILE
+        self.render_dir = self.evolution_dir / RENDER_DIR
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self.snapshots: Dict[str, dict] = self._load_index()
+
+    def _load_index(self) -> Dict[str, dict]:
+        """Load snapshot records from the index"""
+        if not self.index_file.exists():
+            return {}
+        with open(self.index_file, "r") as f:
+            index = json.load(f)
+
+        # Trait tuples are stored in the category order recorded in the index
+        categories = index.get("categories", CATEGORIES)
+        snapshots = index.get("snapshots", {})
+        if categories != CATEGORIES:
+            for record in snapshots.values():
+                if "traits" in record:
+                    by_cat = dict(zip(categories, record["traits"]))
+                    record["traits"] = [by_cat.get(cat) for cat in CATEGORIES]
+        return snapshots
+
+    def save(self):
+        """Write the snapshot index"""
+        self.evolution_dir.mkdir(parents=True, exist_ok=True)
+        index = {
+            "version": 1,
+            "categories": CATEGORIES,
+            "snapshots": dict(sorted(self.snapshots.items())),
+        }
+        with open(self.index_file, "w") as f:
+            json.dump(index, f, indent=1)
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def record_for(traits: Dict[str, str], seed: str, generation: int) -> dict:
+        """Build a snapshot record from plain trait values"""
+        return {
+            "traits": [traits.get(cat) for cat in CATEGORIES],
+            "seed": seed,
+            "generation": generation,
+        }
+
+    def record(self, filename: str, dna: MonkeyDNA, svg: Optional[str] = None):
+        """
+        Record a snapshot for a DNA state
+
+        If the supplied SVG can't be reproduced from traits alone it is
+        kept in the render store.
+        """
+        traits = {cat.value: trait.value for cat, trait in dna.traits.items()}
+        record = self.record_for(traits, dna.dna_hash, dna.generation)
+        if svg is not None and svg != self._render_record(record):
+            record["render"] = self.add_render(svg)
+        self.snapshots[filename] = record
+        self._cache.pop(filename, None)
+
+    def add(self, filename: str, dna: MonkeyDNA, svg: str, mode: Optional[str] = None) -> Path:
+        """
+        Archive a new snapshot
+
+        In full mode the SVG is written to disk as before; in compact mode
+        only its record is added to the index.
+
+        Returns:
+            Path of the loose SVG or of the index
+        """
+        if (mode or archive_mode()) == "full":
+            path = self.evolution_dir / filename
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(svg)
+            return path
+
+        self.record(filename, dna, svg)
+        self.save()
+        return self.index_file
+
+    def add_render(self, svg: str) -> str:
+        """Store an SVG in the content-addressed render store, returning its hash"""
+        digest = hashlib.sha256(svg.encode()).hexdigest()[:16]
+        path = self.render_dir / f"{digest}.svg"
+        if not path.exists():
+            self.render_dir.mkdir(parents=True, exist_ok=True)
+            path.write_text(svg)
+        return digest
+
+    # ------------------------------------------------------------------
+    # Materialization
+    # ------------------------------------------------------------------
+
+    def names(self) -> List[str]:
+        """All snapshot filenames, whether archived or still loose on disk"""
+        loose = {p.name for p in self.evolution_dir.glob(SNAPSHOT_GLOB)}
+        return sorted(loose | set(self.snapshots))
+
+    def latest(self) -> Optional[str]:
+        """Filename of the newest snapshot (names sort by timestamp), if any"""
+        names = self.names()
+        return names[-1] if names else None
+
+    def materialize(self, filename: str) -> Optional[str]:
+        """Return the SVG for a snapshot, rendering it from traits if needed"""
+        if filename in self._cache:
+            self._cache.move_to_end(filename)
+            return self._cache[filename]
+
+        loose = self.evolution_dir / filename
+        record = self.snapshots.get(filename)
+        if loose.exists():
+            svg = loose.read_text()
+        elif record is None:
+            return None
+        elif "render" in record:
+            svg = (self.render_dir / f"{record['render']}.svg").read_text()
+        else:
+            svg = self._render_record(record)
+
+        self._cache[filename] = svg
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return svg
+
+    def materialize_all(self, output_dir: Union[str, Path]) -> int:
+        """Write every snapshot as a plain SVG file (e.g. for GitHub Pages)"""
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        written = 0
+        for name in self.names():
+            target = output_dir / name
+            if target.exists():
+                continue
+            svg = self.materialize(name)
+            if svg is not None:
+                target.write_text(svg)
+                written += 1
+        return written
+
+    @staticmethod
+    def _render_record(record: dict) -> str:
+        """Render a snapshot record with the current visualizer"""
+        traits = {cat: value for cat, value in zip(CATEGORIES, record["traits"]) if value is not None}
+        dna = GeneticsEngine.dna_from_traits(
+            traits,
+            generation=record.get("generation", 1),
+            dna_hash=record.get("seed", "")
+        )
+        return MonkeyVisualizer.generate_svg(dna)
+
+    # ------------------------------------------------------------------
+    # Compaction
+    # ------------------------------------------------------------------
+
+    def compact(self, history_entries: List[dict], dry_run: bool = False) -> dict:
+        """
+        Replace loose snapshot SVGs with index records
+
+        Snapshots that re-render identically from their history entry are
+        stored as traits only; all others are moved into the render store.
+
+        Returns:
+            Summary counts and byte sizes before/after
+        """
+        by_filename = {e["svg_filename"]: e for e in history_entries if e.get("svg_filename")}
+        stats = {"snapshots": 0, "reproducible": 0, "stored_renders": 0,
+                 "bytes_before": 0, "bytes_after": 0}
+        new_renders = set()
+
+        for path in sorted(self.evolution_dir.glob(SNAPSHOT_GLOB)):
+            svg = path.read_text()
+            stats["snapshots"] += 1
+            stats["bytes_before"] += path.stat().st_size
+
+            entry = by_filename.get(path.name)
+            record = {}
+            if entry and entry.get("traits"):
+                record = self.record_for(entry["traits"], entry.get("dna_hash", ""), entry.get("generation", 1))
+
+            if record and self._render_record(record) == svg:
+                stats["reproducible"] += 1
+            else:
+                digest = hashlib.sha256(svg.encode()).hexdigest()[:16]
+                if digest not in new_renders and not (self.render_dir / f"{digest}.svg").exists():
+                    stats["bytes_after"] += len(svg.encode())
+                new_renders.add(digest)
+                if not dry_run:
+                    self.add_render(svg)
+                record["render"] = digest
+
+            if not dry_run:
+                self.snapshots[path.name] = record
+                path.unlink()
+
+        stats["stored_renders"] = len(new_renders)
+        if not dry_run:
+            self.save()
+            stats["bytes_after"] += self.index_file.stat().st_size
+        return stats
+
+
+def main():
+    """Compact or materialize the snapshot archive"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="ForkMonkey snapshot archive")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    compact = sub.add_parser("compact", help="Replace loose SVGs with trait records")
+    compact.add_argument("--dry-run", action="store_true", help="Report savings without changing files")
+
+    materialize = sub.add_parser("materialize", help="Write every snapshot as an SVG file")
+    materialize.add_argument("--out", required=True, help="Output directory")
+
+    parser.add_argument("--dir", default="monkey_evolution", help="Snapshot directory")
+    parser.add_argument("--history", default="monkey_data/history.json", help="History file")
+    args = parser.parse_args()
+
+    archive = SnapshotArchive(args.dir)
+
+    if args.command == "compact":
+        with open(args.history, "r") as f:
+            entries = json.load(f).get("entries", [])
+        stats = archive.compact(entries, dry_run=args.dry_run)
+        print(f"📦 {stats['snapshots']} snapshots: {stats['reproducible']} reproducible from traits, "
+              f"{stats['stored_renders']} distinct renders stored")
+        print(f"   {stats['bytes_before']:,} bytes → ~{stats['bytes_after']:,} bytes"
+              + (" (dry run)" if args.dry_run else ""))
+    else:
+        written = archive.materialize_all(args.out)
+        print(f"✅ Materialized {written} snapshots to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,23 +7,120 @@ Command-line interface for managing your monkey.
 import os
 import sys
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import click
 from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
 
-from src.genetics import GeneticsEngine, MonkeyDNA, TraitCategory
-from src.storage import MonkeyStorage
-from src.visualizer import MonkeyVisualizer
-from src.evolution import EvolutionAgent
+# Everything heavier (pydantic models, PyGithub, the AI layer, the renderer)
+# is imported inside the commands that use it, so e.g. `history` starts fast
+if TYPE_CHECKING:
+    from src.genetics import MonkeyDNA
 
 console = Console()
 
 
+def archive_snapshot(dna: "MonkeyDNA", svg: str, evolution_dir: str = "monkey_evolution") -> str:
+    """Archive the current SVG under a UTC timestamp (loose file or compact record)"""
+    from datetime import datetime, timezone
+    from src.archive import SnapshotArchive
+    timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d_%H-%M")
+    svg_filename = f"{timestamp}_monkey.svg"
+    SnapshotArchive(evolution_dir).add(svg_filename, dna, svg)
+    return svg_filename
+
+
+def update_readme_sections(readme: str, dna: "MonkeyDNA", age_days: int) -> str:
+    """Replace the monkey display, stats, lineage and breeding sections of a README"""
+    import re
+    import random
+    from src.genetics import Rarity
+    
+    # Update monkey display section with image reference
+    monkey_section = '''<!-- MONKEY_DISPLAY_START -->
+<div align="center">
+
+![Your Monkey](monkey_data/monkey.svg)
+
+</div>
+<!-- MONKEY_DISPLAY_END -->'''
+    
+    # Replace section
+    pattern = r'<!-- MONKEY_DISPLAY_START -->.*?<!-- MONKEY_DISPLAY_END -->'
+    readme = re.sub(pattern, monkey_section, readme, flags=re.DOTALL)
+    
+    # Update stats section
+    rarity = dna.get_rarity_score()
+    
+    # Calculate rarity tier for display
+    if rarity >= 80:
+        tier_emoji = "🦄"
+        tier_name = "LEGENDARY"
+    elif rarity >= 50:
+        tier_emoji = "💙"
+        tier_name = "RARE"
+    elif rarity >= 25:
+        tier_emoji = "💚"
+        tier_name = "UNCOMMON"
+    else:
+        tier_emoji = "⚪"
+        tier_name = "COMMON"
+    
+    stats_section = f'''<!-- MONKEY_STATS_START -->
+| Generation | Age | Mutations | Rarity Score |
+|:----------:|:---:|:---------:|:------------:|
+| {dna.generation} | {age_days} days | {dna.mutation_count} | {rarity:.1f}/100 |
+<!-- MONKEY_STATS_END -->'''
+    
+    pattern = r'<!-- MONKEY_STATS_START -->.*?<!-- MONKEY_STATS_END -->'
+    readme = re.sub(pattern, stats_section, readme, flags=re.DOTALL)
+    
+    # Update lineage stats section
+    # Get notable traits for breeding pitch
+    notable_traits = []
+    for cat, trait in dna.traits.items():
+        if trait.rarity in [Rarity.RARE, Rarity.LEGENDARY]:
+            notable_traits.append(f"**{trait.value.replace('_', ' ').title()}** ({trait.rarity.value})")
+    
+    if notable_traits:
+        traits_text = ", ".join(notable_traits[:2])  # Show top 2
+        lineage_section = f'''<!-- LINEAGE_STATS_START -->
+🧬 **Notable Traits:** {traits_text}
+
+🍴 Fork to inherit these rare genetics!
+<!-- LINEAGE_STATS_END -->'''
+    else:
+        lineage_section = '''<!-- LINEAGE_STATS_START -->
+🧬 **Lineage Stats:** This monkey has inspired a growing family tree!
+<!-- LINEAGE_STATS_END -->'''
+    
+    pattern = r'<!-- LINEAGE_STATS_START -->.*?<!-- LINEAGE_STATS_END -->'
+    if re.search(pattern, readme, flags=re.DOTALL):
+        readme = re.sub(pattern, lineage_section, readme, flags=re.DOTALL)
+    
+    # Update breeding boost section with urgency
+    boost_messages = [
+        "⚡ **First 5 forks get +15% legendary trait inheritance!**",
+        "🔥 **Breeding boost active!** Fork now for enhanced trait inheritance.",
+        "✨ **Limited time:** Rare trait inheritance rates boosted!",
+        "🎯 **Today only:** Higher chance to inherit legendary traits!"
+    ]
+    boost_msg = random.choice(boost_messages)
+    
+    breeding_section = f'''<!-- BREEDING_BOOST_START -->
+{boost_msg}
+<!-- BREEDING_BOOST_END -->'''
+    
+    pattern = r'<!-- BREEDING_BOOST_START -->.*?<!-- BREEDING_BOOST_END -->'
+    if re.search(pattern, readme, flags=re.DOTALL):
+        readme = re.sub(pattern, breeding_section, readme, flags=re.DOTALL)
+    
+    return readme
+
+
 @click.group()
 def cli():
     """🐵 ForkMonkey - Your AI-powered digital pet on GitHub"""
@@ -35,6 +132,10 @@ def cli():
 @click.option('--force', '-f', is_flag=True, help='Force overwrite without confirmation (for CI)')
 def init(from_fork, force):
     """Initialize a new monkey"""
+    from rich.table import Table
+    from src.genetics import GeneticsEngine
+    from src.storage import MonkeyStorage
+    from src.visualizer import MonkeyVisualizer
     console.print("\n🐵 [bold cyan]Initializing ForkMonkey...[/bold cyan]\n")
     
     storage = MonkeyStorage()
@@ -77,12 +178,7 @@ def init(from_fork, force):
     svg_file.write_text(svg)
     
     # Archive with timestamp
-    from datetime import datetime, timezone
-    timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d_%H-%M")
-    svg_filename = f"{timestamp}_monkey.svg"
-    archive_file = Path(f"monkey_evolution/{svg_filename}")
-    archive_file.parent.mkdir(exist_ok=True)
-    archive_file.write_text(svg)
+    svg_filename = archive_snapshot(dna, svg)
     
     # Save history with SVG filename
     storage.save_history_entry(dna, "🎉 Your monkey was born!", svg_filename=svg_filename)
@@ -112,6 +208,10 @@ def init(from_fork, force):
 @click.option('--strength', default=0.1, help='Evolution strength (0-1)')
 def evolve(ai, strength):
     """Evolve your monkey"""
+    from src.genetics import GeneticsEngine
+    from src.storage import MonkeyStorage
+    from src.visualizer import MonkeyVisualizer
+    from src.evolution import EvolutionAgent
     console.print("\n🧬 [bold cyan]Evolving monkey...[/bold cyan]\n")
     
     storage = MonkeyStorage()
@@ -133,8 +233,13 @@ def evolve(ai, strength):
         
         try:
             agent = EvolutionAgent(provider_type=provider)
-            evolved_dna = agent.evolve_with_ai(dna, days_passed=1)
-            story = agent.generate_evolution_story(dna, evolved_dna)
+            evolved_dna, story = agent.evolve_with_story(dna, days_passed=1)
+            usage = agent.usage_summary()
+            console.print(
+                f"[dim]📊 {usage['calls']} AI call(s), "
+                f"{'~' if usage['estimated'] else ''}{usage['prompt_tokens']} prompt + "
+                f"{usage['completion_tokens']} completion tokens, {usage['latency_ms']:.0f}ms[/dim]"
+            )
         except Exception as e:
             console.print(f"[yellow]⚠️  AI evolution failed: {e}[/yellow]")
             console.print("[cyan]🎲 Falling back to random evolution...[/cyan]")
@@ -165,18 +270,15 @@ def evolve(ai, strength):
     storage.save_dna_locally(evolved_dna)
     storage.save_stats(evolved_dna, age_days=0)  # TODO: calculate actual age
     
-    # Generate new visualization
-    svg = MonkeyVisualizer.generate_svg(evolved_dna)
+    # An unchanged monkey keeps its current render and gets no new snapshot
     svg_file = Path("monkey_data/monkey.svg")
-    svg_file.write_text(svg)
-    
-    # Archive with timestamp (using UTC for consistency)
-    from datetime import datetime, timezone
-    timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d_%H-%M")
-    svg_filename = f"{timestamp}_monkey.svg"
-    archive_file = Path(f"monkey_evolution/{svg_filename}")
-    archive_file.parent.mkdir(exist_ok=True)
-    archive_file.write_text(svg)
+    svg_filename = None
+    if changes or not svg_file.exists():
+        svg = MonkeyVisualizer.generate_svg(evolved_dna)
+        svg_file.write_text(svg)
+    if changes:
+        # Archive with timestamp (using UTC for consistency)
+        svg_filename = archive_snapshot(evolved_dna, svg)
     
     # Save history with SVG filename
     storage.save_history_entry(evolved_dna, story, svg_filename=svg_filename)
@@ -190,6 +292,9 @@ def evolve(ai, strength):
 @cli.command()
 def show():
     """Show current monkey stats"""
+    from rich.table import Table
+    from src.genetics import GeneticsEngine, TraitCategory
+    from src.storage import MonkeyStorage
     console.print("\n🐵 [bold cyan]Your Monkey[/bold cyan]\n")
     
     storage = MonkeyStorage()
@@ -268,8 +373,6 @@ def show():
     }
     
     # Get gen-locked traits for current generation
-    from src.genetics import GeneticsEngine
-    
     for cat, trait in dna.traits.items():
         color = rarity_colors.get(trait.rarity.value, 'white')
         
@@ -318,6 +421,8 @@ def show():
 @click.option('--limit', default=10, help='Number of entries to show')
 def history(limit):
     """Show evolution history"""
+    from rich.panel import Panel
+    from src.storage import MonkeyStorage
     console.print("\n📜 [bold cyan]Evolution History[/bold cyan]\n")
     
     storage = MonkeyStorage()
@@ -347,6 +452,8 @@ def history(limit):
 @cli.command()
 def visualize():
     """Generate and save monkey visualization"""
+    from src.storage import MonkeyStorage
+    from src.visualizer import MonkeyVisualizer
     console.print("\n🎨 [bold cyan]Generating visualization...[/bold cyan]\n")
     
     storage = MonkeyStorage()
@@ -362,11 +469,7 @@ def visualize():
     svg_file.write_text(svg)
     
     # Archive with timestamp (using UTC for consistency)
-    from datetime import datetime, timezone
-    timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d_%H-%M")
-    archive_file = Path(f"monkey_evolution/{timestamp}_monkey.svg")
-    archive_file.parent.mkdir(exist_ok=True)
-    archive_file.write_text(svg)
+    archive_file = f"monkey_evolution/{archive_snapshot(dna, svg)}"
     
     console.print(f"[green]✅ SVG saved to: {svg_file}[/green]")
     console.print(f"[dim]   Archived to: {archive_file}[/dim]")
@@ -383,6 +486,8 @@ def visualize():
 @cli.command()
 def update_readme():
     """Update README with current monkey"""
+    from src.storage import MonkeyStorage
+    from src.visualizer import MonkeyVisualizer
     console.print("\n📝 [bold cyan]Updating README...[/bold cyan]\n")
     
     storage = MonkeyStorage()
@@ -405,96 +510,15 @@ def update_readme():
     svg_file = Path("monkey_data/monkey.svg")
     svg_file.write_text(svg)
     
-    # Archive with timestamp (using UTC for consistency)
-    from datetime import datetime, timezone
-    timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d_%H-%M")
-    archive_file = Path(f"monkey_evolution/{timestamp}_monkey.svg")
-    archive_file.parent.mkdir(exist_ok=True)
-    archive_file.write_text(svg)
-    
-    # Update monkey display section with image reference
-    monkey_section = '''<!-- MONKEY_DISPLAY_START -->
-<div align="center">
-
-![Your Monkey](monkey_data/monkey.svg)
-
-</div>
-<!-- MONKEY_DISPLAY_END -->'''
-    
-    # Replace section
-    import re
-    pattern = r'<!-- MONKEY_DISPLAY_START -->.*?<!-- MONKEY_DISPLAY_END -->'
-    readme = re.sub(pattern, monkey_section, readme, flags=re.DOTALL)
-    
-    # Update stats section
-    history = storage.get_history()
-    age_days = len(history)
-    rarity = dna.get_rarity_score()
-    
-    # Calculate rarity tier for display
-    if rarity >= 80:
-        tier_emoji = "🦄"
-        tier_name = "LEGENDARY"
-    elif rarity >= 50:
-        tier_emoji = "💙"
-        tier_name = "RARE"
-    elif rarity >= 25:
-        tier_emoji = "💚"
-        tier_name = "UNCOMMON"
-    else:
-        tier_emoji = "⚪"
-        tier_name = "COMMON"
-    
-    stats_section = f'''<!-- MONKEY_STATS_START -->
-| Generation | Age | Mutations | Rarity Score |
-|:----------:|:---:|:---------:|:------------:|
-| {dna.generation} | {age_days} days | {dna.mutation_count} | {rarity:.1f}/100 |
-<!-- MONKEY_STATS_END -->'''
+    # Archive with timestamp (using UTC for consistency), unless the newest
+    # snapshot already shows this monkey (evolve archives every change)
+    from src.archive import SnapshotArchive
+    archive = SnapshotArchive()
+    latest = archive.latest()
+    if latest is None or archive.materialize(latest) != svg:
+        archive_snapshot(dna, svg)
     
-    pattern = r'<!-- MONKEY_STATS_START -->.*?<!-- MONKEY_STATS_END -->'
-    readme = re.sub(pattern, stats_section, readme, flags=re.DOTALL)
-    
-    # Update lineage stats section
-    # Get notable traits for breeding pitch
-    from src.genetics import Rarity
-    notable_traits = []
-    for cat, trait in dna.traits.items():
-        if trait.rarity in [Rarity.RARE, Rarity.LEGENDARY]:
-            notable_traits.append(f"**{trait.value.replace('_', ' ').title()}** ({trait.rarity.value})")
-    
-    if notable_traits:
-        traits_text = ", ".join(notable_traits[:2])  # Show top 2
-        lineage_section = f'''<!-- LINEAGE_STATS_START -->
-🧬 **Notable Traits:** {traits_text}
-
-🍴 Fork to inherit these rare genetics!
-<!-- LINEAGE_STATS_END -->'''
-    else:
-        lineage_section = '''<!-- LINEAGE_STATS_START -->
-🧬 **Lineage Stats:** This monkey has inspired a growing family tree!
-<!-- LINEAGE_STATS_END -->'''
-    
-    pattern = r'<!-- LINEAGE_STATS_START -->.*?<!-- LINEAGE_STATS_END -->'
-    if re.search(pattern, readme, flags=re.DOTALL):
-        readme = re.sub(pattern, lineage_section, readme, flags=re.DOTALL)
-    
-    # Update breeding boost section with urgency
-    import random
-    boost_messages = [
-        "⚡ **First 5 forks get +15% legendary trait inheritance!**",
-        "🔥 **Breeding boost active!** Fork now for enhanced trait inheritance.",
-        "✨ **Limited time:** Rare trait inheritance rates boosted!",
-        "🎯 **Today only:** Higher chance to inherit legendary traits!"
-    ]
-    boost_msg = random.choice(boost_messages)
-    
-    breeding_section = f'''<!-- BREEDING_BOOST_START -->
-{boost_msg}
-<!-- BREEDING_BOOST_END -->'''
-    
-    pattern = r'<!-- BREEDING_BOOST_START -->.*?<!-- BREEDING_BOOST_END -->'
-    if re.search(pattern, readme, flags=re.DOTALL):
-        readme = re.sub(pattern, breeding_section, readme, flags=re.DOTALL)
+    readme = update_readme_sections(readme, dna, age_days=len(storage.get_history()))
     
     # Save
     readme_file.write_text(readme)
@@ -508,6 +532,8 @@ def update_readme():
 @click.option('--achievement', '-a', type=str, help='Share specific achievement')
 def share(copy, evolution, achievement):
     """Generate a shareable tweet about your monkey"""
+    from rich.panel import Panel
+    from src.storage import MonkeyStorage
     console.print("\n🐦 [bold cyan]Generating shareable tweet...[/bold cyan]\n")
     
     storage = MonkeyStorage()
@@ -608,8 +634,18 @@ Fork yours free: github.com/{repo}
 
 @cli.command()
 @click.option('--copy', '-c', is_flag=True, help='Copy to clipboard')
-def share_card(copy):
+@click.option('--image', '-i', type=click.Path(dir_okay=False), help='Also export the monkey as PNG/WebP/JPEG to this path')
+def share_card(copy, image):
     """Generate a Wordle-style shareable evolution card"""
+    from rich.panel import Panel
+    from src.storage import MonkeyStorage
+    from src.visualizer import MonkeyVisualizer
+    if image:
+        from src.raster import format_for_path
+        try:
+            format_for_path(image)
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint="'--image'")
     console.print("\n🎨 [bold cyan]Generating Evolution Card...[/bold cyan]\n")
     
     storage = MonkeyStorage()
@@ -732,11 +768,58 @@ def share_card(copy):
     
     console.print(f"\n[dim]Share on Twitter:[/dim]")
     console.print(f"[link={twitter_url}]Click here to tweet[/link]")
+    
+    # Export a raster image to attach to the post
+    if image:
+        from src.raster import RasterExporter
+        try:
+            svg = MonkeyVisualizer.generate_svg(dna)
+            output = RasterExporter().export(svg, image, size=800)
+            console.print(f"\n[green]✅ Image saved to {output}[/green]")
+        except Exception as e:
+            console.print(f"\n[yellow]⚠️  Could not export image: {e}[/yellow]")
+
+
+@cli.command()
+@click.option('--output', '-o', default='web/og-monkey.png', help='Output image path')
+def og_preview(output):
+    """Render the current monkey as a social preview (Open Graph) image"""
+    from src.storage import MonkeyStorage
+    from src.visualizer import MonkeyVisualizer
+    console.print("\n🖼️  [bold cyan]Rendering preview image...[/bold cyan]\n")
+    
+    storage = MonkeyStorage()
+    dna = storage.load_dna()
+    
+    if not dna:
+        console.print("[red]❌ No monkey found! Run 'init' first.[/red]")
+        return
+    
+    from src.raster import RasterExporter, format_for_path
+    
+    output_file = Path(output)
+    try:
+        fmt = format_for_path(output_file)
+    except ValueError as e:
+        console.print(f"[red]❌ {e}[/red]")
+        return
+    svg = MonkeyVisualizer.generate_svg(dna)
+    
+    try:
+        data = RasterExporter().render_og_preview(svg, fmt=fmt)
+    except Exception as e:
+        console.print(f"[red]❌ Failed to render preview: {e}[/red]")
+        return
+    
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    output_file.write_bytes(data)
+    console.print(f"[green]✅ Preview saved to: {output_file}[/green]")
 
 
 @cli.command()
 def streak():
     """Show your evolution streak"""
+    from src.storage import MonkeyStorage
     console.print("\n🔥 [bold cyan]Evolution Streak[/bold cyan]\n")
     
     storage = MonkeyStorage()
@@ -787,6 +870,7 @@ def streak():
 @cli.command()
 def achievements():
     """Show unlocked achievements"""
+    from src.storage import MonkeyStorage
     console.print("\n🏆 [bold cyan]Achievements[/bold cyan]\n")
     
     storage = MonkeyStorage()
@@ -871,6 +955,8 @@ def achievements():
 @cli.command()
 def leaderboard():
     """Show your position on the rarity leaderboard"""
+    from rich.table import Table
+    from src.storage import MonkeyStorage
     console.print("\n🏆 [bold cyan]Rarity Leaderboard[/bold cyan]\n")
     
     storage = MonkeyStorage()
@@ -10,8 +10,53 @@ Supports multiple providers:
 import os
 import json
 import abc
-from typing import Optional, Dict, Any, List
+import time
+import random
+import hashlib
+import re
+import queue
+import asyncio
+import threading
+import weakref
+import contextlib
+from pathlib import Path
+from typing import Optional, Any, Iterator, List, Tuple
 from src.genetics import MonkeyDNA, GeneticsEngine, TraitCategory
+from src.prompts import PromptCompiler, CallUsage, Completion, estimate_tokens
+from src.rules import RulesModel
+from src.jsonstream import StreamingJSONParser, DecisionSchema, parse_stream
+
+
+# Monkeys packed into one batched request
+DEFAULT_BATCH_SIZE = 20
+
+# Per-call deadline in seconds (the SDK default is 10 minutes)
+DEFAULT_TIMEOUT = 60.0
+GITHUB_MODELS_URL = "https://models.inference.ai.azure.com"
+
+# Story for a day whose proposed changes were all rejected
+NO_CHANGE_STORY = "Your monkey had a quiet day - nothing about it changed."
+
+# Response cache defaults (AI_CACHE_TTL / AI_CACHE_MAX_MB override)
+CACHE_TTL = 7 * 24 * 3600
+CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Whether an AI call error is worth retrying
+    
+    Timeouts, connection failures, rate limits (429) and server errors (5xx)
+    are transient; anything else (bad key, invalid request) fails the same
+    way every time.
+    """
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, "status_code", None)
+    if isinstance(status, int):
+        return status in (408, 429) or status >= 500
+    # SDK connection and timeout errors carry no status code
+    return any(name in type(error).__name__ for name in ("Timeout", "Connection"))
 
 
 class AIProvider(abc.ABC):
@@ -26,23 +71,94 @@ class AIProvider(abc.ABC):
     def name(self) -> str:
         """Provider name"""
         pass
+    
+    def generate_json(self, prompt: str, max_tokens: int = 1024) -> str:
+        """Generate a response constrained to a JSON object where the provider supports it"""
+        return self.generate_response(prompt, max_tokens=max_tokens)
+    
+    async def agenerate_response(self, prompt: str, max_tokens: int = 1024) -> str:
+        """Async variant of generate_response (default: blocking call in a worker thread)"""
+        return await asyncio.to_thread(self.generate_response, prompt, max_tokens)
+    
+    async def agenerate_json(self, prompt: str, max_tokens: int = 1024) -> str:
+        """Async variant of generate_json (default: blocking call in a worker thread)"""
+        return await asyncio.to_thread(self.generate_json, prompt, max_tokens)
+    
+    def stream_json(self, prompt: str, max_tokens: int = 1024) -> Iterator[str]:
+        """
+        Stream a JSON answer in chunks (default: the whole answer as one chunk)
+        
+        Closing the generator early aborts the request. A final empty
+        Completion chunk may carry the token usage.
+        """
+        yield self.generate_json(prompt, max_tokens)
 
 
 class ClaudeProvider(AIProvider):
     """Anthropic Claude provider"""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, base_url: Optional[str] = None,
+                 timeout: float = DEFAULT_TIMEOUT, max_retries: int = 2):
         from anthropic import Anthropic
-        self.client = Anthropic(api_key=api_key)
+        self._client_args = {
+            "api_key": api_key, "base_url": base_url, "timeout": timeout, "max_retries": max_retries,
+        }
+        self.client = Anthropic(**self._client_args)
         self.model = "claude-3-5-sonnet-20241022"
+        self._async_clients = weakref.WeakKeyDictionary()
+    
+    def _async_client(self):
+        """Async client for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if loop not in self._async_clients:
+            from anthropic import AsyncAnthropic
+            self._async_clients[loop] = AsyncAnthropic(**self._client_args)
+        return self._async_clients[loop]
+    
+    def _message_args(self, prompt: str, max_tokens: int, json_mode: bool = False) -> dict:
+        """Request arguments shared by the sync and async clients"""
+        messages = [{"role": "user", "content": prompt}]
+        if json_mode:
+            # Prefilling the assistant turn with "{" keeps Claude to bare JSON
+            messages.append({"role": "assistant", "content": "{"})
+        return {"model": self.model, "max_tokens": max_tokens, "messages": messages}
+    
+    @staticmethod
+    def _completion(response, prefix: str = "") -> Completion:
+        """Response text with the reported token usage"""
+        usage = getattr(response, "usage", None)
+        return Completion(
+            prefix + response.content[0].text,
+            prompt_tokens=getattr(usage, "input_tokens", None),
+            completion_tokens=getattr(usage, "output_tokens", None),
+        )
     
     def generate_response(self, prompt: str, max_tokens: int = 1024) -> str:
-        response = self.client.messages.create(
-            model=self.model,
-            max_tokens=max_tokens,
-            messages=[{"role": "user", "content": prompt}]
+        response = self.client.messages.create(**self._message_args(prompt, max_tokens))
+        return self._completion(response)
+    
+    def generate_json(self, prompt: str, max_tokens: int = 1024) -> str:
+        response = self.client.messages.create(**self._message_args(prompt, max_tokens, json_mode=True))
+        return self._completion(response, prefix="{")
+    
+    async def agenerate_response(self, prompt: str, max_tokens: int = 1024) -> str:
+        response = await self._async_client().messages.create(**self._message_args(prompt, max_tokens))
+        return self._completion(response)
+    
+    async def agenerate_json(self, prompt: str, max_tokens: int = 1024) -> str:
+        response = await self._async_client().messages.create(
+            **self._message_args(prompt, max_tokens, json_mode=True)
         )
-        return response.content[0].text
+        return self._completion(response, prefix="{")
+    
+    def stream_json(self, prompt: str, max_tokens: int = 1024) -> Iterator[str]:
+        with self.client.messages.stream(**self._message_args(prompt, max_tokens, json_mode=True)) as stream:
+            # The request is sent on entering the context, so failures surface before the first chunk
+            yield "{"
+            yield from stream.text_stream
+            usage = getattr(stream.get_final_message(), "usage", None)
+            yield Completion("", prompt_tokens=getattr(usage, "input_tokens", None),
+                             completion_tokens=getattr(usage, "output_tokens", None))
     
     def name(self) -> str:
         return "Claude"
@@ -51,40 +167,643 @@ class ClaudeProvider(AIProvider):
 class GitHubProvider(AIProvider):
     """GitHub Models provider (via OpenAI-compatible endpoint)"""
     
-    def __init__(self, token: str, model: str = "gpt-4o"):
+    def __init__(self, token: str, model: str = "gpt-4o", base_url: str = GITHUB_MODELS_URL,
+                 timeout: float = DEFAULT_TIMEOUT, max_retries: int = 2):
         from openai import OpenAI
-        self.client = OpenAI(
-            base_url="https://models.inference.ai.azure.com",
-            api_key=token,
-        )
+        self._client_args = {
+            "base_url": base_url, "api_key": token, "timeout": timeout, "max_retries": max_retries,
+        }
+        self.client = OpenAI(**self._client_args)
         self.model = model
+        self._async_clients = weakref.WeakKeyDictionary()
+    
+    def _async_client(self):
+        """Async client for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if loop not in self._async_clients:
+            from openai import AsyncOpenAI
+            self._async_clients[loop] = AsyncOpenAI(**self._client_args)
+        return self._async_clients[loop]
+    
+    def _completion_args(self, prompt: str, max_tokens: int, json_mode: bool = False) -> dict:
+        """Request arguments shared by the sync and async clients"""
+        args = {
+            "messages": [{"role": "user", "content": prompt}],
+            "model": self.model,
+            "max_tokens": max_tokens,
+        }
+        if json_mode:
+            args["response_format"] = {"type": "json_object"}
+        return args
+        
+    @staticmethod
+    def _completion(response) -> Completion:
+        """Response text with the reported token usage"""
+        usage = getattr(response, "usage", None)
+        return Completion(
+            response.choices[0].message.content,
+            prompt_tokens=getattr(usage, "prompt_tokens", None),
+            completion_tokens=getattr(usage, "completion_tokens", None),
+        )
         
     def generate_response(self, prompt: str, max_tokens: int = 1024) -> str:
+        response = self.client.chat.completions.create(**self._completion_args(prompt, max_tokens))
+        return self._completion(response)
+
+    def generate_json(self, prompt: str, max_tokens: int = 1024) -> str:
         response = self.client.chat.completions.create(
-            messages=[{"role": "user", "content": prompt}],
-            model=self.model,
-            max_tokens=max_tokens,
+            **self._completion_args(prompt, max_tokens, json_mode=True)
+        )
+        return self._completion(response)
+
+    async def agenerate_response(self, prompt: str, max_tokens: int = 1024) -> str:
+        response = await self._async_client().chat.completions.create(
+            **self._completion_args(prompt, max_tokens)
+        )
+        return self._completion(response)
+
+    async def agenerate_json(self, prompt: str, max_tokens: int = 1024) -> str:
+        response = await self._async_client().chat.completions.create(
+            **self._completion_args(prompt, max_tokens, json_mode=True)
         )
-        return response.choices[0].message.content
+        return self._completion(response)
+
+    def stream_json(self, prompt: str, max_tokens: int = 1024) -> Iterator[str]:
+        stream = self.client.chat.completions.create(
+            stream=True, **self._completion_args(prompt, max_tokens, json_mode=True)
+        )
+        with stream:
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
 
     def name(self) -> str:
         return f"GitHub Models ({self.model})"
 
 
+class ResilientProvider(AIProvider):
+    """
+    Wraps one or more providers with per-call deadlines, retries with
+    jitter, bounded concurrency and optional hedging
+    
+    Without hedging, providers are tried in order (failover). With
+    hedge_delay set, the next provider is started whenever the current
+    ones haven't answered within hedge_delay seconds; the first answer
+    wins and the rest are cancelled.
+    """
+    
+    def __init__(self, providers: List[AIProvider], timeout: float = DEFAULT_TIMEOUT,
+                 retries: int = 2, backoff: float = 0.5, max_concurrency: int = 4,
+                 hedge_delay: Optional[float] = None):
+        if not providers:
+            raise ValueError("At least one provider is required")
+        self.providers = providers
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_concurrency = max_concurrency
+        self.hedge_delay = hedge_delay
+        self._semaphores = weakref.WeakKeyDictionary()
+        self._stream_slots = threading.BoundedSemaphore(max_concurrency)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+    
+    def name(self) -> str:
+        names = " + ".join(p.name() for p in self.providers)
+        return f"{names} (hedged)" if self.hedge_delay is not None and len(self.providers) > 1 else names
+    
+    def generate_response(self, prompt: str, max_tokens: int = 1024) -> str:
+        return self._run_sync(self.agenerate_response(prompt, max_tokens))
+    
+    def generate_json(self, prompt: str, max_tokens: int = 1024) -> str:
+        return self._run_sync(self.agenerate_json(prompt, max_tokens))
+    
+    async def agenerate_response(self, prompt: str, max_tokens: int = 1024) -> str:
+        return await self._call("agenerate_response", prompt, max_tokens)
+    
+    async def agenerate_json(self, prompt: str, max_tokens: int = 1024) -> str:
+        return await self._call("agenerate_json", prompt, max_tokens)
+    
+    def stream_json(self, prompt: str, max_tokens: int = 1024) -> Iterator[str]:
+        """
+        Stream from the first provider that starts answering
+        
+        Retries and failover apply until the first chunk arrives; a stream
+        that breaks after that raises. Each stream must finish within the
+        deadline, including stalls before or between chunks. With hedging
+        on, the answer comes whole from the hedged path instead, since a
+        race can't be handed over halfway through a stream.
+        """
+        if self.hedge_delay is not None and len(self.providers) > 1:
+            yield self.generate_json(prompt, max_tokens)
+            return
+        
+        with self._stream_slots:
+            errors = []
+            for provider in self.providers:
+                deadline = time.monotonic() + self.timeout
+                for attempt in range(self.retries + 1):
+                    started = False
+                    try:
+                        for chunk in self._bounded_stream(provider, prompt, max_tokens, deadline):
+                            started = True
+                            yield chunk
+                        return
+                    except Exception as e:
+                        if started:
+                            raise
+                        remaining = deadline - time.monotonic()
+                        if attempt == self.retries or remaining <= 0 or not is_retryable(e):
+                            errors.append(f"{provider.name()}: {e}")
+                            break
+                        delay = self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+                        print(f"⚠️  {provider.name()} failed ({e}), retrying in {delay:.1f}s...")
+                        time.sleep(min(delay, remaining))
+            raise RuntimeError(f"All AI providers failed: {'; '.join(errors)}")
+    
+    def _bounded_stream(self, provider: AIProvider, prompt: str, max_tokens: int,
+                        deadline: float) -> Iterator[str]:
+        """
+        A provider's stream, cut off at the deadline even while it is stalled
+        
+        The provider is read on a helper thread so waiting for the next
+        chunk can time out; the helper closes the stream at its next chunk
+        once the consumer stops.
+        """
+        chunks: "queue.Queue[tuple]" = queue.Queue()
+        stop = threading.Event()
+        end = object()
+        
+        def pump():
+            try:
+                with contextlib.closing(provider.stream_json(prompt, max_tokens)) as stream:
+                    for chunk in stream:
+                        if stop.is_set():
+                            break
+                        chunks.put((chunk, None))
+                chunks.put((end, None))
+            except BaseException as e:
+                chunks.put((end, e))
+        
+        threading.Thread(target=pump, daemon=True).start()
+        try:
+            while True:
+                try:
+                    chunk, error = chunks.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    raise TimeoutError(f"{provider.name()} did not finish within {self.timeout:.0f}s")
+                if chunk is end:
+                    if error is not None:
+                        raise error
+                    return
+                yield chunk
+        finally:
+            stop.set()
+    
+    def _run_sync(self, coro):
+        """Run a coroutine on a private background loop (keeps async clients on one loop)"""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, daemon=True).start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+    
+    def _semaphore(self) -> asyncio.Semaphore:
+        """Concurrency limit for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphores[loop]
+    
+    async def _call(self, method: str, prompt: str, max_tokens: int) -> str:
+        """Dispatch one request under the concurrency limit"""
+        async with self._semaphore():
+            if self.hedge_delay is not None and len(self.providers) > 1:
+                return await self._hedged(method, prompt, max_tokens)
+            
+            errors = []
+            for provider in self.providers:
+                try:
+                    return await self._with_retries(provider, method, prompt, max_tokens)
+                except Exception as e:
+                    errors.append(f"{provider.name()}: {e}")
+            raise RuntimeError(f"All AI providers failed: {'; '.join(errors)}")
+    
+    async def _with_retries(self, provider: AIProvider, method: str, prompt: str, max_tokens: int) -> str:
+        """Call one provider, retrying transient errors with jittered backoff until the deadline"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        
+        for attempt in range(self.retries + 1):
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                return await asyncio.wait_for(getattr(provider, method)(prompt, max_tokens), remaining)
+            except asyncio.TimeoutError:
+                break
+            except Exception as e:
+                if attempt == self.retries or not is_retryable(e):
+                    raise
+                delay = self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+                print(f"⚠️  {provider.name()} failed ({e}), retrying in {delay:.1f}s...")
+                await asyncio.sleep(min(delay, max(0.0, deadline - loop.time())))
+        
+        raise TimeoutError(f"{provider.name()} did not answer within {self.timeout:.0f}s")
+    
+    async def _hedged(self, method: str, prompt: str, max_tokens: int) -> str:
+        """Race providers, starting each next one after hedge_delay without an answer"""
+        queue = list(self.providers)
+        names = {}
+        pending = set()
+        errors = []
+        
+        try:
+            while queue or pending:
+                if queue:
+                    provider = queue.pop(0)
+                    task = asyncio.ensure_future(self._with_retries(provider, method, prompt, max_tokens))
+                    names[task] = provider.name()
+                    pending.add(task)
+                
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=self.hedge_delay if queue else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    errors.append(f"{names[task]}: {task.exception()}")
+        finally:
+            for task in pending:
+                task.cancel()
+        
+        raise RuntimeError(f"All AI providers failed: {'; '.join(errors)}")
+
+
+class CachedProvider(AIProvider):
+    """
+    Content-hashed on-disk response cache in front of a provider
+    
+    Identical prompts get identical answers, which removes the model's
+    randomness. That's why the cache is opt-in: the salt is part of every
+    key, so a salt that changes (e.g. the date) gives fresh answers per
+    period while reruns within it are free.
+    """
+    
+    def __init__(self, provider: AIProvider, cache_dir: Optional[str] = None, salt: str = "",
+                 ttl: float = CACHE_TTL, max_bytes: int = CACHE_MAX_BYTES):
+        self.provider = provider
+        self.cache_dir = Path(cache_dir or os.getenv("AI_CACHE_DIR", ".ai_cache"))
+        self.salt = salt
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+    
+    def name(self) -> str:
+        return self.provider.name()
+    
+    def cache_key(self, method: str, prompt: str, max_tokens: int) -> str:
+        """Hash of everything that determines the response"""
+        material = json.dumps([self.provider.name(), method, max_tokens, self.salt, prompt])
+        return hashlib.sha256(material.encode()).hexdigest()
+    
+    def cache_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+    
+    def generate_response(self, prompt: str, max_tokens: int = 1024) -> str:
+        return self._cached("generate_response", prompt, max_tokens,
+                            lambda: self.provider.generate_response(prompt, max_tokens))
+    
+    def generate_json(self, prompt: str, max_tokens: int = 1024) -> str:
+        return self._cached("generate_json", prompt, max_tokens,
+                            lambda: self.provider.generate_json(prompt, max_tokens))
+    
+    async def agenerate_response(self, prompt: str, max_tokens: int = 1024) -> str:
+        return await self._acached("generate_response", prompt, max_tokens,
+                                   lambda: self.provider.agenerate_response(prompt, max_tokens))
+    
+    async def agenerate_json(self, prompt: str, max_tokens: int = 1024) -> str:
+        return await self._acached("generate_json", prompt, max_tokens,
+                                   lambda: self.provider.agenerate_json(prompt, max_tokens))
+    
+    def stream_json(self, prompt: str, max_tokens: int = 1024) -> Iterator[str]:
+        # Shares entries with generate_json
+        key = self.cache_key("generate_json", prompt, max_tokens)
+        response = self._read(key)
+        if response is not None:
+            yield response
+            return
+        
+        parts = []
+        try:
+            with contextlib.closing(self.provider.stream_json(prompt, max_tokens)) as stream:
+                for chunk in stream:
+                    parts.append(chunk)
+                    yield chunk
+        except GeneratorExit:
+            # Stopped early by the consumer: keep what arrived if it holds a usable answer
+            try:
+                parse_stream(parts)
+                usable = True
+            except ValueError:
+                usable = False
+            if usable:
+                self._write(key, "".join(parts))
+            raise
+        self._write(key, "".join(parts))
+    
+    def _cached(self, method: str, prompt: str, max_tokens: int, call) -> str:
+        key = self.cache_key(method, prompt, max_tokens)
+        response = self._read(key)
+        if response is None:
+            response = call()
+            self._write(key, response)
+        return response
+    
+    async def _acached(self, method: str, prompt: str, max_tokens: int, call) -> str:
+        key = self.cache_key(method, prompt, max_tokens)
+        response = self._read(key)
+        if response is None:
+            response = await call()
+            self._write(key, response)
+        return response
+    
+    def _read(self, key: str) -> Optional[str]:
+        """Cached response, or None when missing or expired"""
+        path = self.cache_path(key)
+        try:
+            entry = json.loads(path.read_text())
+        except (OSError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+        if time.time() - entry.get("created", 0) > self.ttl:
+            path.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+        # Touch for LRU eviction
+        os.utime(path)
+        self.hits += 1
+        return Completion(entry["response"], prompt_tokens=0, completion_tokens=0, cached=True)
+    
+    def _write(self, key: str, response: str):
+        """Atomically store a response, then evict down to the size bound"""
+        path = self.cache_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps({"created": time.time(), "response": response}))
+        os.replace(tmp, path)
+        self.evict()
+    
+    def evict(self):
+        """Drop expired entries, then least recently used ones while over max_bytes"""
+        now = time.time()
+        entries = []
+        for path in self.cache_dir.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if now - stat.st_mtime > self.ttl:
+                path.unlink(missing_ok=True)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+        
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+class RulesProvider(AIProvider):
+    """
+    Offline provider backed by the rules model
+    
+    Reads the monkeys out of a compiled evolution prompt and answers in the
+    same short-code format as an LLM would, in microseconds and without
+    network access. Used as AI_PROVIDER=rules, as the fallback when the
+    real providers fail, and for bulk simulations.
+    """
+    
+    MONKEY_LINE = re.compile(r"^(?:Monkey|(\d+)): gen (\d+), traits (.*)$", re.MULTILINE)
+    DAYS_LINE = re.compile(r"Days since last evolution: (\d+)")
+    CHANGE_LINE = re.compile(r"^(\w+): (\S+) → (\S+)$", re.MULTILINE)
+    
+    def __init__(self, seed: Optional[int] = None):
+        self.model = RulesModel(seed=seed)
+        self.letters = {letter: category for category, letter in self.model.registry.category_codes.items()}
+    
+    def name(self) -> str:
+        return "Rules (offline)"
+    
+    def _dna(self, generation: int, codes: str) -> MonkeyDNA:
+        """Rebuild DNA from a prompt's trait codes"""
+        traits = {}
+        for code in codes.split():
+            entry = self.model.registry.decode(code)
+            if entry is not None:
+                traits[entry.category.value] = entry.value
+            elif ":" in code and code[0] in self.letters:
+                # Values outside the pool are written as letter:value
+                traits[self.letters[code[0]].value] = code.split(":", 1)[1]
+        return GeneticsEngine.dna_from_traits(traits, generation=generation)
+    
+    def _answer(self, dna: MonkeyDNA, days: int) -> dict:
+        """Short-code answer for one monkey"""
+        decision = self.model.decide(dna, days)
+        codes = [
+            self.model.registry.code(TraitCategory(c["category"]), c["new_value"])
+            for c in decision["changes"]
+        ]
+        return {"c": codes, "s": decision["evolution_story"]}
+    
+    def generate_response(self, prompt: str, max_tokens: int = 1024) -> str:
+        days_match = self.DAYS_LINE.search(prompt)
+        days = int(days_match.group(1)) if days_match else 1
+        monkeys = self.MONKEY_LINE.findall(prompt)
+        
+        if not monkeys:
+            # Story request: "category: old → new" lines
+            moves = [
+                (TraitCategory(cat), old, new) for cat, old, new in self.CHANGE_LINE.findall(prompt)
+                if cat in TraitCategory._value2member_map_
+            ]
+            text = self.model.story(moves)
+        elif monkeys[0][0]:
+            text = json.dumps({"m": [
+                {"id": int(index), **self._answer(self._dna(int(gen), codes), days)}
+                for index, gen, codes in monkeys
+            ]})
+        else:
+            _, gen, codes = monkeys[0]
+            text = json.dumps(self._answer(self._dna(int(gen), codes), days))
+        
+        # Nothing is sent anywhere, so nothing is billed
+        return Completion(text, prompt_tokens=0, completion_tokens=0)
+
+
 class EvolutionAgent:
     """AI agent that evolves monkeys intelligently"""
     
-    def __init__(self, provider_type: str = "github", api_key: Optional[str] = None):
-        self.provider = self._setup_provider(provider_type, api_key)
+    def __init__(self, provider_type: str = "github", api_key: Optional[str] = None,
+                 provider: Optional[AIProvider] = None, fallback: Optional[str] = None):
+        self.provider = provider or self._setup_provider(provider_type, api_key)
+        # What to do when the AI can't decide: "rules" (offline model) or "random"
+        self.fallback = fallback or os.getenv("AI_FALLBACK", "rules")
+        self.rules = RulesModel()
+        self.prompts = PromptCompiler()
+        self.schema = DecisionSchema(self.prompts.registry)
+        self.usage: List[CallUsage] = []
+        self.usage_log = os.getenv("AI_USAGE_LOG")
+    
+    def _call(self, purpose: str, prompt: str, max_tokens: int = 1024, json_mode: bool = True) -> str:
+        """Call the provider, recording token counts and latency"""
+        method = self.provider.generate_json if json_mode else self.provider.generate_response
+        start = time.perf_counter()
+        text = method(prompt, max_tokens)
+        self._record_usage(purpose, prompt, text, time.perf_counter() - start)
+        return text
+    
+    def _stream_call(self, purpose: str, prompt: str, max_tokens: int = 1024,
+                     expected_items: Optional[int] = None) -> StreamingJSONParser:
+        """
+        Stream a JSON answer into the incremental parser
+        
+        The stream is closed as soon as the answer object is complete, or
+        once expected_items array entries (monkeys of a batch) have arrived,
+        so trailing prose and closing tokens are never waited for.
+        """
+        parser = StreamingJSONParser()
+        parts = []
+        start = time.perf_counter()
+        with contextlib.closing(self.provider.stream_json(prompt, max_tokens)) as stream:
+            for chunk in stream:
+                parts.append(chunk)
+                parser.feed(chunk)
+                if parser.complete or (expected_items and len(parser.items) >= expected_items):
+                    break
+        
+        # Usage travels on Completion chunks (a cache hit or a provider's final summary)
+        reported = [p for p in parts if getattr(p, "prompt_tokens", None) is not None]
+        text = Completion(
+            "".join(parts),
+            prompt_tokens=reported[-1].prompt_tokens if reported else None,
+            completion_tokens=reported[-1].completion_tokens if reported else None,
+            cached=any(getattr(p, "cached", False) for p in parts),
+        )
+        self._record_usage(purpose, prompt, text, time.perf_counter() - start)
+        return parser
+    
+    def _validated(self, decision: dict) -> dict:
+        """Decode short codes and drop changes outside the trait schema"""
+        # Count what was asked for before unknown codes and invalid changes are
+        # dropped, so a story about rejected changes isn't told
+        changes = decision.get("changes", decision.get("c"))
+        proposed = len(changes) if isinstance(changes, list) else 0
+        decision, problems = self.schema.validate(self.prompts.decode_decision(decision))
+        for problem in problems:
+            print(f"⚠️  Ignoring invalid change: {problem}")
+        decision["proposed"] = proposed
+        return decision
+    
+    @staticmethod
+    def _decision_story(dna: MonkeyDNA, evolved: MonkeyDNA, decision: dict) -> Optional[str]:
+        """The decision's story, unless it describes changes that were all rejected"""
+        if evolved is dna and decision.get("proposed"):
+            return NO_CHANGE_STORY
+        return decision.get("evolution_story")
+    
+    def _record_usage(self, purpose: str, prompt: str, text: str, elapsed: float):
+        """Store a usage record (estimated when the provider reports no counts)"""
+        prompt_tokens = getattr(text, "prompt_tokens", None)
+        completion_tokens = getattr(text, "completion_tokens", None)
+        estimated = prompt_tokens is None or completion_tokens is None
+        record = CallUsage(
+            purpose=purpose,
+            provider=self.provider.name(),
+            prompt_tokens=estimate_tokens(prompt) if prompt_tokens is None else prompt_tokens,
+            completion_tokens=estimate_tokens(text) if completion_tokens is None else completion_tokens,
+            latency_ms=round(elapsed * 1000, 1),
+            estimated=estimated,
+            cached=getattr(text, "cached", False),
+        )
+        self.usage.append(record)
+        
+        if self.usage_log:
+            with open(self.usage_log, "a") as f:
+                f.write(json.dumps({"timestamp": time.time(), **record.to_dict()}) + "\n")
+    
+    def usage_summary(self) -> dict:
+        """Totals over all recorded calls"""
+        return {
+            "calls": len(self.usage),
+            "cached_calls": sum(1 for u in self.usage if u.cached),
+            "prompt_tokens": sum(u.prompt_tokens for u in self.usage),
+            "completion_tokens": sum(u.completion_tokens for u in self.usage),
+            "latency_ms": round(sum(u.latency_ms for u in self.usage), 1),
+            "estimated": any(u.estimated for u in self.usage),
+        }
     
     def _setup_provider(self, provider_type: str, api_key: Optional[str]) -> AIProvider:
-        """Initialize the requested AI provider"""
+        """
+        Initialize the requested AI provider(s)
+        
+        provider_type may list several providers ("claude,github") for
+        failover, or for hedging when AI_HEDGE_DELAY is set. Deadlines,
+        retries and concurrency come from AI_TIMEOUT, AI_RETRIES and
+        AI_MAX_CONCURRENCY. AI_CACHE=1 adds the on-disk response cache.
+        """
+        types = [t.strip() for t in provider_type.split(",") if t.strip()]
+        timeout = float(os.getenv("AI_TIMEOUT", DEFAULT_TIMEOUT))
+        
+        providers = []
+        for ptype in types:
+            try:
+                # Retries are handled by ResilientProvider, not the SDK
+                providers.append(self._build_provider(ptype, api_key if len(types) == 1 else None,
+                                                      timeout=timeout))
+            except ValueError as e:
+                if len(types) == 1:
+                    raise
+                print(f"⚠️  Skipping provider {ptype}: {e}")
+        
+        if not providers:
+            raise ValueError(f"No usable AI provider in: {provider_type}")
+        
+        hedge_delay = os.getenv("AI_HEDGE_DELAY")
+        provider = ResilientProvider(
+            providers,
+            timeout=timeout,
+            retries=int(os.getenv("AI_RETRIES", "2")),
+            max_concurrency=int(os.getenv("AI_MAX_CONCURRENCY", "4")),
+            hedge_delay=float(hedge_delay) if hedge_delay else None,
+        )
+        
+        # Response cache is opt-in since it makes answers deterministic per salt
+        if os.getenv("AI_CACHE", "").lower() in ("1", "true", "yes"):
+            provider = CachedProvider(
+                provider,
+                salt=os.getenv("AI_CACHE_SALT", ""),
+                ttl=float(os.getenv("AI_CACHE_TTL", CACHE_TTL)),
+                max_bytes=int(float(os.getenv("AI_CACHE_MAX_MB", CACHE_MAX_BYTES / 1024 / 1024)) * 1024 * 1024),
+            )
+        return provider
+    
+    def _build_provider(self, provider_type: str, api_key: Optional[str], timeout: float) -> AIProvider:
+        """Initialize a single AI provider"""
         
         if provider_type == "claude":
             key = api_key or os.getenv("ANTHROPIC_API_KEY")
             if not key:
                 raise ValueError("ANTHROPIC_API_KEY not found")
-            return ClaudeProvider(key)
+            return ClaudeProvider(key, timeout=timeout, max_retries=0)
+            
+        elif provider_type == "rules":
+            return RulesProvider()
             
         elif provider_type == "github":
             # Use GITHUB_TOKEN or passed key
@@ -94,7 +813,7 @@ class EvolutionAgent:
             
             # Allow model selection via env env
             model = os.getenv("GITHUB_MODEL", "gpt-4o")
-            return GitHubProvider(token, model)
+            return GitHubProvider(token, model, timeout=timeout, max_retries=0)
             
         else:
             raise ValueError(f"Unknown provider type: {provider_type}")
@@ -103,141 +822,158 @@ class EvolutionAgent:
         """
         Use AI to intelligently evolve the monkey
         """
-        print(f"🧠 Evolving with {self.provider.name()}...")
+        evolved_dna, _ = self._evolve(dna, days_passed)
+        return evolved_dna
+    
+    def evolve_with_story(self, dna: MonkeyDNA, days_passed: int = 1) -> Tuple[MonkeyDNA, str]:
+        """
+        Evolve the monkey and tell its story from a single AI call
         
-        # Get current traits as readable format
-        current_traits = {
-            cat.value: {
-                "value": trait.value,
-                "rarity": trait.rarity.value
-            }
-            for cat, trait in dna.traits.items()
-        }
+        The decision already carries an evolution_story; a separate story
+        call is only made when the response lacks one.
+        """
+        evolved_dna, decision = self._evolve(dna, days_passed)
+        story = self._decision_story(dna, evolved_dna, decision or {})
+        if isinstance(story, str) and story.strip():
+            return evolved_dna, story.strip()
+        return evolved_dna, self.generate_evolution_story(dna, evolved_dna)
+    
+    def _evolve(self, dna: MonkeyDNA, days_passed: int) -> Tuple[MonkeyDNA, Optional[dict]]:
+        """Run one evolution call, returning the evolved DNA and the decision (None on random fallback)"""
+        print(f"🧠 Evolving with {self.provider.name()}...")
         
-        # Create prompt
-        prompt = self._create_evolution_prompt(current_traits, days_passed, dna.generation)
+        prompt = self.prompts.evolution_prompt(dna, days_passed)
         
         try:
-            # Call AI
-            response_text = self.provider.generate_response(prompt)
-            
-            # Parse response
-            evolution_decision = self._parse_ai_response(response_text)
+            # Stream the AI answer, stopping once the decision is complete
+            parser = self._stream_call("evolve", prompt)
+            evolution_decision = self._validated(parser.result())
             
             # Apply AI-suggested changes
             evolved_dna = self._apply_evolution(dna, evolution_decision)
             
-            return evolved_dna
+            return evolved_dna, evolution_decision
             
         except Exception as e:
             print(f"⚠️  AI evolution failed: {e}")
-            print("   Falling back to random evolution...")
-            return GeneticsEngine.evolve(dna, evolution_strength=0.1)
-    
-    def _create_evolution_prompt(self, traits: dict, days: int, generation: int) -> str:
-        """Create prompt for AI"""
-        return f"""You are an AI evolution agent for ForkMonkey - a digital pet that lives on GitHub.
-
-Your task is to evolve this monkey's appearance in a subtle, aesthetically pleasing way.
-
-Current Monkey Traits:
-{json.dumps(traits, indent=2)}
-
-Context:
-- Generation: {generation}
-- Days since last evolution: {days}
-- Evolution should be subtle (1-2 traits max)
-- Maintain aesthetic coherence
-- Rarer traits should change less frequently
-
-Available trait options:
-- body_color: brown, tan, beige, gray, golden, silver, copper, bronze, blue, purple, green, pink, rainbow, galaxy, holographic, crystal
-- face_expression: happy, neutral, curious, sleepy, excited, mischievous, wise, cool, surprised, laughing, winking, zen, enlightened, cosmic, legendary, divine
-- accessory: none, simple_hat, bandana, bow, sunglasses, crown, headphones, monocle, laser_eyes, halo, horns, wizard_hat, golden_crown, diamond_chain, jetpack, wings
-- pattern: solid, spots, stripes, gradient, swirls, stars, hearts, diamonds, fractals, nebula, lightning, flames, aurora, quantum, cosmic_dust, void
-- background: white, blue_sky, green_grass, sunset, forest, beach, mountains, city, space, underwater, volcano, aurora, multiverse, black_hole, dimension_rift, heaven
-- special: none, sparkles, glow, shadow, aura, particles, energy, transcendent, godlike, mythical
-
-Rarity levels (from common to legendary):
-- common (60% chance): Basic traits
-- uncommon (25% chance): Special traits
-- rare (10% chance): Unique traits
-- legendary (5% chance): Ultra-rare traits
-
-Respond with a JSON object ONLY (no markdown formatting) indicating which traits to change:
-{{
-  "changes": [
-    {{
-      "category": "body_color",
-      "new_value": "golden",
-      "new_rarity": "uncommon",
-      "reason": "Subtle shift to warmer tone"
-    }}
-  ],
-  "evolution_story": "Your monkey is maturing, developing a golden sheen..."
-}}
-
-Keep changes minimal (0-2 traits). Consider the monkey's current aesthetic."""
-    
-    def _parse_ai_response(self, response_text: str) -> dict:
-        """Parse AI response"""
-        try:
-            # Clean up markdown code blocks if present
-            clean_text = response_text.replace("```json", "").replace("```", "").strip()
+            print(f"   Falling back to {self.fallback} evolution...")
+            evolved_dna, story = self._fallback_evolve(dna, days_passed)
+            return evolved_dna, {"evolution_story": story} if story else None
+    
+    def _fallback_evolve(self, dna: MonkeyDNA, days_passed: int) -> Tuple[MonkeyDNA, Optional[str]]:
+        """Evolve without the AI; the rules model also tells a story"""
+        if self.fallback == "random":
+            return GeneticsEngine.evolve(dna, evolution_strength=0.1), None
+        return self.rules.evolve(dna, days_passed)
+    
+    def evolve_batch(self, monkeys: List[MonkeyDNA], days_passed: int = 1,
+                     batch_size: int = DEFAULT_BATCH_SIZE) -> List[Tuple[MonkeyDNA, str]]:
+        """
+        Evolve many monkeys with one AI request per batch
+        
+        Each batch asks for a decision and a story per monkey, so there is
+        no second story call. Monkeys without a usable decision fall back
+        to the fallback (rules model or random) individually.
+        
+        Returns:
+            (evolved DNA, story) per input monkey, in order
+        """
+        results: List[Tuple[MonkeyDNA, str]] = []
+        for start in range(0, len(monkeys), batch_size):
+            chunk = monkeys[start:start + batch_size]
+            print(f"🧠 Evolving {len(chunk)} monkeys with {self.provider.name()}...")
             
-            # Extract JSON
-            start = clean_text.find('{')
-            end = clean_text.rfind('}') + 1
-            if start != -1 and end != -1:
-                json_str = clean_text[start:end]
-                return json.loads(json_str)
-            else:
-                raise ValueError("No JSON object found")
-        except Exception as e:
-            print(f"⚠️  Failed to parse AI response: {e}")
-            print(f"Raw response: {response_text[:100]}...")
-            return {"changes": [], "evolution_story": "No changes today."}
+            try:
+                prompt = self.prompts.batch_prompt(chunk, days_passed)
+                parser = self._stream_call("evolve_batch", prompt, max_tokens=min(4096, 256 + 120 * len(chunk)),
+                                           expected_items=len(chunk))
+                # Entries that arrived intact count even if the answer was cut off
+                answer = {"m": parser.items} if parser.items else parser.result()
+                decisions = {
+                    index: self._validated(decision)
+                    for index, decision in self.prompts.decode_batch(answer).items()
+                }
+            except Exception as e:
+                print(f"⚠️  Batch evolution failed: {e}")
+                decisions = {}
+            
+            fallbacks = 0
+            for index, dna in enumerate(chunk):
+                decision = decisions.get(index)
+                evolved = None
+                if decision is not None:
+                    try:
+                        evolved = self._apply_evolution(dna, decision)
+                    except Exception as e:
+                        print(f"⚠️  Monkey {start + index}: failed to apply decision: {e}")
+                if evolved is None:
+                    fallbacks += 1
+                    evolved, story = self._fallback_evolve(dna, days_passed)
+                    decision = {"evolution_story": story}
+                story = self._decision_story(dna, evolved, decision) or self._describe_changes(dna, evolved)
+                results.append((evolved, story))
+            
+            if fallbacks:
+                print(f"   Falling back to {self.fallback} evolution for {fallbacks}/{len(chunk)} monkeys")
+        
+        return results
     
     def _apply_evolution(self, dna: MonkeyDNA, decision: dict) -> MonkeyDNA:
-        """Apply AI-decided evolution"""
-        from src.genetics import Trait, Rarity
+        """
+        Apply AI-decided evolution
+        
+        Every change is checked against the trait registry in one pass:
+        unknown values and extinct gen-locked traits are rejected, names are
+        normalised, rarity comes from the pool rather than the model, and
+        only the first change per category counts. A decision without any
+        effective change returns the DNA unchanged.
+        """
+        from src.genetics import Trait
         
-        # Copy current traits
-        new_traits = {cat: trait.model_copy() for cat, trait in dna.traits.items()}
+        registry = self.prompts.registry
+        new_traits = dict(dna.traits)
+        touched = set()
         mutations = 0
         
-        # Apply changes
         for change in decision.get("changes", []):
-            try:
-                category = TraitCategory(change["category"])
-                new_value = change["new_value"]
-                new_rarity = Rarity(change["new_rarity"])
-                
-                # Create new trait
-                new_traits[category] = Trait(
-                    category=category,
-                    value=new_value,
-                    rarity=new_rarity
-                )
-                mutations += 1
-                
-            except Exception as e:
-                print(f"⚠️  Failed to apply change: {e}")
+            entry, problem = registry.resolve_change(change, dna.generation)
+            if problem:
+                print(f"⚠️  Rejected change: {problem}")
+                continue
+            if entry.category in touched:
+                print(f"⚠️  Rejected change: second change to {entry.category.value}")
+                continue
+            touched.add(entry.category)
+            
+            if new_traits[entry.category].value == entry.value:
+                continue
+            if change.get("new_rarity") != entry.rarity.value:
+                print(f"⚠️  Corrected rarity of {entry.value}: {change.get('new_rarity')} → {entry.rarity.value}")
+            
+            new_traits[entry.category] = Trait(
+                category=entry.category,
+                value=entry.value,
+                rarity=entry.rarity
+            )
+            mutations += 1
+        
+        if not mutations:
+            return dna
         
         # Create evolved DNA
         evolved = MonkeyDNA(
             generation=dna.generation,
             parent_id=dna.parent_id,
-            traits=new_traits,
+            traits={cat: trait.model_copy() for cat, trait in new_traits.items()},
             mutation_count=dna.mutation_count + mutations,
             birth_timestamp=dna.birth_timestamp
         )
         
         return evolved
     
-    def generate_evolution_story(self, old_dna: MonkeyDNA, new_dna: MonkeyDNA) -> str:
-        """Generate a story about the evolution"""
-        
+    @staticmethod
+    def _trait_changes(old_dna: MonkeyDNA, new_dna: MonkeyDNA) -> List[str]:
+        """Human-readable list of changed traits"""
         changes = []
         for category in TraitCategory:
             old_trait = old_dna.traits[category]
@@ -245,6 +981,20 @@ Keep changes minimal (0-2 traits). Consider the monkey's current aesthetic."""
             
             if old_trait.value != new_trait.value:
                 changes.append(f"{category.value}: {old_trait.value} → {new_trait.value}")
+        return changes
+    
+    @classmethod
+    def _describe_changes(cls, old_dna: MonkeyDNA, new_dna: MonkeyDNA) -> str:
+        """Plain story used when no AI story is available"""
+        changes = cls._trait_changes(old_dna, new_dna)
+        if not changes:
+            return "Your monkey rested today. No visible changes."
+        return f"Your monkey evolved! Changes: {', '.join(changes)}"
+    
+    def generate_evolution_story(self, old_dna: MonkeyDNA, new_dna: MonkeyDNA) -> str:
+        """Generate a story about the evolution"""
+        
+        changes = self._trait_changes(old_dna, new_dna)
         
         if not changes:
             return "Your monkey rested today. No visible changes."
@@ -257,9 +1007,9 @@ Changes that occurred:
 Make it fun and engaging, like a Tamagotchi update message."""
         
         try:
-            return self.provider.generate_response(prompt, max_tokens=256).strip()
+            return self._call("story", prompt, max_tokens=256, json_mode=False).strip()
         except:
-            return f"Your monkey evolved! Changes: {', '.join(changes)}"
+            return self._describe_changes(old_dna, new_dna)
 
 
 def main():
@@ -281,11 +1031,8 @@ def main():
     print("1. Generating random monkey...")
     dna = GeneticsEngine.generate_random_dna()
     
-    print("\n2. Evolving with AI...")
-    evolved = agent.evolve_with_ai(dna, days_passed=1)
-    
-    print("\n3. Generating evolution story...")
-    story = agent.generate_evolution_story(dna, evolved)
+    print("\n2. Evolving with AI (decision + story in one call)...")
+    _, story = agent.evolve_with_story(dna, days_passed=1)
     print(f"   {story}")
     
     print("\n✅ Evolution agent working!")
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+ForkMonkey Fleet Runner
+
+Evolves many monkeys in one process: the equivalent of `cli.py evolve`
+plus `cli.py update-readme` for every monkey directory, sharing one AI
+agent (batched requests), one render cache and one thread pool instead
+of a separate Actions job per monkey.
+
+Usage:
+    python src/fleet.py monkeys/*/ --ai --workers 8 --report fleet.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.genetics import GeneticsEngine, MonkeyDNA
+from src.storage import MonkeyStorage
+from src.visualizer import MonkeyVisualizer
+from src.cli import archive_snapshot, update_readme_sections
+
+
+DEFAULT_WORKERS = 8
+RENDER_CACHE_SIZE = 512
+
+
+def resolve_monkey_dir(path: Path) -> Optional[Path]:
+    """Repo root of a monkey, given the root itself or its monkey_data directory"""
+    if (path / "monkey_data" / "dna.json").exists():
+        return path
+    if path.name == "monkey_data" and (path / "dna.json").exists():
+        return path.parent
+    return None
+
+
+class RenderCache:
+    """Thread-safe LRU of rendered SVGs keyed by everything the render depends on"""
+
+    def __init__(self, size: int = RENDER_CACHE_SIZE):
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._svgs: "OrderedDict[tuple, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(dna: MonkeyDNA) -> tuple:
+        return (dna.dna_hash, dna.generation, tuple(sorted((c.value, t.value) for c, t in dna.traits.items())))
+
+    def render(self, dna: MonkeyDNA) -> str:
+        key = self.key(dna)
+        with self._lock:
+            if key in self._svgs:
+                self._svgs.move_to_end(key)
+                self.hits += 1
+                return self._svgs[key]
+            self.misses += 1
+
+        svg = MonkeyVisualizer.generate_svg(dna)
+        with self._lock:
+            self._svgs[key] = svg
+            if len(self._svgs) > self.size:
+                self._svgs.popitem(last=False)
+        return svg
+
+
+@dataclass
+class MonkeyResult:
+    """Outcome and timings of one monkey"""
+    directory: str
+    ok: bool = True
+    error: str = ""
+    dna_hash: str = ""
+    changes: List[str] = field(default_factory=list)
+    story: str = ""
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def total(self) -> float:
+        return sum(self.timings.values())
+
+
+class FleetRunner:
+    """Evolves and publishes a list of monkey directories"""
+
+    def __init__(self, directories: List[Path], ai: bool = False, strength: float = 0.1,
+                 provider_type: Optional[str] = None, workers: int = DEFAULT_WORKERS,
+                 batch_size: Optional[int] = None, agent=None):
+        self.directories = directories
+        self.ai = ai or agent is not None
+        self.strength = strength
+        self.provider_type = provider_type or os.getenv("AI_PROVIDER", "github")
+        self.workers = workers
+        self.batch_size = batch_size
+        self.agent = agent
+        self.renders = RenderCache()
+
+    def _load(self, directory: Path) -> Tuple[MonkeyResult, Optional[MonkeyStorage], Optional[MonkeyDNA]]:
+        result = MonkeyResult(directory=str(directory))
+        start = time.perf_counter()
+        storage = MonkeyStorage(data_dir=directory / "monkey_data")
+        dna = storage.load_dna()
+        result.timings["load"] = time.perf_counter() - start
+        if dna is None:
+            result.ok, result.error = False, "no dna.json"
+        return result, storage, dna
+
+    def _evolve_all(self, monkeys: List[MonkeyDNA]) -> Tuple[List[Tuple[MonkeyDNA, str]], float]:
+        """Evolve every monkey, batching AI requests through the shared agent"""
+        start = time.perf_counter()
+        evolved = None
+        if self.ai:
+            try:
+                if self.agent is None:
+                    from src.evolution import EvolutionAgent
+                    self.agent = EvolutionAgent(provider_type=self.provider_type)
+                kwargs = {"batch_size": self.batch_size} if self.batch_size else {}
+                evolved = self.agent.evolve_batch(monkeys, days_passed=1, **kwargs)
+            except Exception as e:
+                print(f"⚠️  AI evolution failed: {e}")
+                print("🎲 Falling back to random evolution...")
+        if evolved is None:
+            evolved = [
+                (GeneticsEngine.evolve(dna, evolution_strength=self.strength), "Your monkey evolved randomly!")
+                for dna in monkeys
+            ]
+        return evolved, time.perf_counter() - start
+
+    def _publish(self, directory: Path, storage: MonkeyStorage, old: MonkeyDNA,
+                 new: MonkeyDNA, story: str, result: MonkeyResult):
+        """Write DNA, stats, render, snapshot, history and README for one monkey"""
+        result.dna_hash = new.dna_hash
+        result.story = story
+        result.changes = [
+            f"{cat.value}: {old.traits[cat].value} → {trait.value}"
+            for cat, trait in new.traits.items()
+            if old.traits[cat].value != trait.value
+        ]
+
+        # An unchanged monkey keeps its current render and gets no new snapshot or history entry
+        svg_file = storage.data_dir / "monkey.svg"
+        svg = None
+        start = time.perf_counter()
+        if result.changes or not svg_file.exists():
+            svg = self.renders.render(new)
+        result.timings["render"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        storage.save_dna_locally(new)
+        storage.save_stats(new, age_days=0)
+        if svg is not None:
+            svg_file.write_text(svg)
+        if result.changes:
+            svg_filename = archive_snapshot(new, svg, evolution_dir=str(directory / "monkey_evolution"))
+            storage.save_history_entry(new, story, svg_filename=svg_filename)
+
+        readme_file = directory / "README.md"
+        if readme_file.exists():
+            readme = update_readme_sections(readme_file.read_text(), new, age_days=len(storage.get_history()))
+            readme_file.write_text(readme)
+        result.timings["write"] = time.perf_counter() - start
+
+    def _safe_publish(self, job) -> MonkeyResult:
+        directory, storage, old, new, story, result = job
+        try:
+            self._publish(directory, storage, old, new, story, result)
+        except Exception as e:
+            result.ok, result.error = False, str(e)
+        return result
+
+    def run(self) -> dict:
+        """
+        Evolve the whole fleet
+
+        Returns:
+            Report with per-monkey results and aggregate throughput
+        """
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            loaded = list(pool.map(self._load, self.directories))
+            ready = [(result, storage, dna) for result, storage, dna in loaded if dna is not None]
+
+            evolved, evolve_seconds = self._evolve_all([dna for _, _, dna in ready])
+            # The AI batch is shared; attribute its time evenly
+            share = evolve_seconds / len(ready) if ready else 0.0
+
+            jobs = []
+            for (result, storage, old), (new, story) in zip(ready, evolved):
+                result.timings["evolve"] = share
+                jobs.append((Path(result.directory), storage, old, new, story, result))
+            list(pool.map(self._safe_publish, jobs))
+
+        elapsed = time.perf_counter() - start
+        results = [result for result, _, _ in loaded]
+        succeeded = sum(1 for r in results if r.ok)
+        return {
+            "monkeys": len(results),
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded,
+            "seconds": round(elapsed, 3),
+            "evolve_seconds": round(evolve_seconds, 3),
+            "monkeys_per_second": round(succeeded / elapsed, 2) if elapsed else 0.0,
+            "render_cache": {"hits": self.renders.hits, "misses": self.renders.misses},
+            "ai_usage": self.agent.usage_summary() if self.agent is not None else None,
+            "results": [{**asdict(r), "total": round(r.total, 4)} for r in results],
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evolve many monkeys in one process")
+    parser.add_argument("directories", nargs="*", type=Path, help="Monkey repo roots or monkey_data directories")
+    parser.add_argument("--from-file", type=Path, help="File with one directory per line")
+    parser.add_argument("--ai", action="store_true", help="Use AI-powered evolution")
+    parser.add_argument("--strength", type=float, default=0.1, help="Random evolution strength (0-1)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="I/O and render threads")
+    parser.add_argument("--batch-size", type=int, help="Monkeys per AI request")
+    parser.add_argument("--report", type=Path, help="Write the JSON report here")
+    args = parser.parse_args()
+
+    candidates = list(args.directories)
+    if args.from_file:
+        candidates += [Path(line.strip()) for line in args.from_file.read_text().splitlines() if line.strip()]
+
+    directories = []
+    for path in candidates:
+        root = resolve_monkey_dir(path)
+        if root is None:
+            print(f"⚠️  Skipping {path}: no monkey_data/dna.json")
+        else:
+            directories.append(root)
+
+    if not directories:
+        print("❌ No monkeys to evolve")
+        sys.exit(1)
+
+    print(f"🐵 Evolving {len(directories)} monkeys...")
+    report = FleetRunner(directories, ai=args.ai, strength=args.strength,
+                         workers=args.workers, batch_size=args.batch_size).run()
+
+    print(f"\n{'monkey':<40}{'evolve':>9}{'render':>9}{'write':>9}{'total':>9}")
+    for r in report["results"]:
+        t = r["timings"]
+        status = "" if r["ok"] else f"  ❌ {r['error']}"
+        print(f"{Path(r['directory']).name[:39]:<40}{t.get('evolve', 0):>9.3f}{t.get('render', 0):>9.3f}"
+              f"{t.get('write', 0):>9.3f}{r['total']:>9.3f}{status}")
+
+    print(f"\n📊 {report['succeeded']}/{report['monkeys']} monkeys in {report['seconds']:.2f}s "
+          f"({report['monkeys_per_second']:.1f} monkeys/s), "
+          f"render cache {report['render_cache']['hits']} hits / {report['render_cache']['misses']} misses")
+
+    if args.report:
+        args.report.write_text(json.dumps(report, indent=2))
+        print(f"✅ Report written to {args.report}")
+
+    if report["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
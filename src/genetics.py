@@ -155,6 +155,51 @@ class GeneticsEngine:
                     available.extend(traits)
         return available
     
+    @classmethod
+    def find_rarity(cls, category: TraitCategory, value: str) -> Rarity:
+        """Look up the rarity of a trait value (gen-locked traits are legendary)"""
+        for rarity, values in cls.TRAIT_POOL.get(category, {}).items():
+            if value in values:
+                return rarity
+        
+        for values in cls.GEN_LOCKED_TRAITS.get(category, {}).values():
+            if value in values:
+                return Rarity.LEGENDARY
+        
+        # Default to common if not found
+        return Rarity.COMMON
+    
+    @classmethod
+    def dna_from_traits(cls, traits: Dict[str, str], generation: int = 1,
+                        mutation_count: int = 0, dna_hash: str = "") -> MonkeyDNA:
+        """
+        Rebuild DNA from plain trait values (as stored in history.json)
+        
+        Rarities are looked up from the trait pool. Passing the original
+        dna_hash keeps the visual seed identical to the original render.
+        """
+        rebuilt = {}
+        for cat_str, value in traits.items():
+            try:
+                category = TraitCategory(cat_str)
+            except ValueError:
+                continue
+            rebuilt[category] = Trait(
+                category=category,
+                value=value,
+                rarity=cls.find_rarity(category, value),
+                gene_sequence=f"regen_{value}"
+            )
+        
+        return MonkeyDNA(
+            generation=generation,
+            parent_id=None,
+            traits=rebuilt,
+            mutation_count=mutation_count,
+            birth_timestamp=0,
+            dna_hash=dna_hash
+        )
+    
     @classmethod
     def generate_random_dna(cls, generation: int = 1, parent_id: Optional[str] = None) -> MonkeyDNA:
         """Generate completely random DNA"""
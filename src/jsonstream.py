@@ -0,0 +1,176 @@
+"""
+ForkMonkey JSON Stream Parser
+
+Tolerant incremental parsing of model output. Text is fed as it streams
+in; prose and code fences around the JSON are skipped, objects inside the
+answer's top-level array are emitted as soon as they close (so a batch can
+stop the stream once every monkey is answered), and a truncated answer is
+repaired by closing whatever was left open.
+"""
+
+import re
+import json
+from typing import Iterable, List, Optional, Tuple
+
+from src.prompts import TraitRegistry
+
+
+TRAILING_COMMA = re.compile(r",(\s*[}\]])")
+DANGLING_TAIL = re.compile(r'(,\s*"(?:[^"\\]|\\.)*"\s*:?\s*|,\s*|:\s*)$')
+CLOSERS = {"{": "}", "[": "]"}
+
+
+def loads_lenient(text: str):
+    """json.loads that tolerates trailing commas"""
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return json.loads(TRAILING_COMMA.sub(r"\1", text))
+
+
+class StreamingJSONParser:
+    """
+    Incremental parser for the first JSON object in a model's output
+
+    feed() returns the objects that completed inside a top-level array
+    (e.g. each monkey of {"m": [...]}); `complete` turns true once the
+    top-level object itself has closed.
+    """
+
+    def __init__(self):
+        self.buffer: List[str] = []
+        self.stack: List[Tuple[str, int]] = []  # (opening bracket, buffer offset)
+        self.in_string = False
+        self.escape = False
+        self.started = False
+        self.complete = False
+        self.items: List[dict] = []
+        self._length = 0
+
+    def feed(self, text: str) -> List[dict]:
+        """Consume a chunk, returning newly completed array items"""
+        new_items = []
+        for char in text:
+            if self.complete:
+                break
+            if not self.started:
+                # Skip prose and ```json fences before the answer
+                if char != "{":
+                    continue
+                self.started = True
+
+            self.buffer.append(char)
+            self._length += 1
+
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif char == "\\":
+                    self.escape = True
+                elif char == '"':
+                    self.in_string = False
+                continue
+
+            if char == '"':
+                self.in_string = True
+            elif char in CLOSERS:
+                self.stack.append((char, self._length - 1))
+            elif char in "}]" and self.stack:
+                _, offset = self.stack.pop()
+                if not self.stack:
+                    self.complete = True
+                elif char == "}" and len(self.stack) == 2 and self.stack[-1][0] == "[":
+                    item = self._parse_span(offset)
+                    if isinstance(item, dict):
+                        self.items.append(item)
+                        new_items.append(item)
+        return new_items
+
+    def _parse_span(self, offset: int):
+        try:
+            return loads_lenient("".join(self.buffer[offset:]))
+        except json.JSONDecodeError:
+            return None
+
+    def text(self) -> str:
+        """The JSON text consumed so far"""
+        return "".join(self.buffer)
+
+    def result(self) -> dict:
+        """
+        The top-level object, closing brackets and strings of a truncated answer
+
+        Raises:
+            ValueError: No object was found or it can't be repaired
+        """
+        if not self.started:
+            raise ValueError("No JSON object found")
+
+        text = self.text()
+        if not self.complete:
+            if self.in_string:
+                text += "\\" if self.escape else ""
+                text += '"'
+            # Drop a half-written key or a dangling separator
+            text = DANGLING_TAIL.sub("", text)
+            text += "".join(CLOSERS[opener] for opener, _ in reversed(self.stack))
+
+        try:
+            parsed = loads_lenient(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Unrepairable JSON: {e}") from e
+        if not isinstance(parsed, dict):
+            raise ValueError("Top-level JSON value is not an object")
+        return parsed
+
+
+def parse_stream(chunks: Iterable[str]) -> dict:
+    """Parse the first JSON object out of a (possibly streamed) answer"""
+    parser = StreamingJSONParser()
+    for chunk in chunks:
+        parser.feed(chunk)
+        if parser.complete:
+            break
+    return parser.result()
+
+
+class DecisionSchema:
+    """Allowed categories and values of an evolution decision"""
+
+    def __init__(self, registry: Optional[TraitRegistry] = None):
+        self.registry = registry or TraitRegistry.default()
+
+    def check_change(self, change) -> Optional[str]:
+        """Problem with one change, or None when it fits the schema"""
+        # Rarity isn't checked: it is always taken from the pool when applied
+        _, problem = self.registry.resolve_change(change)
+        return problem
+
+    def validate(self, decision: dict) -> Tuple[dict, List[str]]:
+        """
+        Keep the parts of a (long-format) decision that fit the schema
+
+        Returns:
+            (cleaned decision, problems found)
+        """
+        problems = []
+        changes = decision.get("changes", [])
+        if not isinstance(changes, list):
+            problems.append("changes is not a list")
+            changes = []
+
+        valid = []
+        for change in changes:
+            problem = self.check_change(change)
+            if problem:
+                problems.append(problem)
+            else:
+                valid.append(change)
+
+        story = decision.get("evolution_story", "")
+        if not isinstance(story, str):
+            problems.append("evolution_story is not a string")
+            story = ""
+
+        cleaned = {**decision, "changes": valid, "evolution_story": story}
+        return cleaned, problems
@@ -0,0 +1,234 @@
+"""
+ForkMonkey Prompt Compiler
+
+Builds compact evolution prompts from the trait pool. Every trait gets a
+short code (category letter + index, e.g. "b4" = body_color golden) that
+the model answers with, so the catalogue is derived from
+GeneticsEngine.TRAIT_POOL / GEN_LOCKED_TRAITS and can't drift from it.
+"""
+
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Tuple
+
+from src.genetics import GeneticsEngine, MonkeyDNA, Rarity, TraitCategory
+
+
+RARITY_TIERS = {
+    Rarity.COMMON: "C",
+    Rarity.UNCOMMON: "U",
+    Rarity.RARE: "R",
+    Rarity.LEGENDARY: "L",
+}
+
+
+@dataclass(frozen=True)
+class TraitEntry:
+    """One catalogue entry"""
+    code: str
+    category: TraitCategory
+    value: str
+    rarity: Rarity
+    max_generation: Optional[int] = None  # gen-locked traits only
+
+
+class TraitRegistry:
+    """Indexed view of every known trait value"""
+
+    _default: Optional["TraitRegistry"] = None
+
+    def __init__(self, trait_pool: dict, gen_locked: dict):
+        self.category_codes: Dict[TraitCategory, str] = self._assign_category_codes()
+        self.entries: Dict[str, TraitEntry] = {}
+        self._by_value: Dict[Tuple[TraitCategory, str], TraitEntry] = {}
+        self._by_key: Dict[Tuple[TraitCategory, str], TraitEntry] = {}
+        self._categories = {self.normalize(c.value): c for c in TraitCategory}
+
+        for category in TraitCategory:
+            index = 0
+            values = [(value, rarity, None) for rarity, vals in trait_pool.get(category, {}).items() for value in vals]
+            values += [
+                (value, Rarity.LEGENDARY, max_gen)
+                for max_gen, vals in sorted(gen_locked.get(category, {}).items(), reverse=True)
+                for value in vals
+            ]
+            for value, rarity, max_gen in values:
+                if (category, value) in self._by_value:
+                    continue
+                entry = TraitEntry(f"{self.category_codes[category]}{index}", category, value, rarity, max_gen)
+                self.entries[entry.code] = entry
+                self._by_value[(category, value)] = entry
+                self._by_key[(category, self.normalize(value))] = entry
+                index += 1
+
+    @classmethod
+    def default(cls) -> "TraitRegistry":
+        """Registry for GeneticsEngine's trait pool (built once)"""
+        if cls._default is None:
+            cls._default = cls(GeneticsEngine.TRAIT_POOL, GeneticsEngine.GEN_LOCKED_TRAITS)
+        return cls._default
+
+    @staticmethod
+    def _assign_category_codes() -> Dict[TraitCategory, str]:
+        """One unique letter per category, preferring early letters of its name"""
+        codes = {}
+        for category in TraitCategory:
+            letter = next(c for c in category.value.replace("_", "") if c not in codes.values())
+            codes[category] = letter
+        return codes
+
+    def lookup(self, category: TraitCategory, value: str) -> Optional[TraitEntry]:
+        """Entry for a category/value pair"""
+        return self._by_value.get((category, value))
+
+    @staticmethod
+    def normalize(text) -> str:
+        """Match key for loosely written names ("Golden Crown" -> "golden_crown")"""
+        return "_".join(str(text).strip().lower().replace("-", " ").split())
+
+    def resolve_change(self, change, generation: Optional[int] = None) -> Tuple[Optional[TraitEntry], Optional[str]]:
+        """
+        Registry entry for a decision's change, or the reason it is invalid
+
+        Names are matched loosely, rarity is not trusted (the entry carries
+        the pool's), and gen-locked values are refused past their generation.
+        """
+        if not isinstance(change, dict):
+            return None, f"change is not an object: {change!r}"
+        category = self._categories.get(self.normalize(change.get("category", "")))
+        if category is None:
+            return None, f"unknown category {change.get('category')!r}"
+        entry = self._by_key.get((category, self.normalize(change.get("new_value", ""))))
+        if entry is None:
+            return None, f"unknown {category.value} value {change.get('new_value')!r}"
+        if generation is not None and entry.max_generation is not None and generation > entry.max_generation:
+            return None, f"{entry.value} is extinct after generation {entry.max_generation}"
+        return entry, None
+
+    def decode(self, code: str) -> Optional[TraitEntry]:
+        """Entry for a short code"""
+        return self.entries.get(str(code).strip())
+
+    def code(self, category: TraitCategory, value: str) -> str:
+        """Short code for a trait (falls back to category:value for unknown values)"""
+        entry = self.lookup(category, value)
+        return entry.code if entry else f"{self.category_codes[category]}:{value}"
+
+    def values(self, category: TraitCategory) -> List[TraitEntry]:
+        """Entries of one category in code order"""
+        return [e for e in self.entries.values() if e.category == category]
+
+    def catalogue(self) -> str:
+        """Compact catalogue, one line per category"""
+        lines = []
+        for category in TraitCategory:
+            groups: Dict[str, List[str]] = {}
+            for entry in self.values(category):
+                tier = f"G{entry.max_generation}" if entry.max_generation else RARITY_TIERS[entry.rarity]
+                groups.setdefault(tier, []).append(f"{entry.code[1:]} {entry.value}")
+            tiers = " | ".join(f"{tier}: {', '.join(items)}" for tier, items in groups.items())
+            lines.append(f"{self.category_codes[category]} {category.value} - {tiers}")
+        return "\n".join(lines)
+
+
+@dataclass
+class CallUsage:
+    """Token and latency record for one AI call"""
+    purpose: str
+    provider: str
+    prompt_tokens: int
+    completion_tokens: int
+    latency_ms: float
+    estimated: bool = False
+    cached: bool = False
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class Completion(str):
+    """Model output text carrying the provider-reported token usage"""
+
+    def __new__(cls, text: str, prompt_tokens: Optional[int] = None,
+                completion_tokens: Optional[int] = None, cached: bool = False):
+        obj = super().__new__(cls, text)
+        obj.prompt_tokens = prompt_tokens
+        obj.completion_tokens = completion_tokens
+        obj.cached = cached
+        return obj
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) when the provider reports none"""
+    return max(1, len(text) // 4)
+
+
+class PromptCompiler:
+    """Compiles evolution prompts and decodes short-code answers"""
+
+    def __init__(self, registry: Optional[TraitRegistry] = None):
+        self.registry = registry or TraitRegistry.default()
+
+    def _traits_line(self, dna: MonkeyDNA) -> str:
+        return " ".join(self.registry.code(cat, trait.value) for cat, trait in dna.traits.items())
+
+    def _header(self, days: int) -> str:
+        return f"""You evolve ForkMonkey, a digital pet that lives on GitHub.
+
+Trait catalogue (code = category letter + number, e.g. b4; tiers: C common, U uncommon, R rare, L legendary, GN only for generation <= N):
+{self.registry.catalogue()}
+
+Rules: change 0-2 traits per monkey, subtly and aesthetically coherent; rarer traits change less often; GN traits only if the monkey's generation <= N. Days since last evolution: {days}."""
+
+    def evolution_prompt(self, dna: MonkeyDNA, days: int = 1) -> str:
+        """Prompt for a single monkey"""
+        return f"""{self._header(days)}
+
+Monkey: gen {dna.generation}, traits {self._traits_line(dna)}
+
+Reply with JSON only: {{"c": ["<code>"], "s": "<whimsical 1-2 sentence story>"}}
+"c" lists the codes of the new traits ([] for no change)."""
+
+    def batch_prompt(self, monkeys: List[MonkeyDNA], days: int = 1) -> str:
+        """Prompt for several monkeys, identified by their position"""
+        lines = "\n".join(
+            f"{index}: gen {dna.generation}, traits {self._traits_line(dna)}"
+            for index, dna in enumerate(monkeys)
+        )
+        return f"""{self._header(days)}
+
+Monkeys (id: traits):
+{lines}
+
+Reply with JSON only, one entry per monkey id: {{"m": [{{"id": 0, "c": ["<code>"], "s": "<whimsical 1-2 sentence story>"}}]}}
+"c" lists the codes of the new traits ([] for no change)."""
+
+    def decode_decision(self, answer: dict) -> dict:
+        """
+        Expand a short-code answer into the decision format _apply_evolution takes
+
+        Answers already in the long format ("changes") pass through unchanged.
+        """
+        if "changes" in answer or "c" not in answer:
+            return answer
+
+        changes = []
+        for code in answer.get("c") or []:
+            entry = self.registry.decode(code)
+            if entry is None:
+                print(f"⚠️  Ignoring unknown trait code: {code}")
+                continue
+            changes.append({
+                "category": entry.category.value,
+                "new_value": entry.value,
+                "new_rarity": entry.rarity.value,
+            })
+        return {"changes": changes, "evolution_story": answer.get("s", "")}
+
+    def decode_batch(self, answer: dict) -> Dict[int, dict]:
+        """Decisions keyed by monkey id from a batched answer"""
+        items = answer.get("m", answer.get("monkeys", []))
+        return {
+            item["id"]: self.decode_decision(item)
+            for item in items
+            if isinstance(item, dict) and isinstance(item.get("id"), int)
+        }
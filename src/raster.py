@@ -0,0 +1,258 @@
+"""
+ForkMonkey Raster Export
+
+Renders monkey SVGs to PNG/WebP in-process (via cairosvg) instead of
+spawning rsvg-convert per frame. Rasters are cached on disk by SVG content
+hash, so re-running an export only rasterizes frames that are new.
+"""
+
+import io
+import os
+import hashlib
+import shutil
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+from src.genetics import MonkeyDNA
+
+
+DEFAULT_CACHE_DIR = Path(".raster_cache")
+SUPPORTED_FORMATS = ("png", "webp", "jpeg")
+# File suffixes that name a supported format differently
+FORMAT_ALIASES = {"jpg": "jpeg"}
+
+
+def svg_content_hash(svg: Union[str, bytes]) -> str:
+    """SHA-256 of the SVG markup, used as the raster cache key"""
+    if isinstance(svg, str):
+        svg = svg.encode()
+    return hashlib.sha256(svg).hexdigest()
+
+
+def _svg_to_png(svg_bytes: bytes, size: Optional[int] = None) -> bytes:
+    """Rasterize SVG markup to PNG bytes
+
+    Uses cairosvg when the cairo library is available and falls back to the
+    rsvg-convert CLI otherwise.
+    """
+    try:
+        import cairosvg
+    except (ImportError, OSError):
+        cairosvg = None
+
+    if cairosvg is not None:
+        return cairosvg.svg2png(
+            bytestring=svg_bytes,
+            output_width=size,
+            output_height=size,
+        )
+
+    if shutil.which("rsvg-convert"):
+        cmd = ["rsvg-convert"]
+        if size:
+            cmd += ["-w", str(size), "-h", str(size)]
+        result = subprocess.run(cmd, input=svg_bytes, capture_output=True, check=True)
+        return result.stdout
+
+    raise RuntimeError("No SVG rasterizer available (install cairo for cairosvg, or rsvg-convert)")
+
+
+def _encode(png_bytes: bytes, fmt: str, quality: int = 90) -> bytes:
+    """Convert PNG bytes to the requested output format"""
+    if fmt == "png":
+        return png_bytes
+
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    with Image.open(io.BytesIO(png_bytes)) as img:
+        if fmt == "jpeg":
+            # JPEG has no alpha channel; flatten onto white
+            img = img.convert("RGBA")
+            flat = Image.new("RGB", img.size, "white")
+            flat.paste(img, mask=img.getchannel("A"))
+            img = flat
+        img.save(buffer, format=fmt.upper(), quality=quality)
+    return buffer.getvalue()
+
+
+def format_for_path(path: Union[str, Path]) -> str:
+    """Raster format named by a file suffix (png when there is none)
+
+    Raises ValueError for suffixes that aren't a supported format.
+    """
+    suffix = Path(path).suffix.lstrip(".").lower() or "png"
+    fmt = FORMAT_ALIASES.get(suffix, suffix)
+    if fmt not in SUPPORTED_FORMATS:
+        raise ValueError(f"Unsupported image type .{suffix} (use .png, .webp or .jpg)")
+    return fmt
+
+
+def _render_job(job: tuple) -> bytes:
+    """Process pool entry point: (svg_bytes, size, fmt) -> raster bytes"""
+    svg_bytes, size, fmt = job
+    return _encode(_svg_to_png(svg_bytes, size), fmt)
+
+
+def rasterizer_available() -> bool:
+    """Check whether any SVG rasterizer backend can be used"""
+    try:
+        import cairosvg  # noqa: F401
+        return True
+    except (ImportError, OSError):
+        return shutil.which("rsvg-convert") is not None
+
+
+class RasterExporter:
+    """Renders SVGs to PNG/WebP with a content-addressed disk cache"""
+
+    def __init__(self, cache_dir: Optional[Union[str, Path]] = None, workers: Optional[int] = None):
+        """
+        Args:
+            cache_dir: Directory for cached rasters (defaults to MONKEY_RASTER_CACHE or .raster_cache)
+            workers: Process pool size for batch renders (defaults to CPU count)
+        """
+        self.cache_dir = Path(cache_dir or os.getenv("MONKEY_RASTER_CACHE") or DEFAULT_CACHE_DIR)
+        self.workers = workers or os.cpu_count() or 1
+        self.hits = 0
+        self.misses = 0
+
+    def cache_key(self, svg: Union[str, bytes], size: Optional[int] = None) -> str:
+        """Cache key for an SVG rendered at a given size"""
+        return f"{svg_content_hash(svg)}-{size or 'native'}"
+
+    def cache_path(self, key: str, fmt: str = "png") -> Path:
+        """On-disk location of a cached raster"""
+        return self.cache_dir / key[:2] / f"{key}.{fmt}"
+
+    def render(self, svg: Union[str, bytes], size: Optional[int] = None, fmt: str = "png") -> bytes:
+        """Render one SVG, reusing the cached raster when present"""
+        path = self.render_many([svg], size=size, fmt=fmt)[0]
+        if path is None:
+            raise RuntimeError("Failed to rasterize SVG")
+        return path.read_bytes()
+
+    def render_dna(self, dna: MonkeyDNA, size: Optional[int] = None, fmt: str = "png") -> bytes:
+        """Render a monkey straight from its DNA"""
+        from src.visualizer import MonkeyVisualizer
+
+        return self.render(MonkeyVisualizer.generate_svg(dna), size=size, fmt=fmt)
+
+    def render_files(self, paths: Iterable[Union[str, Path]], size: Optional[int] = None,
+                     fmt: str = "png") -> List[Optional[Path]]:
+        """Render SVG files, returning cached raster paths in input order"""
+        return self.render_many([Path(p).read_bytes() for p in paths], size=size, fmt=fmt)
+
+    def render_many(self, svgs: Iterable[Union[str, bytes]], size: Optional[int] = None,
+                    fmt: str = "png") -> List[Optional[Path]]:
+        """
+        Render many SVGs, rasterizing only cache misses (in parallel)
+
+        Returns the cached raster path for each input, or None where
+        rasterization failed.
+        """
+        if fmt not in SUPPORTED_FORMATS:
+            raise ValueError(f"Unsupported raster format: {fmt}")
+
+        svg_bytes = [s.encode() if isinstance(s, str) else s for s in svgs]
+        keys = [self.cache_key(s, size) for s in svg_bytes]
+
+        # Deduplicate misses so identical frames are only rendered once
+        pending: Dict[str, bytes] = {}
+        for key, data in zip(keys, svg_bytes):
+            if self.cache_path(key, fmt).exists() or key in pending:
+                self.hits += 1
+            else:
+                pending[key] = data
+        self.misses += len(pending)
+
+        failed = set()
+        if pending:
+            jobs = [(data, size, fmt) for data in pending.values()]
+            results = self._run_jobs(jobs)
+            for key, result in zip(pending.keys(), results):
+                if isinstance(result, Exception):
+                    print(f"⚠️  Failed to rasterize {key[:12]}: {result}")
+                    failed.add(key)
+                else:
+                    self._write_cache(key, fmt, result)
+
+        return [None if key in failed else self.cache_path(key, fmt) for key in keys]
+
+    def export(self, svg: Union[str, bytes], output: Union[str, Path], size: Optional[int] = None) -> Path:
+        """Render an SVG and write it to output (format taken from the suffix)"""
+        output = Path(output)
+        fmt = format_for_path(output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_bytes(self.render(svg, size=size, fmt=fmt))
+        return output
+
+    def render_og_preview(self, svg: Union[str, bytes], width: int = 1200, height: int = 630,
+                          background: str = "#0D1117", fmt: str = "png") -> bytes:
+        """Compose a social preview card with the monkey centered on a solid background"""
+        from PIL import Image
+
+        size = int(height * 0.9)
+        monkey = Image.open(io.BytesIO(self.render(svg, size=size))).convert("RGBA")
+
+        card = Image.new("RGBA", (width, height), background)
+        card.alpha_composite(monkey, ((width - size) // 2, (height - size) // 2))
+
+        buffer = io.BytesIO()
+        card.convert("RGB").save(buffer, format="JPEG" if fmt in ("jpg", "jpeg") else fmt.upper())
+        return buffer.getvalue()
+
+    def _run_jobs(self, jobs: List[tuple]) -> List[Union[bytes, Exception]]:
+        """Run render jobs inline or across a process pool"""
+        if len(jobs) == 1 or self.workers <= 1:
+            return [self._safe_render(job) for job in jobs]
+
+        results: List[Union[bytes, Exception]] = []
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(jobs))) as pool:
+            futures = [pool.submit(_render_job, job) for job in jobs]
+            for future in futures:
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    results.append(e)
+        return results
+
+    @staticmethod
+    def _safe_render(job: tuple) -> Union[bytes, Exception]:
+        try:
+            return _render_job(job)
+        except Exception as e:
+            return e
+
+    def _write_cache(self, key: str, fmt: str, data: bytes):
+        """Atomically write a raster into the cache"""
+        path = self.cache_path(key, fmt)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+
+def main():
+    """Test raster export"""
+    from src.genetics import GeneticsEngine
+
+    print("🖼️  ForkMonkey Raster Export Test\n")
+
+    if not rasterizer_available():
+        print("⚠️  No rasterizer available (cairo or rsvg-convert required)")
+        return
+
+    exporter = RasterExporter()
+    dna = GeneticsEngine.generate_random_dna()
+
+    png = exporter.render_dna(dna, size=200)
+    Path("test_monkey.png").write_bytes(png)
+    print(f"✅ PNG saved to test_monkey.png ({len(png)} bytes)")
+    print(f"   Cache: {exporter.hits} hits, {exporter.misses} misses")
+
+
+if __name__ == "__main__":
+    main()
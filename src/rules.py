@@ -0,0 +1,334 @@
+"""
+ForkMonkey Rules Model
+
+Offline stand-in for the evolution LLM. It follows the same brief as the
+prompt (0-2 changes a day, aesthetically coherent, rare traits change
+less often) using affinity tables precomputed from the trait pool and the
+visualizer's colors, so a decision takes microseconds and needs no network.
+"""
+
+import math
+import time
+import random
+import colorsys
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from src.genetics import GeneticsEngine, MonkeyDNA, Rarity, Trait, TraitCategory
+from src.prompts import TraitEntry, TraitRegistry
+from src.visualizer import MonkeyVisualizer
+
+
+# Traits that read as belonging together
+THEMES = {
+    "cosmic": {"galaxy", "cosmic", "nebula", "stars", "quantum", "cosmic_dust", "void", "space",
+               "black_hole", "multiverse", "dimension_rift", "particles", "energy", "aurora", "jetpack"},
+    "divine": {"crystal", "holographic", "enlightened", "divine", "halo", "wings", "heaven", "glow",
+               "aura", "transcendent", "godlike", "genesis_aura", "genesis_blessing", "origin_white"},
+    "nature": {"brown", "tan", "green", "green_grass", "forest", "mountains", "spots", "stripes",
+               "bandana", "simple_hat", "curious", "sleepy", "happy"},
+    "ocean": {"blue", "silver", "underwater", "beach", "blue_sky", "swirls", "gradient", "zen"},
+    "fire": {"copper", "bronze", "volcano", "flames", "lightning", "laser_eyes", "horns", "sunset",
+             "energy", "mischievous"},
+    "regal": {"golden", "genesis_gold", "crown", "golden_crown", "alpha_crown", "diamond_chain",
+              "diamonds", "monocle", "wise", "legendary", "founders_badge", "sparkles"},
+    "playful": {"pink", "rainbow", "prismatic", "hearts", "bow", "laughing", "winking", "excited",
+                "sparkles", "stars", "happy"},
+    "street": {"gray", "city", "sunglasses", "headphones", "cool", "shadow", "solid", "neutral"},
+    "mystic": {"purple", "wizard_hat", "fractals", "mythical", "zen", "wise", "aura", "early_spark",
+               "pioneer_glow", "surprised"},
+}
+
+THEME_WEIGHT = 1.0
+
+# Chance weight that a trait of this rarity is picked for change
+CHANGE_WEIGHT = {
+    Rarity.COMMON: 1.0,
+    Rarity.UNCOMMON: 0.6,
+    Rarity.RARE: 0.3,
+    Rarity.LEGENDARY: 0.1,
+}
+GEN_LOCKED_CHANGE_WEIGHT = 0.02
+
+# Weight of a replacement by how many rarity tiers it is away from the current one
+TIER_STEP_WEIGHT = (1.0, 0.3, 0.05, 0.01)
+
+# Share of each rarity in the pool (as rolled by GeneticsEngine._roll_rarity).
+# Replacements are weighted by share x change weight and accepted
+# Metropolis-style, which keeps a population's rarity mix at these shares
+# instead of drifting toward the sticky rare tiers.
+POOL_SHARE = {
+    Rarity.COMMON: 0.60,
+    Rarity.UNCOMMON: 0.25,
+    Rarity.RARE: 0.10,
+    Rarity.LEGENDARY: 0.05,
+}
+GEN_LOCKED_PICK_WEIGHT = 0.0005
+
+STORY_PHRASES = {
+    TraitCategory.BODY_COLOR: "its fur shimmered into {new}",
+    TraitCategory.FACE_EXPRESSION: "it now looks {new}",
+    TraitCategory.ACCESSORY: "it picked up a {new}",
+    TraitCategory.PATTERN: "it grew {new} markings",
+    TraitCategory.BACKGROUND: "it wandered off to a {new} scene",
+    TraitCategory.SPECIAL: "it started to radiate {new}",
+}
+DROP_PHRASES = {
+    TraitCategory.ACCESSORY: "it left its {old} behind",
+    TraitCategory.SPECIAL: "its {old} faded away",
+}
+
+
+def _hex_rgb(value: str) -> Optional[Tuple[float, float, float]]:
+    """#RRGGBB -> RGB floats (None for gradients and other paints)"""
+    if not value.startswith("#") or len(value) != 7:
+        return None
+    return tuple(int(value[i:i + 2], 16) / 255 for i in (1, 3, 5))
+
+
+def _trait_colors() -> Dict[Tuple[TraitCategory, str], Tuple[float, float, float]]:
+    """Representative color of body colors and single-color backgrounds"""
+    colors = {}
+    for name, cfg in MonkeyVisualizer.BODY_COLORS.items():
+        # Gradient bodies are represented by their shadow tone
+        rgb = _hex_rgb(cfg["main"]) or _hex_rgb(cfg["shadow"])
+        if rgb:
+            colors[(TraitCategory.BODY_COLOR, name)] = rgb
+    for name, cfg in MonkeyVisualizer.BACKGROUNDS.items():
+        rgb = _hex_rgb(cfg.get("color") or cfg.get("base") or "")
+        if rgb:
+            colors[(TraitCategory.BACKGROUND, name)] = rgb
+    return colors
+
+
+def color_affinity(body: Tuple[float, float, float], background: Tuple[float, float, float]) -> float:
+    """
+    Score a body/background color pair
+
+    A monkey that blends into its background is penalised; analogous or
+    complementary hues are rewarded.
+    """
+    luminance = lambda rgb: 0.2126 * rgb[0] + 0.7152 * rgb[1] + 0.0722 * rgb[2]
+    if abs(luminance(body) - luminance(background)) < 0.15:
+        return -1.0
+
+    h1, _, s1 = colorsys.rgb_to_hls(*body)
+    h2, _, s2 = colorsys.rgb_to_hls(*background)
+    if min(s1, s2) < 0.15:
+        return 0.0
+    distance = abs(h1 - h2) * 360
+    distance = min(distance, 360 - distance)
+    return 0.5 if distance < 30 or distance > 150 else 0.0
+
+
+class RulesModel:
+    """Precomputed affinity tables and the decision rules built on them"""
+
+    _tables: Optional[tuple] = None
+
+    def __init__(self, seed: Optional[int] = None, registry: Optional[TraitRegistry] = None):
+        self.rng = random.Random(seed)
+        self.registry = registry or TraitRegistry.default()
+        if registry is None:
+            if RulesModel._tables is None:
+                RulesModel._tables = self._build_tables(self.registry)
+            tables = RulesModel._tables
+        else:
+            tables = self._build_tables(registry)
+        self.candidates, self.affinity, self.step_weights, self.normalizers = tables
+
+    @staticmethod
+    def _build_tables(registry: TraitRegistry):
+        """
+        Precompute everything a decision needs
+
+        Returns:
+            (candidates per category, pairwise trait affinity,
+             replacement weight per (from, to) value, weight total per from value)
+        """
+        candidates = {category: registry.values(category) for category in TraitCategory}
+        themes: Dict[str, set] = {}
+        for theme, values in THEMES.items():
+            for value in values:
+                themes.setdefault(value, set()).add(theme)
+        colors = _trait_colors()
+
+        affinity = {}
+        entries = list(registry.entries.values())
+        for a in entries:
+            for b in entries:
+                if a.category == b.category:
+                    continue
+                score = THEME_WEIGHT * len(themes.get(a.value, set()) & themes.get(b.value, set()))
+                pair = {a.category: a, b.category: b}
+                body, background = pair.get(TraitCategory.BODY_COLOR), pair.get(TraitCategory.BACKGROUND)
+                if body and background:
+                    body_rgb = colors.get((body.category, body.value))
+                    background_rgb = colors.get((background.category, background.value))
+                    if body_rgb and background_rgb:
+                        score += color_affinity(body_rgb, background_rgb)
+                if score:
+                    affinity[(a.category, a.value, b.category, b.value)] = score
+
+        tiers = list(Rarity)
+        step_weights, normalizers = {}, {}
+        for category, options in candidates.items():
+            pooled = [e for e in options if e.max_generation is None]
+            tier_sizes = Counter(e.rarity for e in pooled)
+            for current in pooled:
+                total = 0.0
+                for entry in pooled:
+                    if entry is current:
+                        continue
+                    weight = (TIER_STEP_WEIGHT[abs(tiers.index(entry.rarity) - tiers.index(current.rarity))]
+                              * POOL_SHARE[entry.rarity] / tier_sizes[entry.rarity] * CHANGE_WEIGHT[entry.rarity])
+                    step_weights[(category, current.value, entry.value)] = weight
+                    total += weight
+                normalizers[(category, current.value)] = total
+        return candidates, affinity, step_weights, normalizers
+
+    def coherence(self, category: TraitCategory, value: str, traits: Dict[TraitCategory, str]) -> float:
+        """How well a value fits the other traits"""
+        return sum(
+            self.affinity.get((category, value, other, other_value), 0.0)
+            for other, other_value in traits.items()
+            if other != category
+        )
+
+    def _change_count(self, days_passed: int) -> int:
+        """0-2 changes, more likely to change after a longer break"""
+        days = max(1, days_passed)
+        none = 0.25 / days
+        two = min(0.4, 0.2 + 0.05 * (days - 1))
+        roll = self.rng.random()
+        return 0 if roll < none else 2 if roll > 1 - two else 1
+
+    def _pick_categories(self, dna: MonkeyDNA, traits: Dict[TraitCategory, str], count: int) -> List[TraitCategory]:
+        """Weighted draw without replacement; rare and well-fitting traits stay put"""
+        weights = {}
+        for category, trait in dna.traits.items():
+            entry = self.registry.lookup(category, trait.value)
+            base = GEN_LOCKED_CHANGE_WEIGHT if entry and entry.max_generation else CHANGE_WEIGHT[trait.rarity]
+            weights[category] = base * math.exp(-0.5 * self.coherence(category, trait.value, traits))
+
+        picked = []
+        for _ in range(min(count, len(weights))):
+            categories = list(weights)
+            category = self.rng.choices(categories, [weights[c] for c in categories])[0]
+            picked.append(category)
+            del weights[category]
+        return picked
+
+    def _pick_value(self, category: TraitCategory, current: Trait, generation: int,
+                    traits: Dict[TraitCategory, str]) -> Optional[TraitEntry]:
+        """Replacement value near the current rarity that fits the rest of the monkey"""
+        options, weights = [], []
+        for entry in self.candidates[category]:
+            if entry.value == current.value:
+                continue
+            if entry.max_generation is not None:
+                if generation > entry.max_generation:
+                    continue
+                base = GEN_LOCKED_PICK_WEIGHT
+            else:
+                base = self.step_weights.get((category, current.value, entry.value), GEN_LOCKED_PICK_WEIGHT)
+            options.append(entry)
+            weights.append(base * math.exp(self.coherence(category, entry.value, traits)))
+        if not options:
+            return None
+
+        entry = self.rng.choices(options, weights)[0]
+        # Moving to a value with more (heavier) neighbours is accepted less often
+        current_total = self.normalizers.get((category, current.value))
+        new_total = self.normalizers.get((category, entry.value))
+        if current_total and new_total and self.rng.random() > current_total / new_total:
+            return None
+        return entry
+
+    def decide(self, dna: MonkeyDNA, days_passed: int = 1) -> dict:
+        """Evolution decision in the format EvolutionAgent._apply_evolution takes"""
+        traits = {category: trait.value for category, trait in dna.traits.items()}
+        changes, moves = [], []
+
+        for category in self._pick_categories(dna, traits, self._change_count(days_passed)):
+            entry = self._pick_value(category, dna.traits[category], dna.generation, traits)
+            if entry is None:
+                continue
+            moves.append((category, traits[category], entry.value))
+            traits[category] = entry.value
+            changes.append({
+                "category": category.value,
+                "new_value": entry.value,
+                "new_rarity": entry.rarity.value,
+            })
+
+        return {"changes": changes, "evolution_story": self.story(moves)}
+
+    @staticmethod
+    def story(moves: List[Tuple[TraitCategory, str, str]]) -> str:
+        """Short story from (category, old, new) changes"""
+        if not moves:
+            return "Your monkey had a quiet day and stayed just as it was."
+        phrases = []
+        for category, old, new in moves:
+            template = DROP_PHRASES.get(category) if new == "none" else None
+            template = template or STORY_PHRASES[category]
+            phrases.append(template.format(old=old.replace("_", " "), new=new.replace("_", " ")))
+        if len(phrases) > 1:
+            phrases = [", ".join(phrases[:-1]), phrases[-1]]
+        return "Overnight " + " and ".join(phrases) + "!"
+
+    def evolve(self, dna: MonkeyDNA, days_passed: int = 1) -> Tuple[MonkeyDNA, str]:
+        """Apply one decision, returning the evolved DNA and its story"""
+        decision = self.decide(dna, days_passed)
+        traits = {category: trait.model_copy() for category, trait in dna.traits.items()}
+        for change in decision["changes"]:
+            category = TraitCategory(change["category"])
+            traits[category] = Trait(category=category, value=change["new_value"],
+                                     rarity=Rarity(change["new_rarity"]))
+        evolved = MonkeyDNA(
+            generation=dna.generation,
+            parent_id=dna.parent_id,
+            traits=traits,
+            mutation_count=dna.mutation_count + len(decision["changes"]),
+            birth_timestamp=dna.birth_timestamp
+        )
+        return evolved, decision["evolution_story"]
+
+    def simulate(self, monkeys: List[MonkeyDNA], days: int) -> List[MonkeyDNA]:
+        """Evolve every monkey once a day for a number of days"""
+        current = list(monkeys)
+        for _ in range(days):
+            current = [self.evolve(dna)[0] for dna in current]
+        return current
+
+
+def main():
+    """Bulk simulation: how a population drifts under the rules model"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Simulate evolution with the offline rules model")
+    parser.add_argument("--monkeys", type=int, default=1000, help="Population size")
+    parser.add_argument("--days", type=int, default=30, help="Days to simulate")
+    parser.add_argument("--seed", type=int, help="Random seed")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    model = RulesModel(seed=args.seed)
+    population = [GeneticsEngine.generate_random_dna() for _ in range(args.monkeys)]
+
+    start = time.perf_counter()
+    evolved = model.simulate(population, args.days)
+    elapsed = time.perf_counter() - start
+
+    steps = args.monkeys * args.days
+    print(f"🧬 {steps} evolutions in {elapsed:.2f}s ({elapsed / steps * 1e6:.0f}µs each)")
+    for label, monkeys in (("before", population), ("after", evolved)):
+        rarities = Counter(trait.rarity.value for dna in monkeys for trait in dna.traits.values())
+        total = sum(rarities.values())
+        mix = ", ".join(f"{r.value} {rarities[r.value] / total:.0%}" for r in Rarity)
+        print(f"📊 {label:<7} {mix}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,15 +8,32 @@ Generates multiple static JSON files for the web app:
 - web/leaderboard.json - Rarity rankings
 - web/family_tree.json - Fork genealogy
 - web/network_stats.json - Aggregate statistics
+
+List views (leaderboard, family tree) only carry a simplified thumbnail;
+the full SVG stays in community_data.json for detail views.
 """
 
 import os
+import sys
 import json
 from pathlib import Path
 from datetime import datetime, timezone
 from collections import Counter
 from github import Github, GithubException
 
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+try:
+    from src.genetics import GeneticsEngine
+    from src.visualizer import MonkeyVisualizer
+    HAS_VISUALIZER = True
+except ImportError:
+    HAS_VISUALIZER = False
+
+THUMB_SIZE = 96
+THUMB_DIR = Path("web/thumbs")
+
 
 def scan_community():
     """Main scanner function that generates all static data files."""
@@ -72,6 +89,9 @@ def scan_community():
         
         print(f"\n✨ Scan complete! Discovered {len(monkeys)} monkeys.")
         
+        if os.getenv("COMMUNITY_RASTER_THUMBS"):
+            generate_raster_thumbs(monkeys)
+        
         # Generate all output files
         generate_community_data(target_repo.full_name, monkeys)
         generate_leaderboard(monkeys)
@@ -169,6 +189,7 @@ def scan_repo(repo, root_name, degree=0):
             "updated_at": repo.updated_at.isoformat() if repo.updated_at else None,
             "monkey_stats": None,
             "monkey_svg": None,
+            "monkey_thumb": None,
             "monkey_dna": None
         }
         
@@ -196,6 +217,8 @@ def scan_repo(repo, root_name, degree=0):
         except Exception:
             pass
         
+        monkey_data["monkey_thumb"] = generate_thumb(monkey_data["monkey_dna"])
+        
         # Only return if we found at least stats or SVG
         if monkey_data["monkey_stats"] or monkey_data["monkey_svg"]:
             # Ensure basic stats if missing
@@ -215,6 +238,44 @@ def scan_repo(repo, root_name, degree=0):
         return None
 
 
+def generate_thumb(dna_data, size=THUMB_SIZE):
+    """Render a simplified thumbnail SVG from dna.json data (None if unavailable)."""
+    if not dna_data or not HAS_VISUALIZER:
+        return None
+    try:
+        dna = GeneticsEngine.dict_to_dna(dna_data)
+        return MonkeyVisualizer.generate_thumbnail(dna, size=size)
+    except Exception as e:
+        print(f"⚠️  Could not render thumbnail: {e}")
+        return None
+
+
+def generate_raster_thumbs(monkeys, size=THUMB_SIZE):
+    """Write small PNG thumbnails to web/thumbs/ and record their URLs.
+    
+    Optional tier for very large galleries (needs cairosvg or rsvg-convert).
+    """
+    from src.raster import RasterExporter, rasterizer_available
+    
+    if not rasterizer_available():
+        print("⚠️  No SVG rasterizer installed, skipping raster thumbnails")
+        return
+    
+    with_thumbs = [m for m in monkeys if m.get("monkey_thumb")]
+    exporter = RasterExporter()
+    paths = exporter.render_many([m["monkey_thumb"] for m in with_thumbs], size=size * 2)
+    
+    THUMB_DIR.mkdir(parents=True, exist_ok=True)
+    for monkey, path in zip(with_thumbs, paths):
+        if path is None:
+            continue
+        target = THUMB_DIR / f"{monkey['owner']}__{monkey['repo']}.png"
+        target.write_bytes(path.read_bytes())
+        monkey["monkey_thumb_url"] = f"thumbs/{target.name}"
+    
+    print(f"🖼️  Generated {sum(1 for m in monkeys if m.get('monkey_thumb_url'))} raster thumbnails")
+
+
 def generate_community_data(source_repo, monkeys):
     """Generate community_data.json with all fork data."""
     data = {
@@ -233,6 +294,17 @@ def generate_community_data(source_repo, monkeys):
     print(f"📊 Generated {output_file}")
 
 
+def list_view_image(monkey):
+    """Image fields for list views: thumbnail tier, full SVG only as a fallback."""
+    image = {"monkey_thumb": monkey.get("monkey_thumb")}
+    if monkey.get("monkey_thumb_url"):
+        image["monkey_thumb_url"] = monkey["monkey_thumb_url"]
+    if not image["monkey_thumb"]:
+        # Forks without dna.json can't be re-rendered as a thumbnail
+        image["monkey_svg"] = monkey.get("monkey_svg")
+    return image
+
+
 def generate_leaderboard(monkeys):
     """Generate leaderboard.json with rarity rankings."""
     # Sort by rarity score (descending)
@@ -258,7 +330,7 @@ def generate_leaderboard(monkeys):
             "is_root": monkey["is_root"],
             "degree": monkey.get("degree", 0),
             "degree_label": monkey.get("degree_label", "root"),
-            "monkey_svg": monkey.get("monkey_svg")
+            **list_view_image(monkey)
         })
     
     data = {
@@ -297,7 +369,7 @@ def generate_family_tree(root_name, monkeys):
                 "degree_label": monkey.get("degree_label", "root"),
                 "rarity_score": monkey.get("monkey_stats", {}).get("rarity_score", 0),
                 "generation": monkey.get("monkey_stats", {}).get("generation", 1),
-                "monkey_svg": monkey.get("monkey_svg")
+                **list_view_image(monkey)
             }
         
         # Add as child to parent
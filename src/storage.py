@@ -7,39 +7,63 @@ Handles DNA storage in GitHub Secrets and history in files.
 import os
 import json
 import base64
-from typing import Optional, Dict, List
+from typing import TYPE_CHECKING, Optional, Dict, List, Union
 from datetime import datetime
 from pathlib import Path
-from github import Github, GithubException
-from src.genetics import MonkeyDNA, GeneticsEngine
+
+if TYPE_CHECKING:
+    from src.genetics import MonkeyDNA
 
 
 class MonkeyStorage:
     """Manages monkey data storage"""
     
-    def __init__(self, repo_name: Optional[str] = None, github_token: Optional[str] = None):
+    def __init__(self, repo_name: Optional[str] = None, github_token: Optional[str] = None,
+                 data_dir: Union[str, Path] = "monkey_data"):
         self.repo_name = repo_name or os.getenv("GITHUB_REPOSITORY") or "test/repo"
         self.github_token = github_token or os.getenv("GITHUB_TOKEN")
         
-        self.data_dir = Path("monkey_data")
-        self.data_dir.mkdir(exist_ok=True)
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
         
-        # Initialize GitHub client if token available
-        self.github = None
-        self.repo = None
-        if self.github_token:
-            try:
-                self.github = Github(self.github_token)
-                self.repo = self.github.get_repo(self.repo_name)
-            except Exception as e:
-                print(f"⚠️  GitHub API not available: {e}")
+        # GitHub client and repo are created on first use (most commands never need them)
+        self._github = None
+        self._repo = None
+        self._connected = False
+    
+    def _connect(self):
+        """Create the GitHub client and fetch the repo once, if a token is available"""
+        if self._connected:
+            return
+        self._connected = True
+        if not self.github_token:
+            return
+        try:
+            from github import Github
+            self._github = Github(self.github_token)
+            self._repo = self._github.get_repo(self.repo_name)
+        except Exception as e:
+            print(f"⚠️  GitHub API not available: {e}")
+    
+    @property
+    def github(self):
+        """PyGithub client (None without a token)"""
+        self._connect()
+        return self._github
+    
+    @property
+    def repo(self):
+        """This monkey's repository (None when the API is unavailable)"""
+        self._connect()
+        return self._repo
     
-    def save_dna_to_secrets(self, dna: MonkeyDNA) -> bool:
+    def save_dna_to_secrets(self, dna: "MonkeyDNA") -> bool:
         """
         Save DNA to GitHub Secrets (private, only owner can see)
         
         Note: Requires GitHub API with secrets scope
         """
+        from src.genetics import GeneticsEngine
         if not self.repo:
             print("⚠️  GitHub API not available, saving locally only")
             return self.save_dna_locally(dna)
@@ -63,8 +87,9 @@ class MonkeyStorage:
             print(f"⚠️  Failed to save to secrets: {e}")
             return self.save_dna_locally(dna)
     
-    def save_dna_locally(self, dna: MonkeyDNA) -> bool:
+    def save_dna_locally(self, dna: "MonkeyDNA") -> bool:
         """Save DNA to local file"""
+        from src.genetics import GeneticsEngine
         try:
             dna_dict = GeneticsEngine.dna_to_dict(dna)
             
@@ -79,8 +104,9 @@ class MonkeyStorage:
             print(f"❌ Failed to save DNA: {e}")
             return False
     
-    def load_dna(self) -> Optional[MonkeyDNA]:
+    def load_dna(self) -> Optional["MonkeyDNA"]:
         """Load DNA from local file"""
+        from src.genetics import GeneticsEngine
         try:
             dna_file = self.data_dir / "dna.json"
             
@@ -99,7 +125,7 @@ class MonkeyStorage:
             print(f"❌ Failed to load DNA: {e}")
             return None
     
-    def save_history_entry(self, dna: MonkeyDNA, story: str = "", svg_filename: Optional[str] = None) -> bool:
+    def save_history_entry(self, dna: "MonkeyDNA", story: str = "", svg_filename: Optional[str] = None) -> bool:
         """Add entry to evolution history
         
         Args:
@@ -165,7 +191,7 @@ class MonkeyStorage:
             print(f"❌ Failed to load history: {e}")
             return []
     
-    def save_stats(self, dna: MonkeyDNA, age_days: int = 0) -> bool:
+    def save_stats(self, dna: "MonkeyDNA", age_days: int = 0) -> bool:
         """Save monkey statistics"""
         try:
             # Load existing stats to track streak
@@ -268,17 +294,19 @@ class MonkeyStorage:
             print(f"⚠️  Failed to detect fork: {e}")
             return None
     
-    def get_parent_dna(self, parent_repo: str) -> Optional[MonkeyDNA]:
+    def get_parent_dna(self, parent_repo: str) -> Optional["MonkeyDNA"]:
         """
         Fetch parent monkey's DNA from parent repository
         
         Args:
             parent_repo: Full repo name (owner/repo)
         """
+        from src.genetics import GeneticsEngine
         if not self.github:
             print("⚠️  GitHub API not available")
             return None
         
+        from github import GithubException
         try:
             parent = self.github.get_repo(parent_repo)
             
@@ -293,12 +321,13 @@ class MonkeyStorage:
             print(f"⚠️  Failed to fetch parent DNA: {e}")
             return None
     
-    def initialize_from_parent(self) -> Optional[MonkeyDNA]:
+    def initialize_from_parent(self) -> Optional["MonkeyDNA"]:
         """
         Initialize child monkey from parent (for forks)
         
         Returns child DNA if successful, None otherwise
         """
+        from src.genetics import GeneticsEngine
         parent_repo = self.detect_fork()
         
         if not parent_repo:
@@ -5,6 +5,7 @@ Generates SVG representations of monkeys based on their DNA.
 Modern, polished design with complete trait coverage.
 """
 
+import re
 import math
 from typing import Dict, List
 from src.genetics import MonkeyDNA, TraitCategory, Rarity
@@ -449,8 +450,44 @@ class MonkeyVisualizer:
 
     @classmethod
     def generate_thumbnail(cls, dna: MonkeyDNA, size: int = 100) -> str:
-        """Generate small thumbnail"""
-        return cls.generate_svg(dna, width=size, height=size)
+        """
+        Generate a simplified thumbnail for list views
+
+        Drawn on the full 400x400 canvas and scaled down via viewBox. Scene
+        elements, special effects, the badge and drop shadows are left out,
+        and only the defs the thumbnail references are kept.
+        """
+        w = h = 400
+        seed = int(dna.dna_hash[:8], 16) if dna.dna_hash else 12345
+        bg = cls.BACKGROUNDS.get(dna.traits[TraitCategory.BACKGROUND].value, cls.BACKGROUNDS["white"])
+        fill = bg.get("color") or bg.get("base") or f'url(#{bg["id"]})'
+
+        content = "\n".join([
+            f'<rect width="{w}" height="{h}" fill="{fill}"/>',
+            cls._generate_body(
+                dna.traits[TraitCategory.BODY_COLOR].value,
+                dna.traits[TraitCategory.PATTERN].value, w, h, seed
+            ),
+            cls._generate_face(dna.traits[TraitCategory.FACE_EXPRESSION].value, w, h),
+            cls._generate_accessory(dna.traits[TraitCategory.ACCESSORY].value, w, h),
+        ]).replace(' filter="url(#shadow)"', "")
+
+        return "\n".join([
+            f'<svg width="{size}" height="{size}" viewBox="0 0 {w} {h}" xmlns="http://www.w3.org/2000/svg">',
+            cls._referenced_defs(content),
+            content,
+            "</svg>",
+        ])
+
+    @classmethod
+    def _referenced_defs(cls, content: str) -> str:
+        """Subset of the shared defs that content actually references"""
+        used = [
+            m.group(0)
+            for m in re.finditer(r'<(\w+) id="([\w-]+)".*?</\1>', cls._generate_defs(), re.S)
+            if f"url(#{m.group(2)})" in content
+        ]
+        return "<defs>" + "".join(used) + "</defs>" if used else ""
 
 
 def main():
@@ -0,0 +1,127 @@
+"""
+Tests for incremental evolution animation
+"""
+
+import io
+import hashlib
+import pytest
+from PIL import Image
+
+from src import raster
+from src import animation
+from src.raster import RasterExporter
+from src.animation import FrameStore, encode_animation
+
+
+@pytest.fixture
+def fake_render(monkeypatch):
+    """Rasterize each SVG to a solid 16x16 PNG whose color depends on its markup"""
+    calls = []
+
+    def _fake(job):
+        svg_bytes, size, fmt = job
+        calls.append(svg_bytes)
+        color = tuple(hashlib.md5(svg_bytes).digest()[:3])
+        buffer = io.BytesIO()
+        Image.new("RGB", (16, 16), color).save(buffer, format="PNG")
+        return buffer.getvalue()
+
+    monkeypatch.setattr(raster, "_render_job", _fake)
+    return calls
+
+
+@pytest.fixture
+def store(temp_dir, fake_render):
+    """Frame store backed by a temporary raster cache"""
+    exporter = RasterExporter(cache_dir=temp_dir / "cache", workers=1)
+    return FrameStore(temp_dir / "frames.json", exporter=exporter)
+
+
+class TestFrameStore:
+    """Test persisted frame store"""
+
+    def test_sync_appends_only_new(self, store, fake_render):
+        """Test rerunning sync only rasterizes new snapshots"""
+        assert store.sync([("a.svg", "<svg>a</svg>"), ("b.svg", "<svg>b</svg>")]) == 2
+        assert store.sync([("a.svg", "<svg>a</svg>"), ("b.svg", "<svg>b</svg>"),
+                           ("c.svg", "<svg>c</svg>")]) == 1
+        assert len(fake_render) == 3
+        assert [e["source"] for e in store.entries] == ["a.svg", "b.svg", "c.svg"]
+
+    def test_manifest_persists(self, store, temp_dir):
+        """Test frames survive a reload"""
+        store.sync([("a.svg", "<svg>a</svg>")])
+        store.save()
+
+        reloaded = FrameStore(temp_dir / "frames.json", exporter=store.exporter)
+        assert len(reloaded.entries) == 1
+        assert reloaded.sync([("a.svg", "<svg>a</svg>")]) == 0
+
+    def test_size_change_discards_manifest(self, store, temp_dir):
+        """Test a manifest built at another size is ignored"""
+        store.sync([("a.svg", "<svg>a</svg>")])
+        store.save()
+
+        resized = FrameStore(temp_dir / "frames.json", exporter=store.exporter, size=64)
+        assert resized.entries == []
+
+    def test_dedupe_merges_consecutive(self, store):
+        """Test identical consecutive frames collapse into one longer frame"""
+        store.sync([
+            ("1.svg", "<svg>a</svg>"),
+            ("2.svg", "<svg>a</svg>"),
+            ("3.svg", "<svg>b</svg>"),
+            ("4.svg", "<svg>a</svg>"),
+        ], duration=100)
+
+        assert len(store.frames()) == 4
+        frames = store.frames(dedupe=True)
+        assert [d for _, d in frames] == [200, 100, 100]
+
+
+class TestEncoders:
+    """Test animation encoders"""
+
+    def test_gif_round_trip(self, store, temp_dir):
+        """Test streamed GIF has every frame and duration"""
+        store.sync([("1.svg", "<svg>a</svg>"), ("2.svg", "<svg>b</svg>")], duration=120)
+        output = temp_dir / "evolution.gif"
+        encode_animation(store.frames(), output, fmt="gif")
+
+        with Image.open(output) as gif:
+            assert gif.n_frames == 2
+            assert gif.info["duration"] == 120
+
+    def test_webp_without_ffmpeg(self, store, temp_dir, monkeypatch):
+        """Test WebP falls back to Pillow when ffmpeg is missing"""
+        monkeypatch.setattr(animation.shutil, "which", lambda name: None)
+        store.sync([("1.svg", "<svg>a</svg>"), ("2.svg", "<svg>b</svg>")])
+        output = temp_dir / "evolution.webp"
+        encode_animation(store.frames(), output, fmt="webp")
+
+        with Image.open(output) as webp:
+            assert webp.format == "WEBP"
+            assert webp.n_frames == 2
+
+    def test_mp4_requires_ffmpeg(self, store, temp_dir, monkeypatch):
+        """Test MP4 output reports a missing ffmpeg"""
+        monkeypatch.setattr(animation.shutil, "which", lambda name: None)
+        store.sync([("1.svg", "<svg>a</svg>")])
+        with pytest.raises(RuntimeError):
+            encode_animation(store.frames(), temp_dir / "evolution.mp4", fmt="mp4")
+
+    def test_mp4_rounds_to_even_size(self, store, temp_dir, monkeypatch):
+        """Test MP4 frames are scaled to even dimensions for yuv420p"""
+        commands = []
+        monkeypatch.setattr(animation.shutil, "which", lambda name: "/usr/bin/ffmpeg")
+        monkeypatch.setattr(animation.subprocess, "run", lambda args, **kwargs: commands.append(args))
+        store.sync([("1.svg", "<svg>a</svg>")])
+        encode_animation(store.frames(), temp_dir / "evolution.mp4", fmt="mp4")
+
+        args = commands[0]
+        assert args[args.index("-vf") + 1] == "scale=trunc(iw/2)*2:trunc(ih/2)*2"
+
+    def test_empty_frames_rejected(self, temp_dir):
+        """Test encoding nothing is an error"""
+        with pytest.raises(ValueError):
+            encode_animation([], temp_dir / "evolution.gif")
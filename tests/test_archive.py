@@ -0,0 +1,99 @@
+"""
+Tests for the compact snapshot archive
+"""
+
+import json
+import pytest
+from src.genetics import GeneticsEngine
+from src.visualizer import MonkeyVisualizer
+from src.archive import SnapshotArchive, archive_mode
+
+
+def history_entry(dna, filename):
+    """History entry in the shape written by MonkeyStorage"""
+    return {
+        "generation": dna.generation,
+        "dna_hash": dna.dna_hash,
+        "traits": {cat.value: trait.value for cat, trait in dna.traits.items()},
+        "svg_filename": filename,
+    }
+
+
+@pytest.fixture
+def evolution_dir(temp_dir):
+    """Directory with two reproducible snapshots and one legacy render"""
+    entries = []
+    for i in range(2):
+        dna = GeneticsEngine.generate_random_dna()
+        name = f"2025-01-0{i + 1}_00-00_monkey.svg"
+        (temp_dir / name).write_text(MonkeyVisualizer.generate_svg(dna))
+        entries.append(history_entry(dna, name))
+
+    # A render the current visualizer no longer produces
+    (temp_dir / "2025-01-03_00-00_monkey.svg").write_text("<svg>legacy</svg>")
+    (temp_dir / "2025-01-04_00-00_monkey.svg").write_text("<svg>legacy</svg>")
+    return temp_dir, entries
+
+
+class TestSnapshotArchive:
+    """Test archive compaction and materialization"""
+
+    def test_compact_round_trip(self, evolution_dir):
+        """Test compacted snapshots materialize to the original bytes"""
+        directory, entries = evolution_dir
+        originals = {p.name: p.read_text() for p in directory.glob("*.svg")}
+
+        stats = SnapshotArchive(directory).compact(entries)
+
+        assert stats["reproducible"] == 2
+        assert stats["stored_renders"] == 1
+        assert not list(directory.glob("*_monkey.svg"))
+
+        archive = SnapshotArchive(directory)
+        for name, svg in originals.items():
+            assert archive.materialize(name) == svg
+
+    def test_dry_run_changes_nothing(self, evolution_dir):
+        """Test dry run only reports"""
+        directory, entries = evolution_dir
+        stats = SnapshotArchive(directory).compact(entries, dry_run=True)
+
+        assert stats["snapshots"] == 4
+        assert len(list(directory.glob("*_monkey.svg"))) == 4
+        assert not (directory / "snapshots.json").exists()
+
+    def test_add_compact_mode(self, temp_dir, sample_dna):
+        """Test compact mode records traits instead of writing an SVG"""
+        archive = SnapshotArchive(temp_dir)
+        svg = MonkeyVisualizer.generate_svg(sample_dna)
+        archive.add("2025-02-01_00-00_monkey.svg", sample_dna, svg, mode="compact")
+
+        assert not (temp_dir / "2025-02-01_00-00_monkey.svg").exists()
+        index = json.loads((temp_dir / "snapshots.json").read_text())
+        assert "render" not in index["snapshots"]["2025-02-01_00-00_monkey.svg"]
+        assert SnapshotArchive(temp_dir).materialize("2025-02-01_00-00_monkey.svg") == svg
+
+    def test_materialize_all(self, evolution_dir, temp_dir):
+        """Test every snapshot is written back out"""
+        directory, entries = evolution_dir
+        archive = SnapshotArchive(directory)
+        archive.compact(entries)
+
+        assert archive.materialize_all(temp_dir / "out") == 4
+        assert archive.materialize("missing.svg") is None
+
+    def test_latest(self, evolution_dir, temp_dir):
+        """Test the newest snapshot is found whether loose or compacted"""
+        directory, entries = evolution_dir
+        assert SnapshotArchive(temp_dir / "empty").latest() is None
+        assert SnapshotArchive(directory).latest() == "2025-01-04_00-00_monkey.svg"
+
+        SnapshotArchive(directory).compact(entries)
+        assert SnapshotArchive(directory).latest() == "2025-01-04_00-00_monkey.svg"
+
+    def test_archive_mode_env(self, monkeypatch):
+        """Test archive mode falls back to full for unknown values"""
+        monkeypatch.setenv("MONKEY_ARCHIVE_MODE", "compact")
+        assert archive_mode() == "compact"
+        monkeypatch.setenv("MONKEY_ARCHIVE_MODE", "bogus")
+        assert archive_mode() == "full"
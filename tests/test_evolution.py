@@ -0,0 +1,752 @@
+"""
+Tests for the AI evolution agent (using fake providers, no network)
+"""
+
+import json
+import time
+import asyncio
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock
+from src.genetics import GeneticsEngine, TraitCategory
+from src.evolution import (
+    AIProvider, EvolutionAgent, ClaudeProvider, GitHubProvider, ResilientProvider, CachedProvider,
+    RulesProvider
+)
+from src.prompts import Completion
+from src.jsonstream import StreamingJSONParser
+
+
+class FakeProvider(AIProvider):
+    """Provider returning canned responses and recording prompts"""
+    
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.prompts = []
+    
+    def generate_response(self, prompt: str, max_tokens: int = 1024) -> str:
+        self.prompts.append(prompt)
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+    
+    def name(self) -> str:
+        return "Fake"
+
+
+def batch_response(decisions):
+    """Batched JSON response for {id: changes}"""
+    return json.dumps({"monkeys": [
+        {"id": i, "changes": changes, "evolution_story": f"story {i}"}
+        for i, changes in decisions.items()
+    ]})
+
+
+GOLDEN = [{"category": "body_color", "new_value": "golden", "new_rarity": "uncommon"}]
+
+
+class TestEvolveBatch:
+    """Test batched multi-monkey evolution"""
+    
+    def test_one_request_per_batch(self):
+        """Test a batch is a single call with per-monkey results"""
+        monkeys = [GeneticsEngine.generate_random_dna() for _ in range(3)]
+        provider = FakeProvider([batch_response({0: GOLDEN, 1: [], 2: GOLDEN})])
+        agent = EvolutionAgent(provider=provider)
+        
+        results = agent.evolve_batch(monkeys)
+        
+        assert len(provider.prompts) == 1
+        assert len(results) == 3
+        assert results[0][0].traits[TraitCategory.BODY_COLOR].value == "golden"
+        assert results[1][1] == "story 1"
+    
+    def test_missing_item_falls_back(self, monkeypatch):
+        """Test monkeys missing from the response evolve randomly"""
+        fallback_calls = []
+        original = GeneticsEngine.evolve
+        monkeypatch.setattr(GeneticsEngine, "evolve", classmethod(
+            lambda cls, dna, evolution_strength=0.1: fallback_calls.append(dna) or original(dna, evolution_strength)
+        ))
+        monkeys = [GeneticsEngine.generate_random_dna() for _ in range(2)]
+        agent = EvolutionAgent(provider=FakeProvider([batch_response({0: GOLDEN})]), fallback="random")
+        
+        results = agent.evolve_batch(monkeys)
+        
+        assert fallback_calls == [monkeys[1]]
+        assert results[0][1] == "story 0"
+    
+    def test_failed_request_falls_back(self):
+        """Test a provider error falls back for the whole batch"""
+        monkeys = [GeneticsEngine.generate_random_dna() for _ in range(2)]
+        agent = EvolutionAgent(provider=FakeProvider([RuntimeError("boom")]))
+        
+        results = agent.evolve_batch(monkeys)
+        
+        assert len(results) == 2
+        assert all(story for _, story in results)
+    
+    def test_batches_are_chunked(self):
+        """Test large fleets are split into several requests"""
+        monkeys = [GeneticsEngine.generate_random_dna() for _ in range(5)]
+        provider = FakeProvider([batch_response({0: []}), batch_response({0: []}), batch_response({0: []})])
+        
+        EvolutionAgent(provider=provider).evolve_batch(monkeys, batch_size=2)
+        
+        assert len(provider.prompts) == 3
+
+
+class TestEvolveWithStory:
+    """Test decision and story from a single call"""
+    
+    def test_single_call_when_story_present(self):
+        """Test the story in the decision is used without a second call"""
+        dna = GeneticsEngine.generate_random_dna()
+        provider = FakeProvider([json.dumps({"changes": GOLDEN, "evolution_story": "Shiny!"})])
+        
+        evolved, story = EvolutionAgent(provider=provider).evolve_with_story(dna)
+        
+        assert len(provider.prompts) == 1
+        assert story == "Shiny!"
+        assert evolved.traits[TraitCategory.BODY_COLOR].value == "golden"
+    
+    def test_story_call_when_missing(self):
+        """Test a second call is made only when the decision has no story"""
+        dna = GeneticsEngine.generate_random_dna()
+        dna.traits[TraitCategory.BODY_COLOR].value = "brown"
+        provider = FakeProvider([json.dumps({"changes": GOLDEN}), "A golden tale."])
+        
+        _, story = EvolutionAgent(provider=provider).evolve_with_story(dna)
+        
+        assert len(provider.prompts) == 2
+        assert story == "A golden tale."
+
+
+class TestRulesProvider:
+    """Test the offline rules-based provider"""
+    
+    def test_answers_single_prompt(self):
+        """Test a compiled single-monkey prompt gets a decodable answer"""
+        agent = EvolutionAgent(provider=RulesProvider(seed=7))
+        dna = GeneticsEngine.generate_random_dna()
+        
+        evolved, story = agent.evolve_with_story(dna)
+        
+        changed = agent._trait_changes(dna, evolved)
+        assert len(changed) <= 2
+        assert story
+        assert agent.usage_summary()["calls"] == 1
+    
+    def test_answers_batch_prompt(self):
+        """Test every monkey in a batch prompt is answered"""
+        monkeys = [GeneticsEngine.generate_random_dna() for _ in range(5)]
+        agent = EvolutionAgent(provider=RulesProvider(seed=7))
+        prompt = agent.prompts.batch_prompt(monkeys)
+        
+        parser = StreamingJSONParser()
+        parser.feed(agent.provider.generate_json(prompt))
+        decisions = agent.prompts.decode_batch(parser.result())
+        
+        assert sorted(decisions) == [0, 1, 2, 3, 4]
+    
+    def test_selected_by_provider_type(self, monkeypatch):
+        """Test AI_PROVIDER=rules needs no API key"""
+        monkeypatch.delenv("GITHUB_TOKEN", raising=False)
+        agent = EvolutionAgent(provider_type="rules")
+        assert "Rules" in agent.provider.name()
+    
+    def test_failed_call_uses_rules_fallback(self):
+        """Test a provider error falls back to the rules model and its story"""
+        dna = GeneticsEngine.generate_random_dna()
+        provider = FakeProvider([RuntimeError("boom")])
+        
+        _, story = EvolutionAgent(provider=provider, fallback="rules").evolve_with_story(dna)
+        
+        # No second (story) call to the failing provider
+        assert len(provider.prompts) == 1
+        assert story
+
+
+class TestApplyEvolution:
+    """Test changes are validated against the trait registry when applied"""
+    
+    def apply(self, dna, changes):
+        agent = EvolutionAgent(provider=FakeProvider([]))
+        return agent._apply_evolution(dna, {"changes": changes})
+    
+    def test_rarity_taken_from_pool(self):
+        """Test a claimed rarity can't inflate the rarity score"""
+        dna = GeneticsEngine.generate_random_dna()
+        dna.traits[TraitCategory.BODY_COLOR].value = "gray"
+        
+        evolved = self.apply(dna, [{"category": "body_color", "new_value": "tan", "new_rarity": "legendary"}])
+        
+        assert evolved.traits[TraitCategory.BODY_COLOR].rarity.value == "common"
+    
+    def test_names_normalised(self):
+        """Test loosely written names are repaired"""
+        dna = GeneticsEngine.generate_random_dna()
+        dna.traits[TraitCategory.ACCESSORY].value = "none"
+        
+        evolved = self.apply(dna, [{"category": "Accessory", "new_value": "Golden Crown", "new_rarity": "rare"}])
+        
+        assert evolved.traits[TraitCategory.ACCESSORY].value == "golden_crown"
+    
+    def test_extinct_and_duplicate_changes_rejected(self):
+        """Test gen-locked traits past their generation and repeat categories are refused"""
+        dna = GeneticsEngine.generate_random_dna(generation=9)
+        dna.traits[TraitCategory.PATTERN].value = "solid"
+        
+        evolved = self.apply(dna, [
+            {"category": "body_color", "new_value": "origin_white", "new_rarity": "legendary"},
+            {"category": "pattern", "new_value": "stars", "new_rarity": "uncommon"},
+            {"category": "pattern", "new_value": "void", "new_rarity": "legendary"},
+        ])
+        
+        assert evolved.traits[TraitCategory.BODY_COLOR].value != "origin_white"
+        assert evolved.traits[TraitCategory.PATTERN].value == "stars"
+        assert evolved.mutation_count == dna.mutation_count + 1
+    
+    def test_no_effective_change_returns_same_dna(self):
+        """Test invalid or no-op decisions leave the DNA untouched"""
+        dna = GeneticsEngine.generate_random_dna()
+        current = dna.traits[TraitCategory.FACE_EXPRESSION]
+        
+        evolved = self.apply(dna, [
+            {"category": "face_expression", "new_value": current.value, "new_rarity": current.rarity.value},
+            {"category": "body_color", "new_value": "plaid", "new_rarity": "rare"},
+        ])
+        
+        assert evolved is dna
+
+
+class StreamingFakeProvider(FakeProvider):
+    """Fake provider that streams its canned answers in chunks"""
+    
+    def __init__(self, responses, chunk_size=5):
+        super().__init__(responses)
+        self.chunk_size = chunk_size
+        self.chunks_read = 0
+    
+    def stream_json(self, prompt, max_tokens=1024):
+        text = self.generate_response(prompt, max_tokens)
+        for i in range(0, len(text), self.chunk_size):
+            self.chunks_read += 1
+            yield text[i:i + self.chunk_size]
+
+
+class TestStreaming:
+    """Test streamed answers and early stopping"""
+    
+    def test_stops_after_complete_decision(self):
+        """Test trailing text after the decision is never read"""
+        answer = json.dumps({"c": [], "s": "Calm."}) + " " + "blah " * 200
+        provider = StreamingFakeProvider([answer])
+        
+        _, story = EvolutionAgent(provider=provider).evolve_with_story(GeneticsEngine.generate_random_dna())
+        
+        assert story == "Calm."
+        assert provider.chunks_read < len(answer) // 5 // 2
+    
+    def test_batch_stops_when_all_monkeys_answered(self):
+        """Test a batch stream closes once every monkey has an entry"""
+        monkeys = [GeneticsEngine.generate_random_dna() for _ in range(2)]
+        answer = '{"m": [{"id": 0, "c": [], "s": "a"}, {"id": 1, "c": [], "s": "b"}' + " " * 500 + "]}"
+        provider = StreamingFakeProvider([answer])
+        
+        results = EvolutionAgent(provider=provider).evolve_batch(monkeys)
+        
+        assert [story for _, story in results] == ["a", "b"]
+        assert provider.chunks_read < 20
+    
+    def test_truncated_batch_keeps_finished_monkeys(self):
+        """Test a cut-off batch keeps the entries that arrived and falls back for the rest"""
+        monkeys = [GeneticsEngine.generate_random_dna() for _ in range(2)]
+        provider = FakeProvider(['{"m": [{"id": 0, "c": [], "s": "kept"}, {"id": 1, "c": ["b'])
+        
+        results = EvolutionAgent(provider=provider, fallback="rules").evolve_batch(monkeys)
+        
+        assert results[0][1] == "kept"
+        assert results[1][1] != "kept"
+    
+    def test_invalid_values_dropped(self):
+        """Test values outside the trait pool are not applied"""
+        dna = GeneticsEngine.generate_random_dna()
+        decision = {"changes": [{"category": "body_color", "new_value": "plaid", "new_rarity": "rare"}],
+                    "evolution_story": "Plaid!"}
+        
+        evolved, _ = EvolutionAgent(provider=FakeProvider([json.dumps(decision)])).evolve_with_story(dna)
+        
+        assert evolved.traits[TraitCategory.BODY_COLOR].value == dna.traits[TraitCategory.BODY_COLOR].value
+    
+    def test_all_changes_rejected_tells_no_change_story(self):
+        """Test a story about rejected changes is replaced and the DNA is untouched"""
+        from src.evolution import NO_CHANGE_STORY
+        dna = GeneticsEngine.generate_random_dna()
+        decision = {"changes": [{"category": "body_color", "new_value": "plaid", "new_rarity": "rare"}],
+                    "evolution_story": "Your monkey turned plaid!"}
+        
+        evolved, story = EvolutionAgent(provider=FakeProvider([json.dumps(decision)])).evolve_with_story(dna)
+        
+        assert evolved is dna
+        assert story == NO_CHANGE_STORY
+    
+    def test_unknown_codes_tell_no_change_story(self):
+        """Test a story about a short code that doesn't exist is replaced"""
+        from src.evolution import NO_CHANGE_STORY
+        dna = GeneticsEngine.generate_random_dna()
+        decision = {"c": ["b999"], "s": "Turned golden!"}
+        
+        evolved, story = EvolutionAgent(provider=FakeProvider([json.dumps(decision)])).evolve_with_story(dna)
+        
+        assert evolved is dna
+        assert story == NO_CHANGE_STORY
+    
+    def test_resilient_stream_fails_over(self):
+        """Test a provider failing before its first chunk is skipped"""
+        provider = ResilientProvider(
+            [StreamingFakeProvider([RuntimeError("down")]), StreamingFakeProvider(['{"c": []}'])],
+            retries=0,
+        )
+        assert "".join(provider.stream_json("p")) == '{"c": []}'
+    
+    def test_stalled_stream_cut_off_at_deadline(self):
+        """Test a stream that stops sending is abandoned at the deadline, before or mid-answer"""
+        class StallingProvider(FakeProvider):
+            def __init__(self, first_chunk):
+                super().__init__([])
+                self.first_chunk = first_chunk
+            
+            def stream_json(self, prompt, max_tokens=1024):
+                if self.first_chunk:
+                    yield self.first_chunk
+                time.sleep(2)
+                yield "}"
+        
+        fallback = StreamingFakeProvider(['{"c": []}'])
+        provider = ResilientProvider([StallingProvider(None), fallback], timeout=0.2, retries=0)
+        start = time.perf_counter()
+        assert "".join(provider.stream_json("p")) == '{"c": []}'
+        assert time.perf_counter() - start < 1
+        
+        provider = ResilientProvider([StallingProvider('{"c": ')], timeout=0.2, retries=0)
+        start = time.perf_counter()
+        with pytest.raises(TimeoutError):
+            "".join(provider.stream_json("p"))
+        assert time.perf_counter() - start < 1
+    
+    def test_hedged_stream_races_providers(self):
+        """Test AI_HEDGE_DELAY still races providers on the streaming path"""
+        class SlowProvider(StreamingFakeProvider):
+            def generate_response(self, prompt, max_tokens=1024):
+                time.sleep(1.5)
+                return super().generate_response(prompt, max_tokens)
+        
+        provider = ResilientProvider(
+            [SlowProvider(['{"c": [], "s": "slow"}']), StreamingFakeProvider(['{"c": [], "s": "fast"}'])],
+            hedge_delay=0.05,
+        )
+        start = time.perf_counter()
+        _, story = EvolutionAgent(provider=provider).evolve_with_story(GeneticsEngine.generate_random_dna())
+        
+        assert story == "fast"
+        assert time.perf_counter() - start < 1
+    
+    def test_cached_stream_keeps_early_stop(self, temp_dir):
+        """Test an early-stopped stream is cached and replayed"""
+        inner = StreamingFakeProvider(['{"c": [], "s": "x"}' + " tail" * 50])
+        dna = GeneticsEngine.generate_random_dna()
+        
+        EvolutionAgent(provider=CachedProvider(inner, cache_dir=temp_dir)).evolve_with_story(dna)
+        agent = EvolutionAgent(provider=CachedProvider(inner, cache_dir=temp_dir))
+        _, story = agent.evolve_with_story(dna)
+        
+        assert story == "x"
+        assert len(inner.prompts) == 1
+        assert agent.usage[0].cached
+
+
+class TestUsageTracking:
+    """Test per-call token and latency accounting"""
+    
+    def test_estimated_without_reported_usage(self, temp_dir, monkeypatch):
+        """Test calls are estimated and logged when the provider reports nothing"""
+        log = temp_dir / "usage.jsonl"
+        monkeypatch.setenv("AI_USAGE_LOG", str(log))
+        provider = FakeProvider([json.dumps({"c": [], "s": "Calm day."})])
+        agent = EvolutionAgent(provider=provider)
+        
+        agent.evolve_with_story(GeneticsEngine.generate_random_dna())
+        
+        summary = agent.usage_summary()
+        assert summary["calls"] == 1 and summary["estimated"]
+        assert summary["prompt_tokens"] == len(provider.prompts[0]) // 4
+        record = json.loads(log.read_text())
+        assert record["purpose"] == "evolve" and record["provider"] == "Fake"
+    
+    def test_reported_usage_and_cache_hits(self, temp_dir):
+        """Test provider token counts are used and cache hits cost nothing"""
+        inner = FakeProvider([Completion(json.dumps({"c": [], "s": "x"}), prompt_tokens=500, completion_tokens=20)])
+        agent = EvolutionAgent(provider=CachedProvider(inner, cache_dir=temp_dir))
+        dna = GeneticsEngine.generate_random_dna()
+        
+        agent.evolve_with_story(dna)
+        agent.evolve_with_story(dna)
+        
+        first, second = agent.usage
+        assert (first.prompt_tokens, first.completion_tokens, first.estimated) == (500, 20, False)
+        assert second.cached and second.prompt_tokens == 0
+    
+    def test_batch_uses_short_codes(self):
+        """Test a batched short-code answer is decoded per monkey"""
+        monkeys = [GeneticsEngine.generate_random_dna() for _ in range(2)]
+        for dna in monkeys:
+            dna.traits[TraitCategory.BODY_COLOR].value = "brown"
+        agent = EvolutionAgent(provider=FakeProvider([]))
+        code = agent.prompts.registry.code(TraitCategory.BODY_COLOR, "golden")
+        agent.provider.responses.append(json.dumps({"m": [{"id": 0, "c": [code], "s": "Gold!"}, {"id": 1, "c": [], "s": "-"}]}))
+        
+        results = agent.evolve_batch(monkeys)
+        
+        assert results[0][0].traits[TraitCategory.BODY_COLOR].value == "golden"
+        assert results[0][1] == "Gold!"
+        assert agent.usage[0].purpose == "evolve_batch"
+
+
+class TestJsonMode:
+    """Test providers request structured JSON output"""
+    
+    def test_github_uses_response_format(self):
+        """Test GitHub Models requests a JSON object response"""
+        provider = GitHubProvider.__new__(GitHubProvider)
+        provider.model = "gpt-4o"
+        provider.client = MagicMock()
+        provider.client.chat.completions.create.return_value.choices = [
+            MagicMock(message=MagicMock(content="{}"))
+        ]
+        
+        assert provider.generate_json("Respond with JSON") == "{}"
+        kwargs = provider.client.chat.completions.create.call_args.kwargs
+        assert kwargs["response_format"] == {"type": "json_object"}
+    
+    def test_claude_prefills_brace(self):
+        """Test Claude's reply is prefilled with an opening brace"""
+        provider = ClaudeProvider.__new__(ClaudeProvider)
+        provider.model = "claude"
+        provider.client = MagicMock()
+        provider.client.messages.create.return_value.content = [MagicMock(text='"changes": []}')]
+        
+        assert json.loads(provider.generate_json("Respond with JSON")) == {"changes": []}
+        messages = provider.client.messages.create.call_args.kwargs["messages"]
+        assert messages[-1] == {"role": "assistant", "content": "{"}
+
+
+class MockModelServer(ThreadingHTTPServer):
+    """Local stand-in for the OpenAI-compatible and Anthropic endpoints"""
+    
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), MockModelHandler)
+        self.delays = {}      # path -> seconds before answering
+        self.failures = {}    # path -> number of errors to return first
+        self.failure_status = 500
+        self.requests = []
+        self.stream_chunks = ["from ", "stream"]  # text pieces of streamed answers
+        self.chunk_delay = 0.0
+        self.chunks_sent = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+    
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class MockModelHandler(BaseHTTPRequestHandler):
+    """Answers chat completions and messages requests"""
+    
+    def log_message(self, *args):
+        pass
+    
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with server.lock:
+            server.requests.append((self.path, body))
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            failing = server.failures.get(self.path, 0) > 0
+            if failing:
+                server.failures[self.path] -= 1
+        try:
+            time.sleep(server.delays.get(self.path, 0))
+            if failing:
+                self._send(server.failure_status, {"error": {"message": "overloaded"}})
+            elif body.get("stream"):
+                self._stream(body)
+            elif self.path.endswith("/chat/completions"):
+                self._send(200, {
+                    "id": "c1", "object": "chat.completion", "created": 0, "model": body["model"],
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": "from github"}}],
+                })
+            else:
+                self._send(200, {
+                    "id": "m1", "type": "message", "role": "assistant", "model": body["model"],
+                    "content": [{"type": "text", "text": "from claude"}],
+                    "stop_reason": "end_turn", "usage": {"input_tokens": 1, "output_tokens": 1},
+                })
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+    
+    def _stream(self, body):
+        """Server-sent events in the OpenAI or Anthropic streaming format"""
+        server = self.server
+        if self.path.endswith("/chat/completions"):
+            events = [(None, {
+                "id": "c1", "object": "chat.completion.chunk", "created": 0, "model": body["model"],
+                "choices": [{"index": 0, "delta": {"content": text}, "finish_reason": None}],
+            }) for text in server.stream_chunks]
+            events.append((None, "[DONE]"))
+        else:
+            events = [
+                ("message_start", {"type": "message_start", "message": {
+                    "id": "m1", "type": "message", "role": "assistant", "model": body["model"], "content": [],
+                    "stop_reason": None, "usage": {"input_tokens": 12, "output_tokens": 0}}}),
+                ("content_block_start", {"type": "content_block_start", "index": 0,
+                                         "content_block": {"type": "text", "text": ""}}),
+            ]
+            events += [("content_block_delta", {"type": "content_block_delta", "index": 0,
+                                                "delta": {"type": "text_delta", "text": text}})
+                       for text in server.stream_chunks]
+            events += [
+                ("content_block_stop", {"type": "content_block_stop", "index": 0}),
+                ("message_delta", {"type": "message_delta", "delta": {"stop_reason": "end_turn"},
+                                   "usage": {"output_tokens": 7}}),
+                ("message_stop", {"type": "message_stop"}),
+            ]
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            for event, data in events:
+                payload = data if isinstance(data, str) else json.dumps(data)
+                prefix = f"event: {event}\n" if event else ""
+                self.wfile.write(f"{prefix}data: {payload}\n\n".encode())
+                self.wfile.flush()
+                with server.lock:
+                    server.chunks_sent += 1
+                time.sleep(server.chunk_delay)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+    
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode()
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            # Client gave up (deadline or hedge cancellation)
+            pass
+
+
+@pytest.fixture
+def model_server():
+    """Mock model server running in a background thread"""
+    server = MockModelServer()
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def github_provider(server):
+    return GitHubProvider("token", base_url=server.url, max_retries=0)
+
+
+def claude_provider(server):
+    return ClaudeProvider("key", base_url=server.url, max_retries=0)
+
+
+class TestAsyncProviders:
+    """Test the async provider layer against a local mock server"""
+    
+    @pytest.mark.asyncio
+    async def test_async_calls(self, model_server):
+        """Test both providers answer through their async clients"""
+        assert await github_provider(model_server).agenerate_response("hi") == "from github"
+        assert await claude_provider(model_server).agenerate_response("hi") == "from claude"
+    
+    @pytest.mark.asyncio
+    async def test_deadline(self, model_server):
+        """Test a slow provider is cut off at the deadline"""
+        model_server.delays["/chat/completions"] = 2
+        provider = ResilientProvider([github_provider(model_server)], timeout=0.3)
+        
+        start = time.perf_counter()
+        with pytest.raises(RuntimeError, match="did not answer"):
+            await provider.agenerate_response("hi")
+        assert time.perf_counter() - start < 1.5
+    
+    @pytest.mark.asyncio
+    async def test_retries_errors(self, model_server):
+        """Test server errors are retried with backoff"""
+        model_server.failures["/chat/completions"] = 2
+        provider = ResilientProvider([github_provider(model_server)], retries=2, backoff=0.01)
+        
+        assert await provider.agenerate_response("hi") == "from github"
+        assert len(model_server.requests) == 3
+    
+    @pytest.mark.asyncio
+    async def test_client_errors_not_retried(self, model_server):
+        """Test a 4xx such as a bad key fails over at once instead of retrying"""
+        model_server.failures["/v1/messages"] = 10
+        model_server.failure_status = 401
+        provider = ResilientProvider(
+            [claude_provider(model_server), github_provider(model_server)], retries=3, backoff=0.5
+        )
+        
+        start = time.perf_counter()
+        assert await provider.agenerate_response("hi") == "from github"
+        assert [path for path, _ in model_server.requests].count("/v1/messages") == 1
+        assert time.perf_counter() - start < 0.5
+    
+    def test_retryable_classification(self):
+        """Test which errors count as transient"""
+        from src.evolution import is_retryable
+        
+        def status(code):
+            error = RuntimeError("http")
+            error.status_code = code
+            return error
+        
+        assert is_retryable(TimeoutError()) and is_retryable(ConnectionResetError())
+        assert is_retryable(status(429)) and is_retryable(status(503))
+        assert not is_retryable(status(400)) and not is_retryable(status(401))
+        assert not is_retryable(ValueError("bad json"))
+    
+    @pytest.mark.asyncio
+    async def test_failover(self, model_server):
+        """Test the next provider is used when one keeps failing"""
+        model_server.failures["/v1/messages"] = 10
+        provider = ResilientProvider(
+            [claude_provider(model_server), github_provider(model_server)], retries=0
+        )
+        
+        assert await provider.agenerate_response("hi") == "from github"
+    
+    @pytest.mark.asyncio
+    async def test_hedged_first_answer_wins(self, model_server):
+        """Test a hedged request returns the faster provider's answer"""
+        model_server.delays["/v1/messages"] = 1.5
+        provider = ResilientProvider(
+            [claude_provider(model_server), github_provider(model_server)], hedge_delay=0.05
+        )
+        
+        start = time.perf_counter()
+        assert await provider.agenerate_response("hi") == "from github"
+        assert time.perf_counter() - start < 1.0
+    
+    @pytest.mark.asyncio
+    async def test_concurrency_limit(self, model_server):
+        """Test no more than max_concurrency requests are in flight"""
+        model_server.delays["/chat/completions"] = 0.1
+        provider = ResilientProvider([github_provider(model_server)], max_concurrency=2)
+        
+        results = await asyncio.gather(*(provider.agenerate_response("hi") for _ in range(6)))
+        
+        assert results == ["from github"] * 6
+        assert model_server.max_in_flight <= 2
+    
+    def test_sync_wrapper(self, model_server):
+        """Test the blocking interface runs through the same machinery"""
+        provider = ResilientProvider([github_provider(model_server)])
+        assert provider.generate_response("hi") == "from github"
+        assert provider.generate_json("hi") == "from github"
+        assert model_server.requests[-1][1]["response_format"] == {"type": "json_object"}
+
+
+class TestProviderStreaming:
+    """Test SDK streaming against the mock server"""
+    
+    def test_github_stream_closed_early(self, model_server):
+        """Test closing the stream stops reading the server's answer"""
+        model_server.stream_chunks = ['{"c": [], "s": "Calm."}'] + [" "] * 20
+        model_server.chunk_delay = 0.05
+        agent = EvolutionAgent(provider=github_provider(model_server))
+        
+        start = time.perf_counter()
+        _, story = agent.evolve_with_story(GeneticsEngine.generate_random_dna())
+        
+        assert story == "Calm."
+        assert time.perf_counter() - start < 0.5
+    
+    def test_claude_stream_prefilled(self, model_server):
+        """Test Claude's streamed answer continues the prefilled brace"""
+        model_server.stream_chunks = ['"c": [], ', '"s": "Calm."}']
+        agent = EvolutionAgent(provider=claude_provider(model_server))
+        
+        _, story = agent.evolve_with_story(GeneticsEngine.generate_random_dna())
+        
+        assert story == "Calm."
+        assert model_server.requests[0][1]["stream"] is True
+        # Stopped at the closing brace, before the usage summary arrived
+        assert agent.usage[0].estimated
+
+
+class TestCachedProvider:
+    """Test the on-disk response cache"""
+    
+    def test_hit_skips_provider(self, temp_dir):
+        """Test an identical prompt is answered from disk"""
+        inner = FakeProvider(["first", "second"])
+        provider = CachedProvider(inner, cache_dir=temp_dir)
+        
+        assert provider.generate_response("prompt") == "first"
+        assert CachedProvider(inner, cache_dir=temp_dir).generate_response("prompt") == "first"
+        assert len(inner.prompts) == 1
+    
+    def test_salt_and_method_change_key(self, temp_dir):
+        """Test salt and JSON mode get separate entries"""
+        inner = FakeProvider(["a", "b", "c"])
+        
+        assert CachedProvider(inner, cache_dir=temp_dir, salt="day1").generate_response("p") == "a"
+        assert CachedProvider(inner, cache_dir=temp_dir, salt="day2").generate_response("p") == "b"
+        assert CachedProvider(inner, cache_dir=temp_dir, salt="day2").generate_json("p") == "c"
+    
+    def test_expired_entry_refetched(self, temp_dir):
+        """Test entries past the TTL are ignored"""
+        inner = FakeProvider(["old", "new"])
+        provider = CachedProvider(inner, cache_dir=temp_dir, ttl=0)
+        
+        provider.generate_response("p")
+        assert provider.generate_response("p") == "new"
+    
+    def test_size_bound_evicts_lru(self, temp_dir):
+        """Test the least recently used entries go first when over size"""
+        inner = FakeProvider(["x" * 100] * 3)
+        provider = CachedProvider(inner, cache_dir=temp_dir, max_bytes=300)
+        
+        provider.generate_response("a")
+        provider.generate_response("b")
+        provider.generate_response("c")
+        
+        assert len(list(temp_dir.glob("*/*.json"))) == 2
+        assert not provider.cache_path(provider.cache_key("generate_response", "a", 1024)).exists()
+    
+    @pytest.mark.asyncio
+    async def test_async_cached(self, temp_dir):
+        """Test the async path shares the cache"""
+        inner = FakeProvider(["once"])
+        provider = CachedProvider(inner, cache_dir=temp_dir)
+        
+        assert await provider.agenerate_response("p") == "once"
+        assert provider.generate_response("p") == "once"
+        assert provider.hits == 1
@@ -0,0 +1,106 @@
+"""
+Tests for the fleet evolution runner
+"""
+
+import json
+import pytest
+from src.genetics import GeneticsEngine
+from src.storage import MonkeyStorage
+from src.evolution import EvolutionAgent, RulesProvider
+from src.fleet import FleetRunner, RenderCache, resolve_monkey_dir
+
+
+README = """# Monkey
+<!-- MONKEY_STATS_START -->
+old stats
+<!-- MONKEY_STATS_END -->
+"""
+
+
+@pytest.fixture
+def fleet(temp_dir, monkeypatch):
+    """Three monkey repos with DNA and a README"""
+    monkeypatch.delenv("GITHUB_TOKEN", raising=False)
+    roots = []
+    for i in range(3):
+        root = temp_dir / f"monkey{i}"
+        MonkeyStorage(data_dir=root / "monkey_data").save_dna_locally(GeneticsEngine.generate_random_dna())
+        (root / "README.md").write_text(README)
+        roots.append(root)
+    return roots
+
+
+class TestFleetRunner:
+    """Test evolving many monkeys in one process"""
+    
+    def test_writes_results_per_directory(self, fleet):
+        """Test every changed monkey gets DNA, render, snapshot, history and README"""
+        report = FleetRunner(fleet, workers=2, strength=1.0).run()
+        
+        assert report["succeeded"] == 3 and report["failed"] == 0
+        for root in fleet:
+            data = root / "monkey_data"
+            assert (data / "monkey.svg").read_text().startswith("<svg")
+            assert len(json.loads((data / "history.json").read_text())["entries"]) == 1
+            assert list((root / "monkey_evolution").glob("*.svg"))
+            assert "old stats" not in (root / "README.md").read_text()
+    
+    def test_shared_agent_batches_requests(self, fleet):
+        """Test the fleet makes one AI call per batch, not per monkey"""
+        agent = EvolutionAgent(provider=RulesProvider(seed=1))
+        
+        report = FleetRunner(fleet, agent=agent).run()
+        
+        assert report["ai_usage"]["calls"] == 1
+        assert all(r["story"] for r in report["results"])
+    
+    def test_reports_timings_and_failures(self, fleet, temp_dir):
+        """Test per-monkey timings and a broken directory reported without stopping the rest"""
+        broken = temp_dir / "broken"
+        (broken / "monkey_data").mkdir(parents=True)
+        
+        report = FleetRunner(fleet + [broken]).run()
+        
+        assert report["succeeded"] == 3 and report["failed"] == 1
+        assert report["monkeys_per_second"] > 0
+        ok = [r for r in report["results"] if r["ok"]]
+        assert all({"load", "evolve", "render", "write"} <= set(r["timings"]) for r in ok)
+    
+    def test_unchanged_monkey_gets_no_snapshot(self, fleet):
+        """Test a monkey that didn't change keeps its render and gets no snapshot or history entry"""
+        report = FleetRunner(fleet, strength=0.0).run()
+        
+        assert report["succeeded"] == 3
+        for root in fleet:
+            data = root / "monkey_data"
+            assert (data / "monkey.svg").read_text().startswith("<svg")
+            assert not (data / "history.json").exists()
+            assert not list((root / "monkey_evolution").glob("*.svg"))
+    
+    def test_agent_failure_falls_back_to_random(self, fleet, monkeypatch):
+        """Test an AI agent that can't be built falls back to random evolution"""
+        def broken(self, *args, **kwargs):
+            raise ValueError("no provider")
+        monkeypatch.setattr(EvolutionAgent, "__init__", broken)
+        
+        report = FleetRunner(fleet, ai=True, strength=1.0).run()
+        
+        assert report["succeeded"] == 3 and report["ai_usage"] is None
+        assert all(r["story"] == "Your monkey evolved randomly!" for r in report["results"])
+    
+    def test_resolve_monkey_dir(self, fleet, temp_dir):
+        """Test repo roots and monkey_data directories are both accepted"""
+        assert resolve_monkey_dir(fleet[0]) == fleet[0]
+        assert resolve_monkey_dir(fleet[0] / "monkey_data") == fleet[0]
+        assert resolve_monkey_dir(temp_dir / "missing") is None
+
+
+class TestRenderCache:
+    """Test the shared render cache"""
+    
+    def test_identical_dna_rendered_once(self, sample_dna):
+        """Test a repeat render is served from the cache"""
+        cache = RenderCache()
+        
+        assert cache.render(sample_dna) == cache.render(sample_dna)
+        assert (cache.hits, cache.misses) == (1, 1)
@@ -117,6 +117,18 @@ class TestGeneticsEngine:
         for category in TraitCategory:
             assert restored.traits[category].value == original.traits[category].value
             assert restored.traits[category].rarity == original.traits[category].rarity
+    
+    def test_dna_from_traits(self):
+        """Test DNA rebuilt from plain trait values keeps rarity and seed"""
+        original = GeneticsEngine.generate_random_dna()
+        traits = {cat.value: trait.value for cat, trait in original.traits.items()}
+        
+        rebuilt = GeneticsEngine.dna_from_traits(traits, generation=3, dna_hash=original.dna_hash)
+        
+        assert rebuilt.dna_hash == original.dna_hash
+        assert rebuilt.generation == 3
+        for category in TraitCategory:
+            assert rebuilt.traits[category].rarity == original.traits[category].rarity
 
 
 class TestTrait:
@@ -0,0 +1,86 @@
+"""
+Tests for the incremental JSON stream parser and decision schema
+"""
+
+import pytest
+from src.jsonstream import StreamingJSONParser, DecisionSchema, parse_stream
+
+
+def feed_chars(parser, text):
+    """Feed one character at a time, collecting emitted items"""
+    items = []
+    for char in text:
+        items += parser.feed(char)
+    return items
+
+
+class TestStreamingJSONParser:
+    """Test tolerant incremental parsing"""
+    
+    def test_skips_fences_and_prose(self):
+        """Test text around the object is ignored"""
+        answer = 'Sure! Here you go:\n```json\n{"c": ["b4"], "s": "Shiny"}\n```\nEnjoy!'
+        assert parse_stream([answer]) == {"c": ["b4"], "s": "Shiny"}
+    
+    def test_complete_once_object_closes(self):
+        """Test completion is detected without the trailing text"""
+        parser = StreamingJSONParser()
+        parser.feed('{"s": "a } in a string", "c": []')
+        assert not parser.complete
+        parser.feed('}\n\nThis trailing text is never read')
+        assert parser.complete
+        assert parser.result() == {"s": "a } in a string", "c": []}
+    
+    def test_items_emitted_as_they_close(self):
+        """Test array entries are available before the answer ends"""
+        parser = StreamingJSONParser()
+        items = feed_chars(parser, '{"m": [{"id": 0, "c": []}, {"id": 1, "c": ["f2"]}')
+        
+        assert [item["id"] for item in items] == [0, 1]
+        assert not parser.complete
+    
+    def test_nested_objects_not_emitted(self):
+        """Test only direct array entries count as items"""
+        parser = StreamingJSONParser()
+        feed_chars(parser, '{"changes": [{"category": "x", "meta": {"a": 1}}]}')
+        assert len(parser.items) == 1
+    
+    def test_truncated_answer_repaired(self):
+        """Test a cut-off answer is closed rather than discarded"""
+        for cut in ['{"c": ["b4", "f1"], "s": "Half a sto',
+                    '{"c": ["b4"], "s": "Done", "extra":',
+                    '{"c": ["b4"],']:
+            assert parse_stream([cut])["c"][0] == "b4"
+    
+    def test_trailing_commas_tolerated(self):
+        """Test a common model slip doesn't lose the answer"""
+        assert parse_stream(['{"c": ["b4",], "s": "x",}']) == {"c": ["b4"], "s": "x"}
+    
+    def test_no_object_raises(self):
+        """Test an answer without JSON is reported"""
+        with pytest.raises(ValueError):
+            parse_stream(["I'd rather not evolve today."])
+
+
+class TestDecisionSchema:
+    """Test schema validation against the trait registry"""
+    
+    def test_invalid_changes_dropped(self):
+        """Test unknown categories and values are removed (rarity is repaired later)"""
+        decision = {"changes": [
+            {"category": "body_color", "new_value": "golden", "new_rarity": "uncommon"},
+            {"category": "tail", "new_value": "long", "new_rarity": "common"},
+            {"category": "accessory", "new_value": "top_hat", "new_rarity": "rare"},
+            {"category": "pattern", "new_value": "stars", "new_rarity": "mythic"},
+        ], "evolution_story": "Mixed bag"}
+        
+        cleaned, problems = DecisionSchema().validate(decision)
+        
+        assert [c["new_value"] for c in cleaned["changes"]] == ["golden", "stars"]
+        assert len(problems) == 2
+    
+    def test_bad_shapes(self):
+        """Test non-list changes and non-string stories are normalised"""
+        cleaned, problems = DecisionSchema().validate({"changes": "golden", "evolution_story": 3})
+        assert cleaned["changes"] == [] and cleaned["evolution_story"] == ""
+        assert len(problems) == 2
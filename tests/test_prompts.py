@@ -0,0 +1,115 @@
+"""
+Tests for the compact prompt compiler and trait registry
+"""
+
+import json
+from src.genetics import GeneticsEngine, Rarity, TraitCategory
+from src.prompts import TraitRegistry, PromptCompiler, Completion, estimate_tokens
+
+
+class TestTraitRegistry:
+    """Test the trait catalogue derived from the trait pool"""
+    
+    def test_every_pool_value_has_a_code(self):
+        """Test each trait in the pool round-trips through its code"""
+        registry = TraitRegistry.default()
+        for category, tiers in GeneticsEngine.TRAIT_POOL.items():
+            for rarity, values in tiers.items():
+                for value in values:
+                    entry = registry.decode(registry.code(category, value))
+                    assert (entry.category, entry.value, entry.rarity) == (category, value, rarity)
+    
+    def test_category_letters_unique(self):
+        """Test every category gets its own code letter"""
+        codes = TraitRegistry.default().category_codes
+        assert len(set(codes.values())) == len(TraitCategory)
+    
+    def test_gen_locked_traits_are_legendary(self):
+        """Test generation-locked traits carry their limit"""
+        registry = TraitRegistry.default()
+        for category, limits in GeneticsEngine.GEN_LOCKED_TRAITS.items():
+            for max_gen, values in limits.items():
+                for value in values:
+                    entry = registry.lookup(category, value)
+                    assert entry.rarity == Rarity.LEGENDARY
+                    assert entry.max_generation == max_gen
+    
+    def test_resolve_change(self):
+        """Test changes resolve to registry entries or a reason"""
+        registry = TraitRegistry.default()
+        
+        entry, problem = registry.resolve_change({"category": "body_color", "new_value": "prismatic"}, generation=3)
+        assert problem is None and entry.rarity == Rarity.LEGENDARY
+        
+        _, problem = registry.resolve_change({"category": "body_color", "new_value": "prismatic"}, generation=6)
+        assert "extinct" in problem
+        _, problem = registry.resolve_change({"category": "tail", "new_value": "long"})
+        assert "category" in problem
+    
+    def test_new_pool_value_appears_in_catalogue(self):
+        """Test the catalogue follows the pool it is built from"""
+        pool = {TraitCategory.SPECIAL: {Rarity.RARE: ["comet_tail"]}}
+        registry = TraitRegistry(pool, {})
+        
+        assert "comet_tail" in registry.catalogue()
+        assert registry.decode("s0").value == "comet_tail"
+
+
+class TestPromptCompiler:
+    """Test prompt compilation and short-code decoding"""
+    
+    def test_prompt_lists_current_codes(self):
+        """Test the monkey's traits are given as codes"""
+        dna = GeneticsEngine.generate_random_dna()
+        compiler = PromptCompiler()
+        prompt = compiler.evolution_prompt(dna, days=3)
+        
+        for category, trait in dna.traits.items():
+            assert compiler.registry.code(category, trait.value) in prompt
+        assert "Days since last evolution: 3" in prompt
+    
+    def test_batch_prompt_smaller_than_per_monkey(self):
+        """Test the catalogue is shared by all monkeys in a batch"""
+        monkeys = [GeneticsEngine.generate_random_dna() for _ in range(10)]
+        compiler = PromptCompiler()
+        
+        single = len(compiler.evolution_prompt(monkeys[0]))
+        assert len(compiler.batch_prompt(monkeys)) < 2 * single
+    
+    def test_decode_codes(self):
+        """Test codes expand into changes with rarity from the pool"""
+        compiler = PromptCompiler()
+        code = compiler.registry.code(TraitCategory.BODY_COLOR, "golden")
+        
+        decision = compiler.decode_decision({"c": [code, "zz9"], "s": "Shiny!"})
+        
+        assert decision == {
+            "changes": [{"category": "body_color", "new_value": "golden", "new_rarity": "uncommon"}],
+            "evolution_story": "Shiny!",
+        }
+    
+    def test_long_format_passes_through(self):
+        """Test answers in the verbose format are left alone"""
+        answer = {"changes": [], "evolution_story": "Nothing happened"}
+        assert PromptCompiler().decode_decision(answer) == answer
+    
+    def test_decode_batch(self):
+        """Test batched answers are keyed by monkey id"""
+        decisions = PromptCompiler().decode_batch({"m": [{"id": 1, "c": [], "s": "x"}, {"c": []}]})
+        assert decisions == {1: {"changes": [], "evolution_story": "x"}}
+
+
+class TestUsage:
+    """Test token accounting helpers"""
+    
+    def test_completion_is_a_string(self):
+        """Test completions behave like the text they wrap"""
+        text = Completion('{"c": []}', prompt_tokens=10, completion_tokens=3)
+        
+        assert json.loads(text) == {"c": []}
+        assert (text.prompt_tokens, text.completion_tokens, text.cached) == (10, 3, False)
+    
+    def test_estimate_tokens(self):
+        """Test the rough estimate never reports zero"""
+        assert estimate_tokens("") == 1
+        assert estimate_tokens("x" * 400) == 100
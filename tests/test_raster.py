@@ -0,0 +1,120 @@
+"""
+Tests for raster export
+"""
+
+import pytest
+from src.genetics import GeneticsEngine
+from src.visualizer import MonkeyVisualizer
+from src import raster
+from src.raster import RasterExporter, rasterizer_available, svg_content_hash
+
+
+needs_rasterizer = pytest.mark.skipif(
+    not rasterizer_available(), reason="No SVG rasterizer (cairo or rsvg-convert) installed"
+)
+
+
+@pytest.fixture
+def fake_render(monkeypatch):
+    """Replace the rasterizer with a cheap stand-in that records calls"""
+    calls = []
+
+    def _fake(job):
+        svg_bytes, size, fmt = job
+        calls.append(svg_bytes)
+        if b"broken" in svg_bytes:
+            raise ValueError("bad svg")
+        return b"PNG:" + svg_bytes
+
+    monkeypatch.setattr(raster, "_render_job", _fake)
+    return calls
+
+
+class TestRasterCache:
+    """Test content-addressed raster caching"""
+
+    def test_content_hash_stable(self):
+        """Test same markup hashes identically for str and bytes"""
+        assert svg_content_hash("<svg/>") == svg_content_hash(b"<svg/>")
+        assert svg_content_hash("<svg/>") != svg_content_hash("<svg></svg>")
+
+    def test_cache_key_includes_size(self, temp_dir):
+        """Test different sizes get different cache entries"""
+        exporter = RasterExporter(cache_dir=temp_dir)
+        assert exporter.cache_key("<svg/>", 100) != exporter.cache_key("<svg/>", 200)
+
+    def test_only_misses_rendered(self, temp_dir, fake_render):
+        """Test cached frames are not rasterized again"""
+        exporter = RasterExporter(cache_dir=temp_dir, workers=1)
+
+        exporter.render_many(["<svg>a</svg>", "<svg>b</svg>"])
+        assert len(fake_render) == 2
+
+        paths = exporter.render_many(["<svg>a</svg>", "<svg>b</svg>", "<svg>c</svg>"])
+        assert len(fake_render) == 3
+        assert all(p.exists() for p in paths)
+        assert exporter.hits == 2
+
+    def test_duplicate_frames_rendered_once(self, temp_dir, fake_render):
+        """Test identical SVGs in one batch share a render"""
+        exporter = RasterExporter(cache_dir=temp_dir, workers=1)
+        paths = exporter.render_many(["<svg>a</svg>"] * 4)
+
+        assert len(fake_render) == 1
+        assert len(set(paths)) == 1
+
+    def test_failed_render_returns_none(self, temp_dir, fake_render):
+        """Test a broken SVG doesn't abort the batch"""
+        exporter = RasterExporter(cache_dir=temp_dir, workers=1)
+        paths = exporter.render_many(["<svg>ok</svg>", "<svg>broken</svg>"])
+
+        assert paths[0] is not None
+        assert paths[1] is None
+
+    def test_unsupported_format(self, temp_dir):
+        """Test unknown formats are rejected"""
+        exporter = RasterExporter(cache_dir=temp_dir)
+        with pytest.raises(ValueError):
+            exporter.render_many(["<svg/>"], fmt="bmp")
+
+    def test_format_from_suffix(self):
+        """Test .jpg maps to JPEG and unknown suffixes are rejected"""
+        assert raster.format_for_path("monkey.jpg") == "jpeg"
+        assert raster.format_for_path("monkey.JPEG") == "jpeg"
+        assert raster.format_for_path("monkey") == "png"
+        with pytest.raises(ValueError, match=".gif"):
+            raster.format_for_path("monkey.gif")
+
+    def test_export_jpg(self, temp_dir, fake_render):
+        """Test exporting to a .jpg path renders JPEG instead of failing"""
+        exporter = RasterExporter(cache_dir=temp_dir / "cache", workers=1)
+        output = exporter.export("<svg>a</svg>", temp_dir / "monkey.jpg")
+        assert output.read_bytes() == b"PNG:<svg>a</svg>"
+        assert exporter.cache_path(exporter.cache_key("<svg>a</svg>"), "jpeg").exists()
+
+
+@needs_rasterizer
+class TestRasterRendering:
+    """Test real rasterization (requires cairo or rsvg-convert)"""
+
+    def test_render_dna_png(self, temp_dir):
+        """Test DNA renders to a PNG of the requested size"""
+        from PIL import Image
+        import io
+
+        exporter = RasterExporter(cache_dir=temp_dir, workers=1)
+        png = exporter.render_dna(GeneticsEngine.generate_random_dna(), size=64)
+
+        img = Image.open(io.BytesIO(png))
+        assert img.format == "PNG"
+        assert img.size == (64, 64)
+
+    def test_export_webp(self, temp_dir):
+        """Test export picks the format from the file suffix"""
+        from PIL import Image
+
+        exporter = RasterExporter(cache_dir=temp_dir / "cache", workers=1)
+        svg = MonkeyVisualizer.generate_svg(GeneticsEngine.generate_random_dna())
+        output = exporter.export(svg, temp_dir / "monkey.webp", size=64)
+
+        assert Image.open(output).format == "WEBP"
@@ -0,0 +1,119 @@
+"""
+Tests for regenerate_svgs - rebuilding snapshots from history
+"""
+
+import json
+import pytest
+import regenerate_svgs
+from src.genetics import GeneticsEngine
+from src.visualizer import MonkeyVisualizer
+from regenerate_svgs import Manifest, regenerate, render_key, renderer_signature, sha256
+
+
+@pytest.fixture
+def history(temp_dir):
+    """History with three entries, two of them sharing render inputs"""
+    dna = GeneticsEngine.generate_random_dna()
+    other = GeneticsEngine.generate_random_dna()
+
+    def entry(d, name):
+        return {
+            "timestamp": name,
+            "generation": d.generation,
+            "dna_hash": d.dna_hash,
+            "traits": {cat.value: trait.value for cat, trait in d.traits.items()},
+            "svg_filename": name,
+        }
+
+    entries = [entry(dna, "a_monkey.svg"), entry(dna, "b_monkey.svg"), entry(other, "c_monkey.svg")]
+    history_file = temp_dir / "history.json"
+    history_file.write_text(json.dumps({"entries": entries}))
+    return history_file, temp_dir / "evolution", temp_dir / "manifest.json", dna
+
+
+class TestRegenerate:
+    """Test regeneration, verification and resume"""
+
+    def test_identical_entries_rendered_once(self, history):
+        """Test entries with the same traits and seed share a render"""
+        history_file, evolution_dir, manifest, dna = history
+        summary = regenerate(history_file, evolution_dir, manifest, workers=1)
+
+        assert summary["created"] == 3
+        assert summary["rendered"] == 2
+        assert (evolution_dir / "a_monkey.svg").read_text() == MonkeyVisualizer.generate_svg(
+            GeneticsEngine.dna_from_traits(
+                {cat.value: t.value for cat, t in dna.traits.items()},
+                generation=dna.generation, dna_hash=dna.dna_hash
+            )
+        )
+
+    def test_verify_detects_changes(self, history):
+        """Test verify reports a file that no longer matches its render"""
+        history_file, evolution_dir, manifest, _ = history
+        regenerate(history_file, evolution_dir, manifest, workers=1)
+        (evolution_dir / "c_monkey.svg").write_text("<svg>edited</svg>")
+
+        summary = regenerate(history_file, evolution_dir, manifest, verify=True, workers=1)
+        assert summary["changed"] == 1
+        assert summary["unchanged"] == 2
+        assert summary["resumed"] == 0
+
+    def test_manifest_cleared_after_finished_run(self, history):
+        """Test a completed run leaves no resume state behind"""
+        history_file, evolution_dir, manifest, _ = history
+        regenerate(history_file, evolution_dir, manifest, workers=1)
+        assert not manifest.exists()
+
+    def test_interrupted_verify_resumes(self, history):
+        """Test files verified before an interruption are skipped on the next run"""
+        history_file, evolution_dir, manifest, _ = history
+        regenerate(history_file, evolution_dir, manifest, workers=1)
+        state = Manifest(manifest, renderer_signature())
+        state.mark("a_monkey.svg", sha256((evolution_dir / "a_monkey.svg").read_text()))
+        state.save()
+
+        summary = regenerate(history_file, evolution_dir, manifest, verify=True, workers=1)
+        assert summary["resumed"] == 1
+        assert summary["unchanged"] == 2
+        assert not manifest.exists()
+
+    def test_interrupted_render_keeps_finished_files(self, history, monkeypatch):
+        """Test files verified before a render is interrupted are resumed, not re-checked"""
+        history_file, evolution_dir, manifest, _ = history
+        regenerate(history_file, evolution_dir, manifest, workers=1)
+
+        render_entry = regenerate_svgs.render_entry
+        calls = []
+
+        def interrupted(key):
+            calls.append(key)
+            if len(calls) == 2:
+                raise KeyboardInterrupt
+            return render_entry(key)
+
+        monkeypatch.setattr(regenerate_svgs, "render_entry", interrupted)
+        with pytest.raises(KeyboardInterrupt):
+            regenerate(history_file, evolution_dir, manifest, verify=True, workers=1)
+        done = json.loads(manifest.read_text())["files"]
+        assert done
+
+        monkeypatch.setattr(regenerate_svgs, "render_entry", render_entry)
+        summary = regenerate(history_file, evolution_dir, manifest, verify=True, workers=1)
+        assert summary["resumed"] == len(done)
+        assert summary["unchanged"] == 3 - len(done)
+
+    def test_dry_run_writes_nothing(self, history):
+        """Test dry run only reports missing files"""
+        history_file, evolution_dir, manifest, _ = history
+        summary = regenerate(history_file, evolution_dir, manifest, dry_run=True, workers=1)
+
+        assert summary["created"] == 3
+        assert not evolution_dir.exists()
+        assert not manifest.exists()
+
+    def test_render_key_ignores_trait_order(self):
+        """Test trait ordering doesn't split identical renders"""
+        a = {"traits": {"body_color": "brown", "face_expression": "happy"}, "dna_hash": "x"}
+        b = {"traits": {"face_expression": "happy", "body_color": "brown"}, "dna_hash": "x"}
+        assert render_key(a) == render_key(b)
@@ -0,0 +1,85 @@
+"""
+Tests for the offline rules-based evolution model
+"""
+
+from collections import Counter
+from src.genetics import GeneticsEngine, MonkeyDNA, Rarity, Trait, TraitCategory
+from src.rules import RulesModel, color_affinity
+
+
+def make_dna(generation=1, **values):
+    """DNA with common defaults, overridden per category"""
+    defaults = {
+        TraitCategory.BODY_COLOR: "brown",
+        TraitCategory.FACE_EXPRESSION: "happy",
+        TraitCategory.ACCESSORY: "none",
+        TraitCategory.PATTERN: "solid",
+        TraitCategory.BACKGROUND: "white",
+        TraitCategory.SPECIAL: "none",
+    }
+    for name, value in values.items():
+        defaults[TraitCategory(name)] = value
+    return MonkeyDNA(generation=generation, traits={
+        category: Trait(category=category, value=value, rarity=GeneticsEngine.find_rarity(category, value))
+        for category, value in defaults.items()
+    })
+
+
+class TestRulesModel:
+    """Test the rules model's decisions"""
+    
+    def test_at_most_two_valid_changes(self):
+        """Test decisions stay within the brief and the trait pool"""
+        model = RulesModel(seed=1)
+        for _ in range(200):
+            dna = GeneticsEngine.generate_random_dna()
+            decision = model.decide(dna, days_passed=5)
+            assert len(decision["changes"]) <= 2
+            for change in decision["changes"]:
+                category = TraitCategory(change["category"])
+                assert change["new_value"] != dna.traits[category].value
+                assert GeneticsEngine.find_rarity(category, change["new_value"]).value == change["new_rarity"]
+    
+    def test_seed_is_deterministic(self):
+        """Test the same seed gives the same decisions"""
+        dna = GeneticsEngine.generate_random_dna()
+        assert RulesModel(seed=3).decide(dna) == RulesModel(seed=3).decide(dna)
+    
+    def test_rare_traits_change_less(self):
+        """Test legendary traits are picked for change less often than common ones"""
+        model = RulesModel(seed=2)
+        dna = make_dna(body_color="galaxy")
+        picks = Counter()
+        for _ in range(2000):
+            for change in model.decide(dna)["changes"]:
+                picks[change["category"]] += 1
+        
+        assert picks["body_color"] < picks["pattern"]
+    
+    def test_gen_locked_respected(self):
+        """Test gen-locked traits are never offered past their generation"""
+        model = RulesModel(seed=4)
+        dna = make_dna(generation=20)
+        locked = {v for limits in GeneticsEngine.GEN_LOCKED_TRAITS.values() for vals in limits.values() for v in vals}
+        for _ in range(500):
+            assert not {c["new_value"] for c in model.decide(dna, days_passed=10)["changes"]} & locked
+    
+    def test_coherent_values_preferred(self):
+        """Test a value sharing themes with the monkey scores higher"""
+        model = RulesModel()
+        traits = {TraitCategory.BODY_COLOR: "galaxy", TraitCategory.PATTERN: "nebula"}
+        
+        assert (model.coherence(TraitCategory.BACKGROUND, "space", traits)
+                > model.coherence(TraitCategory.BACKGROUND, "green_grass", traits))
+    
+    def test_low_contrast_penalised(self):
+        """Test a body color that vanishes into its background scores negative"""
+        assert color_affinity((0.1, 0.1, 0.1), (0.0, 0.0, 0.0)) < 0
+    
+    def test_simulation_keeps_rarity_mix(self):
+        """Test a population does not drift toward legendary traits"""
+        model = RulesModel(seed=5)
+        population = model.simulate([GeneticsEngine.generate_random_dna() for _ in range(100)], days=20)
+        
+        rarities = Counter(t.rarity for dna in population for t in dna.traits.values())
+        assert rarities[Rarity.LEGENDARY] < rarities[Rarity.COMMON]
@@ -15,8 +15,11 @@ from src.scan_community import (
     generate_community_data,
     generate_leaderboard,
     generate_family_tree,
-    generate_network_stats
+    generate_network_stats,
+    generate_thumb,
+    list_view_image
 )
+from src.genetics import GeneticsEngine
 
 
 class TestGetDegreeLabel:
@@ -329,5 +332,30 @@ class TestGenerators:
             assert mock_file.write.called or mock_open.called
 
 
+class TestThumbnails:
+    """Test the thumbnail tier for list views"""
+    
+    def test_generate_thumb_from_dna(self):
+        """Test a thumbnail is rendered from dna.json data"""
+        dna_data = GeneticsEngine.dna_to_dict(GeneticsEngine.generate_random_dna())
+        thumb = generate_thumb(dna_data, size=64)
+        
+        assert 'width="64"' in thumb
+        assert 'viewBox="0 0 400 400"' in thumb
+    
+    def test_generate_thumb_without_dna(self):
+        """Test forks without dna.json get no thumbnail"""
+        assert generate_thumb(None) is None
+        assert generate_thumb({}) is None
+    
+    def test_list_view_drops_full_svg(self):
+        """Test list views ship the thumbnail instead of the full SVG"""
+        image = list_view_image({"monkey_svg": "<svg>full</svg>", "monkey_thumb": "<svg>thumb</svg>"})
+        assert image == {"monkey_thumb": "<svg>thumb</svg>"}
+        
+        fallback = list_view_image({"monkey_svg": "<svg>full</svg>", "monkey_thumb": None})
+        assert fallback["monkey_svg"] == "<svg>full</svg>"
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,476 @@
+"""
+Tests for the web dev server (web/serve.py)
+"""
+
+import os
+import json
+import time
+import threading
+import http.client
+from pathlib import Path
+
+import pytest
+
+from web import serve
+
+
+ROOT = Path(__file__).parent.parent
+
+
+class SlowHandler(serve.MyHTTPRequestHandler):
+    """/api/forks blocks until the test releases it"""
+    release = threading.Event()
+
+    def forks_payload(self, cursor=None):
+        self.release.wait(5)
+        return {"forks": []}
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    """Threaded server on a free port with one API worker and no queue"""
+    SlowHandler.release = threading.Event()
+    httpd = serve.make_server(0, ROOT, handler=SlowHandler, api_workers=1, api_queue=0)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd
+    SlowHandler.release.set()
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def get(port, path, conn=None):
+    conn = conn or http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    conn.request("GET", path)
+    response = conn.getresponse()
+    return response, response.read()
+
+
+class TestServer:
+    """Test concurrency, keep-alive and API back-pressure"""
+
+    def test_static_not_blocked_by_api(self, server):
+        """Test static files are served while an API call is still running"""
+        port = server.server_address[1]
+        api = threading.Thread(target=get, args=(port, "/api/forks?live=1"))
+        api.start()
+        time.sleep(0.1)
+
+        start = time.perf_counter()
+        response, body = get(port, "/web/index.html")
+        assert response.status == 200
+        assert b"<html" in body.lower()
+        assert time.perf_counter() - start < 1
+
+        SlowHandler.release.set()
+        api.join()
+
+    def test_keep_alive(self, server):
+        """Test several requests reuse one connection"""
+        port = server.server_address[1]
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+        SlowHandler.release.set()
+        for path in ["/web/style.css", "/api/forks?live=1", "/api/forks?limit=5", "/web/script.js"]:
+            response, _ = get(port, path, conn)
+            assert response.status == 200
+            assert not response.will_close
+        conn.close()
+
+    def test_busy_api_returns_503(self, server):
+        """Test API requests beyond the pool and queue are turned away"""
+        port = server.server_address[1]
+        api = threading.Thread(target=get, args=(port, "/api/forks?live=1"))
+        api.start()
+        time.sleep(0.1)
+
+        response, _ = get(port, "/api/forks?live=1")
+        assert response.status == 503
+        assert response.getheader("Retry-After") == "1"
+
+        SlowHandler.release.set()
+        api.join()
+
+    def test_timed_out_crawl_keeps_its_slot(self, server, monkeypatch):
+        """Test a crawl that outlives its request still counts against the pool"""
+        monkeypatch.setattr(serve, "API_TIMEOUT", 0.1)
+        port = server.server_address[1]
+
+        response, _ = get(port, "/api/forks?live=1")
+        assert response.status == 504
+        response, _ = get(port, "/api/forks?live=1")
+        assert response.status == 503
+
+        SlowHandler.release.set()
+        time.sleep(0.1)
+        response, _ = get(port, "/api/forks?live=1")
+        assert response.status == 200
+
+
+class TestForkCache:
+    """Test the stale-while-revalidate fork cache"""
+
+    def test_miss_then_hit(self, tmp_path):
+        """Test the loader runs once and later calls are hits"""
+        cache = serve.ForkCache(path=tmp_path / "cache.json")
+        calls = []
+        loader = lambda: calls.append(1) or ["fork"]
+
+        assert cache.get("k", loader) == ["fork"]
+        assert cache.get("k", loader) == ["fork"]
+        assert len(calls) == 1
+        counters = cache.counters()
+        assert counters["misses"] == 1 and counters["hits"] == 1
+        assert counters["refreshes"] == 1
+        assert counters["last_refresh_seconds"] is not None
+
+    def test_concurrent_misses_load_once(self):
+        """Test simultaneous misses share one load"""
+        cache = serve.ForkCache()
+        calls = []
+
+        def loader():
+            calls.append(1)
+            time.sleep(0.2)
+            return ["fork"]
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get("k", loader))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == [["fork"]] * 5
+        assert len(calls) == 1
+
+    def test_stale_served_while_refreshing(self):
+        """Test stale data comes back at once and a single background refresh runs"""
+        cache = serve.ForkCache()
+        cache.entries["k"] = {"data": ["old"], "timestamp": time.time() - 3600}
+        release = threading.Event()
+        calls = []
+
+        def loader():
+            calls.append(1)
+            release.wait(5)
+            return ["new"]
+
+        start = time.perf_counter()
+        assert [cache.get("k", loader) for _ in range(3)] == [["old"]] * 3
+        assert time.perf_counter() - start < 1
+        assert cache.counters()["stale_hits"] == 3
+
+        release.set()
+        for _ in range(50):
+            if cache.counters()["refreshing"] == 0:
+                break
+            time.sleep(0.02)
+        assert cache.get("k", loader) == ["new"]
+        assert len(calls) == 1
+
+    def test_failed_refresh_keeps_stale(self):
+        """Test a failing refresh leaves the stale data in place"""
+        cache = serve.ForkCache()
+        cache.entries["k"] = {"data": ["old"], "timestamp": 0}
+
+        def loader():
+            raise RuntimeError("rate limited")
+
+        assert cache.get("k", loader) == ["old"]
+        for _ in range(50):
+            if cache.counters()["refreshing"] == 0:
+                break
+            time.sleep(0.02)
+        assert cache.counters()["refresh_errors"] == 1
+        assert cache.entries["k"]["data"] == ["old"]
+
+    def test_failed_refresh_backs_off(self):
+        """Test stale hits after a failure don't start a new refresh until the backoff passes"""
+        cache = serve.ForkCache(backoff=60)
+        cache.entries["k"] = {"data": ["old"], "timestamp": 0}
+        calls = []
+
+        def loader():
+            calls.append(1)
+            raise RuntimeError("rate limited")
+
+        cache.get("k", loader)
+        for _ in range(50):
+            if cache.counters()["refreshing"] == 0:
+                break
+            time.sleep(0.02)
+        assert [cache.get("k", loader) for _ in range(5)] == [["old"]] * 5
+        assert len(calls) == 1
+        assert cache.counters()["backoff_skips"] == 5
+
+        # Once the backoff has passed, a refresh is tried again
+        count, failed_at = cache._failures["k"]
+        cache._failures["k"] = (count, failed_at - 61)
+        cache.get("k", lambda: ["new"])
+        for _ in range(50):
+            if cache.counters()["refreshing"] == 0:
+                break
+            time.sleep(0.02)
+        assert cache.get("k", loader) == ["new"]
+
+    def test_miss_with_failed_load_raises(self):
+        """Test a failed first load is an error, not an empty cache entry"""
+        cache = serve.ForkCache()
+        with pytest.raises(RuntimeError):
+            cache.get("k", lambda: 1 / 0)
+        assert "k" not in cache.entries
+
+    def test_restart_starts_warm(self, tmp_path):
+        """Test entries survive a restart through the cache file"""
+        path = tmp_path / "cache.json"
+        serve.ForkCache(path=path).get("k", lambda: ["fork"])
+
+        restarted = serve.ForkCache(path=path)
+        assert restarted.get("k", lambda: pytest.fail("should be cached")) == ["fork"]
+        assert restarted.counters()["hits"] == 1
+
+
+class FakeContent:
+    def __init__(self, text):
+        self.decoded_content = text.encode()
+
+
+class FakeRepo:
+    """Just enough of a PyGithub repo for the crawler"""
+
+    def __init__(self, name, delay=0.0, forks=()):
+        self.full_name = f"owner/{name}"
+        self.name = name
+        self.html_url = f"https://github.com/owner/{name}"
+        self.owner = type("Owner", (), {"login": "owner"})()
+        self.updated_at = __import__("datetime").datetime(2026, 1, 1)
+        self.fork = False
+        self.parent = None
+        self.delay = delay
+        self.forks = list(forks)
+
+    def get_contents(self, path):
+        time.sleep(self.delay)
+        if path.endswith("stats.json"):
+            return FakeContent('{"generation": 1}')
+        return FakeContent("<svg/>")
+
+    def get_forks(self):
+        forks = self.forks
+        return type("Forks", (), {"get_page": lambda _, page: forks[page * 30:(page + 1) * 30]})()
+
+
+class TestCrawlForks:
+    """Test the concurrent fork crawl with a deadline and continuation cursor"""
+
+    @pytest.fixture
+    def crawl(self, monkeypatch):
+        def run(root, cursor=None):
+            monkeypatch.setattr(serve, "Github", lambda token: type("G", (), {"get_repo": lambda _, name: root})(),
+                                raising=False)
+            handler = serve.MyHTTPRequestHandler.__new__(serve.MyHTTPRequestHandler)
+            return handler._crawl_forks("token", cursor)
+        return run
+
+    def test_fetches_all_forks_concurrently(self, crawl, monkeypatch):
+        """Test more than 15 forks come back, in parallel, across listing pages"""
+        monkeypatch.setattr(serve, "FETCH_BUDGET", 10)
+        root = FakeRepo("root", forks=[FakeRepo(f"fork{i}", delay=0.05) for i in range(40)])
+
+        start = time.perf_counter()
+        payload = crawl(root)
+        elapsed = time.perf_counter() - start
+
+        assert len(payload["forks"]) == 41
+        assert payload["forks"][0]["is_root"] is True
+        assert [f["repo"] for f in payload["forks"][1:]] == [f"fork{i}" for i in range(40)]
+        assert payload["next"] is None
+        # 40 forks × 2 requests × 50ms serially would take 4s
+        assert elapsed < 2
+
+    def test_deadline_returns_partial_with_cursor(self, crawl, monkeypatch):
+        """Test forks unfinished at the deadline are left for the continuation"""
+        monkeypatch.setattr(serve, "FETCH_BUDGET", 0.3)
+        forks = [FakeRepo(f"fast{i}") for i in range(3)] + [FakeRepo("slow", delay=0.6)] + [FakeRepo("after")]
+        root = FakeRepo("root", forks=forks)
+
+        payload = crawl(root)
+        assert [f["repo"] for f in payload["forks"]] == ["root", "fast0", "fast1", "fast2"]
+        assert serve.decode_cursor(payload["next"]) == (0, 3)
+
+        for fork in forks:
+            fork.delay = 0
+        rest = crawl(root, payload["next"])
+        assert [f["repo"] for f in rest["forks"]] == ["slow", "after"]
+        assert rest["next"] is None
+
+    def test_slow_root_still_listed(self, crawl, monkeypatch):
+        """Test the root repo isn't dropped when it outlasts the budget"""
+        monkeypatch.setattr(serve, "FETCH_BUDGET", 0.1)
+        root = FakeRepo("root", delay=0.2, forks=[FakeRepo("fork0")])
+
+        payload = crawl(root)
+        assert [f["repo"] for f in payload["forks"]] == ["root", "fork0"]
+        assert payload["forks"][0]["is_root"] is True
+
+    def test_max_forks_sets_cursor(self, crawl, monkeypatch):
+        """Test a response stops at MAX_FORKS and continues from there"""
+        monkeypatch.setattr(serve, "MAX_FORKS", 5)
+        root = FakeRepo("root", forks=[FakeRepo(f"fork{i}") for i in range(8)])
+
+        first = crawl(root)
+        assert len(first["forks"]) == 6
+        second = crawl(root, first["next"])
+        assert [f["repo"] for f in second["forks"]] == ["fork5", "fork6", "fork7"]
+        assert second["next"] is None
+
+    def test_cache_key_includes_repo(self, monkeypatch):
+        """Test a different GITHUB_REPOSITORY doesn't get another repo's cached forks"""
+        cache = serve.ForkCache()
+        monkeypatch.setattr(serve, "FORK_CACHE", cache)
+        handler = serve.MyHTTPRequestHandler.__new__(serve.MyHTTPRequestHandler)
+        monkeypatch.setattr(handler, "_crawl_forks",
+                            lambda token, cursor=None: {"forks": [serve.source_repo()], "next": None})
+
+        monkeypatch.setenv("GITHUB_REPOSITORY", "alice/forkMonkey")
+        assert handler._fetch_forks_data("token")["forks"] == ["alice/forkMonkey"]
+        monkeypatch.setenv("GITHUB_REPOSITORY", "bob/forkMonkey")
+        assert handler._fetch_forks_data("token")["forks"] == ["bob/forkMonkey"]
+
+    def test_bad_cursor_rejected(self):
+        """Test malformed cursors raise ValueError"""
+        with pytest.raises(ValueError):
+            serve.decode_cursor("not-a-cursor")
+        assert serve.decode_cursor(serve.encode_cursor(2, 7)) == (2, 7)
+
+
+def community_file(path, forks):
+    path.write_text(json.dumps({"source_repo": "owner/forkMonkey", "total_forks": len(forks), "forks": forks}))
+    return path
+
+
+def fork(owner, degree=1, score=10.0, generation=1, updated="2026-01-01"):
+    return {"owner": owner, "repo": "forkMonkey", "degree": degree, "updated_at": updated,
+            "monkey_stats": {"rarity_score": score, "generation": generation}}
+
+
+class TestCommunityIndex:
+    """Test the in-memory index of scanned community data"""
+
+    def test_filters_sort_and_pages(self, tmp_path):
+        """Test owner/degree/score filters, sorting and pagination"""
+        path = community_file(tmp_path / "community.json", [
+            fork("Alice", degree=0, score=50, generation=1),
+            fork("bob", score=20, generation=2),
+            fork("carol", score=80, generation=3),
+            fork("dave", degree=2, score=65, generation=2),
+        ])
+        index = serve.CommunityIndex(path)
+
+        result = index.query()
+        assert [f["owner"] for f in result["forks"]] == ["carol", "dave", "Alice", "bob"]
+        assert result["total"] == 4 and result["source_repo"] == "owner/forkMonkey"
+
+        assert [f["owner"] for f in index.query(owner="alice")["forks"]] == ["Alice"]
+        assert [f["owner"] for f in index.query(degree=1)["forks"]] == ["carol", "bob"]
+        assert [f["owner"] for f in index.query(min_score=60, sort="generation", order="asc")["forks"]] == \
+            ["dave", "carol"]
+        assert [f["owner"] for f in index.query(generation=2)["forks"]] == ["dave", "bob"]
+
+        first = index.query(limit=3)
+        assert first["next_offset"] == 3
+        second = index.query(offset=first["next_offset"], limit=3)
+        assert [f["owner"] for f in second["forks"]] == ["bob"]
+        assert second["next_offset"] is None
+
+    def test_reloads_on_mtime_change(self, tmp_path):
+        """Test a rewritten file is picked up on the next query"""
+        path = community_file(tmp_path / "community.json", [fork("alice")])
+        index = serve.CommunityIndex(path)
+        assert index.query()["total"] == 1
+
+        community_file(path, [fork("alice"), fork("bob")])
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        assert index.query()["total"] == 2
+
+    def test_rejects_unknown_sort(self, tmp_path):
+        """Test invalid sort keys raise ValueError"""
+        index = serve.CommunityIndex(community_file(tmp_path / "community.json", []))
+        with pytest.raises(ValueError):
+            index.query(sort="cuteness")
+
+    def test_endpoint_answers_from_index(self, server, tmp_path, monkeypatch):
+        """Test /api/forks serves the index and only crawls with ?live=1"""
+        path = community_file(tmp_path / "community.json", [fork("alice", score=5), fork("bob", score=9)])
+        monkeypatch.setattr(serve, "COMMUNITY_INDEX", serve.CommunityIndex(path))
+        port = server.server_address[1]
+
+        response, body = get(port, "/api/forks?limit=1")
+        assert response.status == 200
+        payload = json.loads(body)
+        assert [f["owner"] for f in payload["forks"]] == ["bob"]
+        assert payload["next_offset"] == 1
+
+        response, _ = get(port, "/api/forks?sort=nope")
+        assert response.status == 400
+        response, _ = get(port, "/api/forks?limit=abc")
+        assert response.status == 400
+
+
+class TestCaching:
+    """Test ETags, 304s and immutable versioned assets"""
+
+    def test_static_etag_and_304(self, server):
+        """Test a repeat request with the ETag gets an empty 304"""
+        port = server.server_address[1]
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+        response, body = get(port, "/web/style.css", conn)
+        etag = response.getheader("ETag")
+        assert response.status == 200 and body
+        assert etag and response.getheader("Cache-Control") == serve.REVALIDATE
+
+        conn.request("GET", "/web/style.css", headers={"If-None-Match": etag})
+        response = conn.getresponse()
+        assert response.status == 304
+        assert response.read() == b""
+        assert response.getheader("ETag") == etag
+
+        # The connection is still usable after the 304
+        response, _ = get(port, "/web/script.js", conn)
+        assert response.status == 200
+
+    def test_html_pins_assets_to_content(self, server):
+        """Test pages link assets by content hash and those URLs are immutable"""
+        port = server.server_address[1]
+        response, body = get(port, "/web/index.html")
+        version = serve.ASSET_TAGS.version(str(ROOT / "web" / "style.css"))
+        assert f'href="style.css?v={version}"'.encode() in body
+        assert response.getheader("ETag")
+
+        response, _ = get(port, f"/web/style.css?v={version}")
+        assert response.getheader("Cache-Control") == serve.IMMUTABLE
+
+        response, _ = get(port, "/web/style.css?v=outdated")
+        assert response.getheader("Cache-Control") == serve.REVALIDATE
+
+    def test_api_etag(self, server):
+        """Test unchanged API responses revalidate with a 304"""
+        port = server.server_address[1]
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+        response, _ = get(port, "/api/cache", conn)
+        etag = response.getheader("ETag")
+
+        conn.request("GET", "/api/cache", headers={"If-None-Match": f'W/{etag}, "other"'})
+        response = conn.getresponse()
+        response.read()
+        assert response.status == 304
+
+    def test_dev_override(self, server, monkeypatch):
+        """Test NO_CACHE turns caching off entirely"""
+        monkeypatch.setattr(serve, "NO_CACHE", True)
+        response, _ = get(server.server_address[1], "/web/style.css")
+        assert response.getheader("ETag") is None
+        assert "no-store" in response.getheader("Cache-Control")
@@ -0,0 +1,503 @@
+"""
+Tests for the adoption backend (server/)
+"""
+
+import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+from github import GithubException, UnknownObjectException
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "server"))
+
+import clients
+import jobs
+import readiness
+import usernames
+from github_service import GitHubService
+
+
+def wait_finished(store, job_id, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = store.get(job_id)
+        if job.status in jobs.FINISHED:
+            return job
+        time.sleep(0.01)
+    raise AssertionError("job did not finish")
+
+
+class TestJobs:
+    """Test the background job runner and stores"""
+
+    @pytest.mark.parametrize("kind", ["memory", "file"])
+    def test_job_lifecycle(self, kind, tmp_path):
+        """Test a job goes queued → running → succeeded with its steps and result"""
+        store = jobs.MemoryJobStore() if kind == "memory" else jobs.FileJobStore(tmp_path)
+        runner = jobs.JobRunner(store, workers=2)
+        release = threading.Event()
+
+        def flow(name, progress):
+            progress("forking")
+            release.wait(5)
+            return {"success": True, "repo_name": name}
+
+        job = runner.submit("trustless", flow, "monkey")
+        assert job.status == jobs.QUEUED
+
+        for _ in range(100):
+            if store.get(job.id).step == "forking":
+                break
+            time.sleep(0.01)
+        assert store.get(job.id).status == jobs.RUNNING
+
+        release.set()
+        finished = wait_finished(store, job.id)
+        assert finished.status == jobs.SUCCEEDED
+        assert finished.result == {"success": True, "repo_name": "monkey"}
+        assert finished.to_dict()["job_id"] == job.id
+        runner.shutdown()
+
+    def test_failures_are_recorded(self):
+        """Test unsuccessful results and exceptions both mark the job failed"""
+        runner = jobs.JobRunner(jobs.MemoryJobStore(), workers=1)
+        refused = runner.submit("trustless", lambda progress: {"success": False, "error": "no fork"})
+        crashed = runner.submit("trustless", lambda progress: 1 / 0)
+
+        assert wait_finished(runner.store, refused.id).error == "no fork"
+        assert "division" in wait_finished(runner.store, crashed.id).error
+        runner.shutdown()
+
+    def test_drain_waits_for_running_jobs(self):
+        """Test draining refuses new jobs and lets in-flight ones finish"""
+        runner = jobs.JobRunner(jobs.MemoryJobStore(), workers=1)
+        job = runner.submit("trustless", lambda progress: time.sleep(0.2) or {"success": True})
+        queued = runner.submit("trustless", lambda progress: {"success": True})
+
+        assert runner.drain(timeout=5) == 0
+        assert runner.store.get(job.id).status == jobs.SUCCEEDED
+        assert runner.store.get(queued.id).status == jobs.SUCCEEDED
+        assert runner.in_flight() == 0
+        with pytest.raises(jobs.ShuttingDown):
+            runner.submit("trustless", lambda progress: {"success": True})
+
+    def test_drain_deadline_fails_stragglers(self):
+        """Test jobs still running at the drain deadline are marked failed"""
+        runner = jobs.JobRunner(jobs.MemoryJobStore(), workers=1)
+        release = threading.Event()
+        job = runner.submit("trustless", lambda progress: release.wait(5) and {"success": True})
+
+        assert runner.drain(timeout=0.1) == 1
+        assert runner.store.get(job.id).status == jobs.FAILED
+        assert "shut down" in runner.store.get(job.id).error
+        release.set()
+
+    def test_incomplete_store_rejected_at_construction(self):
+        """Test a store missing load fails when created, not on the first poll"""
+        class SaveOnlyStore(jobs.JobStore):
+            def save(self, job):
+                pass
+
+        with pytest.raises(TypeError):
+            SaveOnlyStore()
+
+    def test_expired_and_unknown_jobs(self, tmp_path):
+        """Test finished jobs expire and bogus IDs are not found"""
+        store = jobs.FileJobStore(tmp_path)
+        job = store.create("oauth")
+        store.update(job, status=jobs.SUCCEEDED, finished_at=time.time() - jobs.JOB_TTL - 1)
+        assert store.get(job.id) is None
+        assert store.get("../../etc/passwd") is None
+
+
+class FakeRepo:
+    def __init__(self, full_name, ready_after=0):
+        self.full_name = full_name
+        self.name = full_name.split("/")[1]
+        self.html_url = f"https://github.com/{full_name}"
+        self.clone_url = self.html_url + ".git"
+        self.default_branch = "main"
+        self.ready_at = time.monotonic() + ready_after
+        self.dispatched = False
+
+    def _check(self):
+        if time.monotonic() < self.ready_at:
+            raise GithubException(404, {"message": "Not Found"}, None)
+
+    def create_fork(self, organization=None):
+        return FakeRepo(f"{organization}/forkMonkey", ready_after=FakeGithub.fork_delay)
+
+    def get_branch(self, name):
+        self._check()
+        return name
+
+    def get_workflow(self, name):
+        self._check()
+        repo = self
+        return type("Workflow", (), {"create_dispatch": lambda _, ref: setattr(repo, "dispatched", True)})()
+
+    def edit(self, name):
+        self.name = name
+
+
+class FakeGithub:
+    fork_delay = 0.3
+
+    def __init__(self):
+        self.repos = {}
+
+    def get_repo(self, name):
+        if name not in self.repos:
+            self.repos[name] = FakeRepo(name)
+        return self.repos[name]
+
+
+class TestGitHubService:
+    """Test adoption flows against a fake GitHub"""
+
+    @pytest.fixture
+    def service(self, monkeypatch):
+        service = GitHubService(token="test")
+        fake = FakeGithub()
+        service.github = fake
+        original = FakeRepo.create_fork
+
+        def create_fork(repo, organization=None):
+            fork = original(repo, organization)
+            fake.repos[fork.full_name] = fork
+            return fork
+
+        monkeypatch.setattr(FakeRepo, "create_fork", create_fork)
+        monkeypatch.setattr(service, "validate_username", lambda name: {"valid": True})
+        monkeypatch.setattr(service, "enable_github_actions", lambda name: {"success": True})
+        monkeypatch.setattr(service, "enable_github_pages", lambda name: {"success": True, "pages_url": "p"})
+        monkeypatch.setattr(service, "add_collaborator", lambda *args: {"success": True})
+        return service
+
+    def test_trustless_polls_instead_of_sleeping(self, service):
+        """Test the flow finishes as soon as the fork is ready and reports each step"""
+        steps = []
+        start = time.monotonic()
+        result = service.full_setup_for_trustless("alice", progress=steps.append)
+        elapsed = time.monotonic() - start
+
+        assert result["success"] is True
+        # The old fixed sleeps added up to 18 seconds
+        assert elapsed < 3
+        assert steps == ["validating", "forking", "enabling_actions", "enabling_pages",
+                         "triggering_workflow", "adding_collaborator"]
+        assert service.github.repos["forkZoo/forkMonkey"].dispatched
+        assert result["workflow_triggered"] is True
+
+    def test_workflow_never_ready_skips_dispatch(self, service, monkeypatch):
+        """Test a workflow Actions never registered isn't dispatched and is reported"""
+        monkeypatch.setattr(service.waiter, "workflow", lambda *args: readiness.Readiness("workflow", False, 5.0, 3))
+
+        result = service.full_setup_for_trustless("alice")
+
+        assert result["success"] is True
+        assert result["workflow_triggered"] is False
+        assert "not ready" in result["warning"]
+        assert not service.github.repos["forkZoo/forkMonkey"].dispatched
+
+    def test_fork_never_ready(self, service, monkeypatch):
+        """Test a fork that never becomes readable fails once the deadline passes"""
+        monkeypatch.setattr(FakeGithub, "fork_delay", 60)
+        monkeypatch.setattr(readiness, "READY_TIMEOUT", 0.2)
+
+        result = service.fork_repository()
+        assert result["success"] is False
+        assert "not ready" in result["error"]
+
+    def test_oauth_waits_for_fork(self, service, monkeypatch):
+        """Test the OAuth flow polls the fork and workflow and reports the timings"""
+        monkeypatch.setenv("GITHUB_APP_ID", "1")
+        monkeypatch.setenv("GITHUB_PRIVATE_KEY", "key")
+        installation = service.github
+        installation.get_user = lambda: type("User", (), {"login": "alice"})()
+        monkeypatch.setattr(service, "get_installation_client", lambda *args: installation)
+
+        def create_fork(repo, organization=None):
+            fork = FakeRepo("alice/forkMonkey", ready_after=FakeGithub.fork_delay)
+            fork._requester = type("Requester", (), {"requestJsonAndCheck": lambda *args, **kwargs: None})()
+            fork.get_workflow = lambda name: type("Workflow", (), {
+                "create_dispatch": lambda _, ref, inputs: setattr(fork, "dispatched", True)})()
+            installation.repos[fork.full_name] = fork
+            return fork
+
+        monkeypatch.setattr(FakeRepo, "create_fork", create_fork)
+        result = service.full_setup_for_oauth("42")
+
+        assert result["success"] is True
+        assert installation.repos["alice/forkMonkey"].dispatched
+        assert 0.2 < result["readiness"]["fork"] < 3
+
+
+class TestReadinessWaiter:
+    """Test polling with exponential backoff and a deadline"""
+
+    def make_waiter(self, **kwargs):
+        now = [0.0]
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            now[0] += seconds
+
+        return readiness.ReadinessWaiter(sleep=sleep, clock=lambda: now[0], **kwargs), sleeps
+
+    def test_backs_off_until_ready(self):
+        """Test delays double up to the cap and the elapsed time is recorded"""
+        waiter, sleeps = self.make_waiter(timeout=60, interval=0.5, max_interval=4)
+        answers = iter([GithubException(404, {}, None)] * 5 + [True])
+
+        def check():
+            answer = next(answers)
+            if isinstance(answer, Exception):
+                raise answer
+            return answer
+
+        result = waiter.wait("fork", check)
+        assert result.ready and result.attempts == 6
+        assert sleeps == [0.5, 1, 2, 4, 4]
+        assert result.seconds == 11.5
+
+    def test_gives_up_at_deadline(self):
+        """Test the total wait never exceeds the timeout"""
+        waiter, sleeps = self.make_waiter(timeout=5, interval=1)
+        result = waiter.wait("workflow", lambda: False)
+        assert not result
+        assert sum(sleeps) == 5
+        assert result.seconds == 5
+
+
+class FakeIntegration:
+    def __init__(self, lifetime=3600):
+        self.lifetime = lifetime
+        self.minted = 0
+
+    def get_access_token(self, installation_id):
+        self.minted += 1
+        time.sleep(0.05)
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=self.lifetime)
+        return type("Authorization", (), {"token": f"tok-{self.minted}", "expires_at": expires_at})()
+
+
+class TestClientPool:
+    """Test shared GitHub clients and cached installation tokens"""
+
+    @pytest.fixture
+    def pool(self, monkeypatch):
+        pool = clients.ClientPool(max_clients=2, refresh_margin=300)
+        monkeypatch.setattr(pool, "_new_client", lambda token: object())
+        return pool
+
+    def test_same_token_same_client(self, pool):
+        """Test a token's client is built once and reused"""
+        assert pool.client("a") is pool.client("a")
+        assert pool.client("a") is not pool.client("b")
+        assert pool.stats()["client_misses"] == 2
+
+    def test_least_recently_used_client_is_evicted(self, pool):
+        """Test the pool holds at most max_clients"""
+        first = pool.client("a")
+        pool.client("b")
+        pool.client("a")
+        pool.client("c")
+        assert pool.stats()["clients"] == 2
+        assert pool.client("a") is first
+        assert pool.stats()["client_misses"] == 3
+
+    def test_installation_token_cached_until_near_expiry(self, pool, monkeypatch):
+        """Test tokens are reused while fresh and re-minted inside the margin"""
+        integration = FakeIntegration(lifetime=3600)
+        monkeypatch.setattr(pool, "_integration", lambda *args: integration)
+
+        client = pool.installation_client("1", "key", 42)
+        assert pool.installation_client("1", "key", 42) is client
+        assert integration.minted == 1
+
+        integration.lifetime = 60
+        pool._tokens[("1", 42)] = ("tok-1", time.time() + 60)
+        assert pool.installation_token("1", "key", 42) == "tok-2"
+        assert pool.installation_client("1", "key", 42) is not client
+
+    def test_concurrent_callers_mint_once(self, pool, monkeypatch):
+        """Test simultaneous requests for one installation share a single mint"""
+        integration = FakeIntegration()
+        monkeypatch.setattr(pool, "_integration", lambda *args: integration)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            tokens = list(executor.map(lambda _: pool.installation_token("1", "key", 7), range(8)))
+        assert set(tokens) == {"tok-1"}
+        assert integration.minted == 1
+
+    def test_services_share_the_pool(self):
+        """Test services built with one token reuse one client"""
+        pool = clients.ClientPool()
+        assert GitHubService(token="t", pool=pool).github is GitHubService(token="t", pool=pool).github
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestUsernameCache:
+    """Test cached, coalesced username lookups and the per-IP limiter"""
+
+    def make_cache(self, results, delay=0.0, **kwargs):
+        calls = []
+
+        def lookup(name):
+            calls.append(name)
+            time.sleep(delay)
+            return dict(results[name.lower()])
+
+        clock = FakeClock()
+        cache = usernames.UsernameCache(lookup, ttl=100, negative_ttl=10, clock=clock, **kwargs)
+        return cache, calls, clock
+
+    def test_hits_and_negative_ttl(self):
+        """Test found users are kept for the TTL and missing ones for the shorter negative TTL"""
+        cache, calls, clock = self.make_cache({
+            "alice": {"valid": True, "login": "alice"},
+            "ghost": {"valid": False, "error": "User ghost not found"},
+        })
+        assert cache.get("alice")["login"] == "alice"
+        assert cache.get("Alice")["valid"] is True
+        assert cache.get("ghost")["valid"] is False
+        cache.get("ghost")
+        assert calls == ["alice", "ghost"]
+
+        clock.now = 50
+        cache.get("alice")
+        cache.get("ghost")
+        assert calls == ["alice", "ghost", "ghost"]
+        assert cache.stats()["hits"] == 2 and cache.stats()["negative_hits"] == 1
+
+    def test_retryable_results_are_not_cached(self):
+        """Test rate-limit or outage answers are looked up again next time"""
+        cache, calls, _ = self.make_cache({"bob": {"valid": False, "retryable": True}})
+        cache.get("bob")
+        cache.get("bob")
+        assert calls == ["bob", "bob"]
+
+    def test_least_recently_used_evicted(self):
+        """Test the cache holds at most max_size names"""
+        results = {name: {"valid": True} for name in "abc"}
+        cache, calls, _ = self.make_cache(results, max_size=2)
+        for name in "abac":
+            cache.get(name)
+        cache.get("a")
+        cache.get("b")
+        assert calls == ["a", "b", "c", "b"]
+
+    def test_concurrent_lookups_coalesce(self):
+        """Test simultaneous requests for one name make a single GitHub call"""
+        cache, calls, _ = self.make_cache({"alice": {"valid": True}}, delay=0.1)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: cache.get("alice"), range(8)))
+        assert calls == ["alice"]
+        assert all(result["valid"] for result in results)
+        assert cache.stats()["coalesced"] == 7
+
+    def test_rate_limiter(self):
+        """Test each client gets its burst, then tokens refill at the rate"""
+        clock = FakeClock()
+        limiter = usernames.RateLimiter(rate=2, burst=3, clock=clock)
+        assert [limiter.allow("1.2.3.4")[0] for _ in range(4)] == [True, True, True, False]
+        assert limiter.allow("1.2.3.4")[1] == 0.5
+        assert limiter.allow("5.6.7.8")[0]
+
+        clock.now = 0.5
+        assert limiter.allow("1.2.3.4")[0]
+        assert not limiter.allow("1.2.3.4")[0]
+
+    def test_service_distinguishes_not_found(self):
+        """Test 404s are cached as invalid and other errors are retryable"""
+        service = GitHubService(token="test", pool=clients.ClientPool())
+        errors = {"ghost": UnknownObjectException(404, {}, None), "busy": GithubException(403, {}, None)}
+
+        def get_user(name):
+            raise errors[name]
+
+        service.github = type("Github", (), {"get_user": staticmethod(get_user)})()
+        assert "retryable" not in service.validate_username("ghost")
+        assert service.validate_username("busy")["retryable"] is True
+
+
+class TestApp:
+    """Test the Flask endpoints (skipped without Flask installed)"""
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        pytest.importorskip("flask")
+        pytest.importorskip("flask_cors")
+        monkeypatch.setenv("GITHUB_TOKEN", "test")
+        import app as app_module
+
+        monkeypatch.setattr(app_module.GitHubService, "full_setup_for_trustless",
+                            lambda self, username, customization, progress: {"success": True, "repo_name": username})
+        return app_module.app.test_client()
+
+    def test_trustless_returns_202_and_job(self, client):
+        """Test adoption returns at once with a job whose status can be polled"""
+        response = client.post("/api/adopt/trustless", json={"github_username": "alice"})
+        assert response.status_code == 202
+        job_id = response.get_json()["job_id"]
+        assert response.headers["Location"] == f"/api/adopt/jobs/{job_id}"
+
+        for _ in range(100):
+            status = client.get(f"/api/adopt/jobs/{job_id}").get_json()
+            if status["status"] in jobs.FINISHED:
+                break
+            time.sleep(0.01)
+        assert status["status"] == jobs.SUCCEEDED
+        assert status["result"]["repo_name"] == "alice"
+
+    def test_unknown_job(self, client):
+        """Test unknown job IDs are 404"""
+        assert client.get("/api/adopt/jobs/nope").status_code == 404
+
+    def test_adoption_refused_while_draining(self, client, monkeypatch):
+        """Test a draining worker answers 503 with Retry-After"""
+        import app as app_module
+
+        monkeypatch.setattr(app_module, "jobs", jobs.JobRunner(jobs.MemoryJobStore(), workers=1))
+        app_module.jobs.drain(timeout=0)
+        response = client.post("/api/adopt/trustless", json={"github_username": "alice"})
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "5"
+
+    def test_validate_username_rate_limited(self, client, monkeypatch):
+        """Test a client over its budget gets 429 with Retry-After"""
+        import app as app_module
+
+        monkeypatch.setattr(app_module, "validate_limiter", usernames.RateLimiter(rate=1, burst=2))
+        monkeypatch.setattr(app_module.GitHubService, "validate_username",
+                            lambda self, name: {"valid": True, "login": name})
+        statuses = [client.get("/api/validate/username?username=alice").status_code for _ in range(3)]
+        assert statuses == [200, 200, 429]
+
+    def test_spoofed_forwarded_for_shares_a_bucket(self, client, monkeypatch):
+        """Test varying the client-controlled X-Forwarded-For hops can't dodge the limit"""
+        import app as app_module
+
+        monkeypatch.setattr(app_module, "validate_limiter", usernames.RateLimiter(rate=1, burst=2))
+        monkeypatch.setattr(app_module.GitHubService, "validate_username",
+                            lambda self, name: {"valid": True, "login": name})
+        # The proxy appends the real address after whatever the client sent
+        statuses = [
+            client.get("/api/validate/username?username=alice",
+                       headers={"X-Forwarded-For": f"6.6.6.{i}, 203.0.113.7"}).status_code
+            for i in range(3)
+        ]
+        assert statuses == [200, 200, 429]
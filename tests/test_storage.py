@@ -154,5 +154,43 @@ class TestStreakSystem:
         assert stats["streak"]["best"] >= 1
 
 
+class TestLazyStartup:
+    """Test that startup doesn't pay for modules a command never uses"""
+    
+    def test_cli_import_is_light(self):
+        """Test importing the CLI doesn't pull in PyGithub, pydantic or the AI layer"""
+        import subprocess
+        import sys
+        code = (
+            "import sys; import src.cli; "
+            "print(','.join(m for m in ('github', 'pydantic', 'src.genetics', 'src.evolution', "
+            "'src.visualizer', 'rich.table') if m in sys.modules))"
+        )
+        root = Path(__file__).parent.parent
+        result = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip() == ""
+    
+    def test_github_client_created_on_demand(self, temp_storage, monkeypatch):
+        """Test the GitHub client is only created when first used"""
+        import github
+        created = []
+        
+        class FakeGithub:
+            def __init__(self, token):
+                created.append(token)
+            
+            def get_repo(self, name):
+                return f"repo:{name}"
+        
+        monkeypatch.setattr(github, "Github", FakeGithub)
+        storage = MonkeyStorage(repo_name="me/monkey", github_token="t0ken")
+        assert created == []
+        
+        assert storage.repo == "repo:me/monkey"
+        assert storage.repo == "repo:me/monkey"
+        assert created == ["t0ken"]
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -40,6 +40,17 @@ class TestMonkeyVisualizer:
         assert 'width="100"' in thumbnail
         assert 'height="100"' in thumbnail
     
+    def test_thumbnail_is_simplified(self):
+        """Test thumbnail scales the full canvas and drops effects and badge"""
+        dna = GeneticsEngine.generate_random_dna()
+        full = MonkeyVisualizer.generate_svg(dna)
+        thumbnail = MonkeyVisualizer.generate_thumbnail(dna, size=64)
+        
+        assert 'viewBox="0 0 400 400"' in thumbnail
+        assert "Gen " not in thumbnail
+        assert 'filter="url(#shadow)"' not in thumbnail
+        assert thumbnail.count("<") < full.count("<")
+    
     def test_different_dna_different_svg(self):
         """Test different DNA produces different SVG"""
         dna1 = GeneticsEngine.generate_random_dna()
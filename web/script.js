@@ -153,6 +153,19 @@ const ForkMonkey = {
         return this.getDevMode() ? '/../' : '';
     },
 
+    /**
+     * Image markup for list views: raster thumbnail, then simplified SVG
+     * thumbnail, then the full SVG (older scans), then a placeholder.
+     * Full renders are left to detail views.
+     */
+    monkeyPreview(item, placeholderSize = '1.5rem') {
+        if (item.monkey_thumb_url) {
+            return `<img src="${item.monkey_thumb_url}" alt="${item.owner || ''} monkey" loading="lazy" decoding="async" width="96" height="96">`;
+        }
+        return item.monkey_thumb || item.monkey_svg
+            || `<div style="font-size: ${placeholderSize};">🐵</div>`;
+    },
+
     /**
      * Load all static JSON data files
      */
@@ -742,9 +755,7 @@ const ForkMonkey = {
 
         grid.innerHTML = forks.map(fork => {
             const stats = fork.monkey_stats || {};
-            const svgContent = fork.monkey_svg
-                ? fork.monkey_svg
-                : '<div style="font-size: 3rem;">🐵</div>';
+            const svgContent = this.monkeyPreview(fork, '3rem');
 
             return `
                 <a href="${fork.url}" target="_blank" class="community-card ${fork.is_root ? 'root' : ''}">
@@ -868,9 +879,7 @@ const ForkMonkey = {
         tbody.innerHTML = sortedRankings.map((entry, index) => {
             const rank = index + 1;
             const rankDisplay = this.getRankDisplay(rank);
-            const svgContent = entry.monkey_svg
-                ? entry.monkey_svg
-                : '<div style="font-size: 1.5rem;">🐵</div>';
+            const svgContent = this.monkeyPreview(entry);
 
             // Check if this is the current user's monkey
             const isCurrentUser = currentRepo &&
@@ -1094,9 +1103,7 @@ const ForkMonkey = {
      * Create a tree node element
      */
     createTreeNode(node, type, degree) {
-        const svgContent = node.monkey_svg
-            ? node.monkey_svg
-            : '<div style="font-size: 1.5rem;">🐵</div>';
+        const svgContent = this.monkeyPreview(node);
 
         const degreeClass = degree !== undefined ? `degree-${degree}` : '';
 
@@ -1673,9 +1680,9 @@ https://roeiba.github.io/forkMonkey/
                 })
             });
 
-            const data = await response.json();
+            const data = await this.waitForAdoptionJob(response);
 
-            if (response.ok && data.success) {
+            if (data.success) {
                 this.showTrustlessSuccess(data);
             } else {
                 throw new Error(data.error || 'Failed to create monkey');
@@ -1686,6 +1693,45 @@ https://roeiba.github.io/forkMonkey/
         }
     },
 
+    /**
+     * Follow a 202 adoption job until it finishes, returning the adoption result
+     */
+    async waitForAdoptionJob(response) {
+        const data = await response.json();
+        if (response.status !== 202) {
+            return response.ok ? data : { ...data, success: false };
+        }
+
+        const stepLabels = {
+            validating: 'Checking your GitHub account...',
+            authenticating: 'Connecting to GitHub...',
+            forking: 'Forking your monkey...',
+            enabling_actions: 'Enabling daily evolution...',
+            enabling_pages: 'Setting up your monkey\'s website...',
+            triggering_workflow: 'Waking up your monkey...',
+            adding_collaborator: 'Handing over the keys...'
+        };
+        const loadingText = document.getElementById('wizard-loading-text');
+        let delay = 1000;
+
+        while (true) {
+            await new Promise(resolve => setTimeout(resolve, delay));
+            delay = Math.min(delay * 1.5, 4000);
+
+            const statusResponse = await fetch(`${this.config.apiBaseUrl}/adopt/jobs/${data.job_id}`);
+            const job = await statusResponse.json();
+            if (!statusResponse.ok) {
+                return { success: false, error: job.error };
+            }
+            if (job.step && stepLabels[job.step] && loadingText) {
+                loadingText.textContent = stepLabels[job.step];
+            }
+            if (job.status === 'succeeded' || job.status === 'failed') {
+                return { ...(job.result || {}), success: job.status === 'succeeded', error: job.error };
+            }
+        }
+    },
+
     /**
      * Show trustless adoption success
      */
@@ -1770,9 +1816,9 @@ https://roeiba.github.io/forkMonkey/
                 body: JSON.stringify({ customization })
             });
 
-            const data = await response.json();
+            const data = await this.waitForAdoptionJob(response);
 
-            if (response.ok && data.success) {
+            if (data.success) {
                 this.showOAuthSuccess(data);
             } else {
                 throw new Error(data.error || 'Failed to complete setup');
@@ -2,18 +2,28 @@
 """
 Extended HTTP server for ForkMonkey web interface
 Handles API requests for fork data
+
+Requests are served concurrently (one thread per connection, HTTP/1.1
+keep-alive) so static assets never wait behind a slow /api/forks call;
+the GitHub work itself runs on a small bounded pool.
 """
 
 import http.server
-import socketserver
 import webbrowser
+import io
 import os
+import re
 import sys
 import json
+import hashlib
+import time
+import base64
 import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout, wait
+from functools import partial
 from pathlib import Path
 from urllib.parse import urlparse, parse_qs
-from datetime import datetime, timedelta
+from datetime import timedelta
 
 # Add parent directory to path to allow importing src
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -26,21 +36,437 @@ except ImportError:
     HAS_GITHUB = False
     print("Warning: PyGithub not installed. Community features will be limited.")
 
-PORT = 8000
+PORT = int(os.getenv("PORT", "8000"))
+
+# GitHub calls run on at most API_WORKERS threads; beyond API_QUEUE waiting
+# requests the server answers 503 instead of piling up threads
+API_WORKERS = int(os.getenv("API_WORKERS", "4"))
+API_QUEUE = int(os.getenv("API_QUEUE", "16"))
+API_TIMEOUT = float(os.getenv("API_TIMEOUT", "30"))
+
+# Repos are fetched FETCH_WORKERS at a time; a response returns what finished
+# within FETCH_BUDGET seconds (at most MAX_FORKS forks) plus a `next` cursor
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", "8"))
+FETCH_BUDGET = float(os.getenv("FETCH_BUDGET", "8"))
+MAX_FORKS = int(os.getenv("MAX_FORKS", "100"))
+
+# scan_community.py output, answered from memory unless ?live=1 asks for a crawl
+COMMUNITY_FILE = Path(os.getenv("COMMUNITY_FILE", Path(__file__).parent / "community_data.json"))
+DEFAULT_PAGE_SIZE = 50
+
+# Responses carry content-hash ETags and revalidate with a cheap 304; assets
+# requested as ?v=<their hash> (as rewritten into HTML pages) are cached for a
+# year. NO_CACHE=1 restores the old always-refetch behaviour for development.
+NO_CACHE = os.getenv("NO_CACHE", "").lower() in ("1", "true", "yes")
+REVALIDATE = "no-cache"
+IMMUTABLE = "public, max-age=31536000, immutable"
+ASSET_REF = re.compile(r'(\b(?:href|src)=")([^":?#]+\.(?:css|js|json|png|jpg|svg|webp))(")')
 
-# Cache for fork data to avoid hitting rate limits
-# Structure: { 'repo_name': { 'data': ..., 'timestamp': ... } }
-FORK_CACHE = {}
 CACHE_DURATION = timedelta(minutes=15)
+# After a failed refresh, wait this long (doubling per consecutive failure,
+# up to the cache TTL) before asking GitHub again
+REFRESH_BACKOFF = float(os.getenv("FORK_CACHE_BACKOFF", "30"))
+DEFAULT_REPO = "forkZoo/forkMonkey"
+CACHE_FILE = Path(os.getenv("FORK_CACHE_FILE", Path(__file__).parent.parent / ".fork_cache.json"))
+
+
+class ForkCache:
+    """
+    Stale-while-revalidate cache for fork data, persisted to disk
+
+    A fresh entry is returned as is. A stale one is returned immediately
+    while a single background refresh runs; a missing one is loaded once
+    and shared by every request that asked for it meanwhile. After a failed
+    refresh the key backs off before the next attempt, so a rate-limited
+    GitHub isn't asked again on every request.
+    Structure: { key: { 'data': ..., 'timestamp': epoch seconds } }
+    """
+
+    def __init__(self, ttl=CACHE_DURATION, path=None, backoff=REFRESH_BACKOFF):
+        self.ttl = ttl.total_seconds()
+        self.backoff = backoff
+        self.path = Path(path) if path else None
+        self.entries = {}
+        self.stats = {
+            "hits": 0, "stale_hits": 0, "misses": 0,
+            "refreshes": 0, "refresh_errors": 0, "backoff_skips": 0,
+            "last_refresh_seconds": None, "total_refresh_seconds": 0.0,
+        }
+        self._lock = threading.Lock()
+        self._inflight = {}  # key -> Event set when its refresh finishes
+        self._failures = {}  # key -> (consecutive failures, time of the last one)
+        self._load()
+
+    def _load(self):
+        if not self.path or not self.path.exists():
+            return
+        try:
+            self.entries = json.loads(self.path.read_text())
+            print(f"Loaded {len(self.entries)} cached fork lists from {self.path}")
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable fork cache {self.path}: {e}")
+
+    def _save(self):
+        if not self.path:
+            return
+        with self._lock:
+            snapshot = json.dumps(self.entries)
+        try:
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(snapshot)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"Could not persist fork cache: {e}")
+
+    def get(self, key, loader):
+        """Cached value for `key`, calling `loader()` to (re)build it"""
+        with self._lock:
+            cached = self.entries.get(key)
+            if cached and time.time() - cached['timestamp'] < self.ttl:
+                self.stats["hits"] += 1
+                return cached['data']
+
+            done = self._inflight.get(key)
+            leader = done is None
+            if leader and self._backing_off(key):
+                self.stats["backoff_skips"] += 1
+                if cached:
+                    return cached['data']
+                raise RuntimeError("Fork data unavailable (backing off after a failed refresh)")
+            if leader:
+                done = self._inflight[key] = threading.Event()
+
+            if cached:
+                self.stats["stale_hits"] += 1
+                if leader:
+                    threading.Thread(target=self._refresh, args=(key, loader, done), daemon=True).start()
+                return cached['data']
+            self.stats["misses"] += 1
+
+        if leader:
+            self._refresh(key, loader, done)
+        else:
+            done.wait()
+
+        with self._lock:
+            cached = self.entries.get(key)
+        if cached is None:
+            raise RuntimeError("Fork data unavailable")
+        return cached['data']
+
+    def _backing_off(self, key):
+        """Whether a recent failure means `key` shouldn't be refreshed yet (lock held)"""
+        failures, failed_at = self._failures.get(key, (0, 0.0))
+        if not failures:
+            return False
+        delay = min(self.backoff * 2 ** (failures - 1), self.ttl)
+        return time.time() - failed_at < delay
+
+    def _refresh(self, key, loader, done):
+        start = time.perf_counter()
+        try:
+            data = loader()
+        except Exception as e:
+            print(f"Error refreshing {key}: {e}")
+            with self._lock:
+                self.stats["refresh_errors"] += 1
+                failures = self._failures.get(key, (0, 0.0))[0] + 1
+                self._failures[key] = (failures, time.time())
+        else:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._failures.pop(key, None)
+                self.entries[key] = {'data': data, 'timestamp': time.time()}
+                self.stats["refreshes"] += 1
+                self.stats["last_refresh_seconds"] = round(elapsed, 3)
+                self.stats["total_refresh_seconds"] = round(self.stats["total_refresh_seconds"] + elapsed, 3)
+            self._save()
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            done.set()
+
+    def counters(self):
+        """Snapshot of the hit/miss/refresh counters"""
+        with self._lock:
+            return {**self.stats, "entries": len(self.entries), "refreshing": len(self._inflight)}
+
+
+# Cache for fork data to avoid hitting rate limits
+FORK_CACHE = ForkCache(path=CACHE_FILE)
+
+
+def source_repo():
+    """Repo whose forks are listed (GITHUB_REPOSITORY, or the main repo locally)"""
+    return os.getenv("GITHUB_REPOSITORY") or DEFAULT_REPO
+
+_fetch_pool = None
+_fetch_pool_lock = threading.Lock()
+
+
+def fetch_pool():
+    """Shared pool for per-repo GitHub requests (separate from the API pool waiting on it)"""
+    global _fetch_pool
+    with _fetch_pool_lock:
+        if _fetch_pool is None:
+            _fetch_pool = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="fetch")
+        return _fetch_pool
+
+
+def encode_cursor(page, index):
+    """Opaque continuation token for a position in the fork listing"""
+    return base64.urlsafe_b64encode(f"{page}:{index}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Position (page, index) of a continuation token
+
+    Raises:
+        ValueError: The token is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        page, index = (int(part) for part in raw.split(":"))
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+    if page < 0 or index < 0:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return page, index
+
+
+def content_etag(data):
+    """Strong ETag for a response body"""
+    return '"' + hashlib.blake2b(data, digest_size=8).hexdigest() + '"'
+
+
+class AssetTags:
+    """ETags of static files, recomputed only when a file's mtime or size changes"""
+
+    def __init__(self):
+        self._tags = {}
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        stat = os.stat(path)
+        key = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._tags.get(path)
+        if cached and cached[0] == key:
+            return cached[1]
+        with open(path, 'rb') as f:
+            etag = content_etag(f.read())
+        with self._lock:
+            self._tags[path] = (key, etag)
+        return etag
+
+    def version(self, path):
+        """Short content version for ?v= query strings"""
+        return self.get(path).strip('"')
+
+
+ASSET_TAGS = AssetTags()
+
+
+class CommunityIndex:
+    """
+    In-memory index of the scanner's community_data.json
+
+    Forks are indexed by owner and degree and pre-sorted by score,
+    generation and last update; the file is reloaded when its mtime changes.
+    """
+
+    SORTS = {
+        "score": lambda fork: fork.get("monkey_stats", {}).get("rarity_score", 0),
+        "generation": lambda fork: fork.get("monkey_stats", {}).get("generation", 1),
+        "updated": lambda fork: fork.get("updated_at") or "",
+        "owner": lambda fork: fork.get("owner", "").lower(),
+    }
+
+    def __init__(self, path=COMMUNITY_FILE):
+        self.path = Path(path)
+        self.forks = []
+        self.meta = {}
+        self.by_owner = {}
+        self.by_degree = {}
+        self.orders = {}
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        """Rebuild the index if the file changed since the last load"""
+        try:
+            mtime = self.path.stat().st_mtime_ns
+        except OSError:
+            mtime = None
+        with self._lock:
+            if mtime == self._mtime:
+                return
+            self._mtime = mtime
+            if mtime is None:
+                self.forks, self.meta, self.by_owner, self.by_degree, self.orders = [], {}, {}, {}, {}
+                return
+            try:
+                data = json.loads(self.path.read_text())
+            except (OSError, ValueError) as e:
+                print(f"Could not load {self.path}: {e}")
+                return
+
+            forks = data.get("forks", [])
+            by_owner, by_degree = {}, {}
+            for position, fork in enumerate(forks):
+                by_owner.setdefault(fork.get("owner", "").lower(), []).append(position)
+                by_degree.setdefault(fork.get("degree", 0), []).append(position)
+            orders = {
+                name: sorted(range(len(forks)), key=lambda position: key(forks[position]))
+                for name, key in self.SORTS.items()
+            }
+            self.forks, self.by_owner, self.by_degree, self.orders = forks, by_owner, by_degree, orders
+            self.meta = {k: v for k, v in data.items() if k != "forks"}
+            print(f"Indexed {len(forks)} forks from {self.path}")
+
+    @property
+    def available(self):
+        self._refresh()
+        return self._mtime is not None
+
+    def query(self, owner=None, degree=None, generation=None, min_score=None,
+              sort="score", order="desc", offset=0, limit=DEFAULT_PAGE_SIZE):
+        """
+        Filtered, sorted page of forks
+
+        Raises:
+            ValueError: Unknown sort or order
+        """
+        if sort not in self.SORTS:
+            raise ValueError(f"Unknown sort {sort!r} (use one of {', '.join(self.SORTS)})")
+        if order not in ("asc", "desc"):
+            raise ValueError("order must be 'asc' or 'desc'")
+        self._refresh()
+
+        with self._lock:
+            forks, ranked = self.forks, self.orders.get(sort, [])
+            # Start from the narrowest index, then filter the rest
+            candidates = None
+            if owner is not None:
+                candidates = set(self.by_owner.get(owner.lower(), []))
+            if degree is not None:
+                at_degree = set(self.by_degree.get(degree, []))
+                candidates = at_degree if candidates is None else candidates & at_degree
+            meta = dict(self.meta)
+
+        if order == "desc":
+            ranked = reversed(ranked)
+        matches = []
+        for position in ranked:
+            if candidates is not None and position not in candidates:
+                continue
+            stats = forks[position].get("monkey_stats", {})
+            if generation is not None and stats.get("generation", 1) != generation:
+                continue
+            if min_score is not None and stats.get("rarity_score", 0) < min_score:
+                continue
+            matches.append(forks[position])
+
+        page = matches[offset:offset + limit]
+        next_offset = offset + limit if offset + limit < len(matches) else None
+        return {**meta, "forks": page, "total": len(matches), "offset": offset,
+                "limit": limit, "next_offset": next_offset}
+
+
+COMMUNITY_INDEX = CommunityIndex()
+
+
+class MonkeyHTTPServer(http.server.ThreadingHTTPServer):
+    """Thread-per-connection server with a bounded pool for API work"""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, handler, api_workers=API_WORKERS, api_queue=API_QUEUE):
+        super().__init__(address, handler)
+        self.api_pool = ThreadPoolExecutor(max_workers=api_workers, thread_name_prefix="api")
+        self.api_slots = threading.BoundedSemaphore(api_workers + api_queue)
+
+    def server_close(self):
+        super().server_close()
+        self.api_pool.shutdown(wait=False, cancel_futures=True)
+
 
 class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
+    # Keep connections open between requests (every response sets Content-Length)
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; don't let Nagle hold the body back
+    disable_nagle_algorithm = True
+
+    def parse_request(self):
+        # Caching headers are per response; connections are reused
+        self.etag = None
+        self.cache_control = REVALIDATE
+        return super().parse_request()
+
     def end_headers(self):
         # Add CORS headers for local development
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET')
-        self.send_header('Cache-Control', 'no-store, no-cache, must-revalidate')
+        if NO_CACHE:
+            self.send_header('Cache-Control', 'no-store, no-cache, must-revalidate')
+        else:
+            self.send_header('Cache-Control', self.cache_control)
+            if self.etag:
+                self.send_header('ETag', self.etag)
         super().end_headers()
 
+    def not_modified(self, etag):
+        """True (after sending a 304) when the client already holds `etag`"""
+        header = self.headers.get('If-None-Match')
+        if NO_CACHE or not header:
+            return False
+        tags = [tag.strip().removeprefix('W/') for tag in header.split(',')]
+        if etag not in tags and '*' not in tags:
+            return False
+        self.send_response(304)
+        self.end_headers()
+        return True
+
+    def send_head(self):
+        """Serve files with ETags, 304s, and versioned asset links in HTML pages"""
+        path = self.translate_path(self.path)
+        if NO_CACHE or not os.path.isfile(path):
+            return super().send_head()
+
+        self.etag = ASSET_TAGS.get(path)
+        version = parse_qs(urlparse(self.path).query).get('v', [None])[0]
+        if version == self.etag.strip('"'):
+            self.cache_control = IMMUTABLE
+
+        if path.endswith('.html'):
+            return self.send_html(path)
+        if self.not_modified(self.etag):
+            return None
+        return super().send_head()
+
+    def send_html(self, path):
+        """Send a page with local asset links pinned to their content (?v=<hash>)"""
+        with open(path, encoding='utf-8') as f:
+            html = f.read()
+        base = os.path.dirname(path)
+
+        def pin(match):
+            asset = os.path.join(base, match.group(2))
+            if not os.path.isfile(asset):
+                return match.group(0)
+            return f"{match.group(1)}{match.group(2)}?v={ASSET_TAGS.version(asset)}{match.group(3)}"
+
+        body = ASSET_REF.sub(pin, html).encode('utf-8')
+        self.etag = content_etag(body)
+        if self.not_modified(self.etag):
+            return None
+        self.send_response(200)
+        self.send_header('Content-type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        return io.BytesIO(body)
+
     def do_GET(self):
         # Parse URL
         parsed_url = urlparse(self.path)
@@ -49,40 +475,127 @@ class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
         if parsed_url.path == '/api/forks':
             self.handle_forks_request()
             return
+        if parsed_url.path == '/api/cache':
+            self.send_json(FORK_CACHE.counters())
+            return
             
         # Default behavior (serve files)
         super().do_GET()
 
-    def handle_forks_request(self):
-        """Handle request for all monkey forks"""
-        self.send_response(200)
+    def send_json(self, response, status=200, headers=None):
+        """Send a JSON body with an explicit length so the connection stays reusable"""
+        body = json.dumps(response).encode()
+        if status == 200:
+            self.etag = content_etag(body)
+            if self.not_modified(self.etag):
+                return
+        self.send_response(status)
         self.send_header('Content-type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
         self.end_headers()
-        
-        if not HAS_GITHUB:
-            response = {"error": "GitHub integration unavailable", "forks": []}
-            self.wfile.write(json.dumps(response).encode())
+        self.wfile.write(body)
+
+    def handle_forks_request(self):
+        """Handle request for all monkey forks"""
+        params = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+        if params.get('live') not in (None, '', '0', 'false'):
+            self.handle_live_forks_request(params.get('cursor'))
             return
 
+        try:
+            response = self.index_payload(params)
+        except ValueError as e:
+            self.send_json({"error": str(e), "forks": []}, status=400)
+            return
+        self.send_json(response)
+
+    def index_payload(self, params):
+        """Response body for /api/forks from the scanned community data"""
+        if not COMMUNITY_INDEX.available:
+            return {"warning": f"No scanner output at {COMMUNITY_INDEX.path}; "
+                               "run src/scan_community.py or pass ?live=1", "forks": []}
+
+        def number(name, cast, minimum=None):
+            if params.get(name) in (None, ''):
+                return None
+            try:
+                value = cast(params[name])
+            except ValueError:
+                raise ValueError(f"{name} must be a number")
+            if minimum is not None and value < minimum:
+                raise ValueError(f"{name} must be at least {minimum}")
+            return value
+
+        limit = number('limit', int, 1)
+        return COMMUNITY_INDEX.query(
+            owner=params.get('owner') or None,
+            degree=number('degree', int),
+            generation=number('generation', int),
+            min_score=number('min_score', float),
+            sort=params.get('sort', 'score'),
+            order=params.get('order', 'desc'),
+            offset=number('offset', int, 0) or 0,
+            limit=min(limit or DEFAULT_PAGE_SIZE, MAX_FORKS),
+        )
+
+    def handle_live_forks_request(self, cursor=None):
+        """Crawl GitHub for forks (only when explicitly asked for with ?live=1)"""
+        if cursor:
+            try:
+                decode_cursor(cursor)
+            except ValueError as e:
+                self.send_json({"error": str(e), "forks": []}, status=400)
+                return
+
+        # Without a server pool (e.g. a bare handler in tests) work inline
+        pool = getattr(self.server, "api_pool", None)
+        if pool is None:
+            self.send_json(self.forks_payload(cursor))
+            return
+
+        if not self.server.api_slots.acquire(blocking=False):
+            self.send_json({"error": "Server busy, try again shortly", "forks": []},
+                           status=503, headers={'Retry-After': '1'})
+            return
+
+        try:
+            future = pool.submit(self.forks_payload, cursor)
+        except BaseException:
+            self.server.api_slots.release()
+            raise
+        # The slot is held until the crawl itself ends, not just until this
+        # request gives up on it, so timed-out crawls can't pile up
+        future.add_done_callback(lambda _: self.server.api_slots.release())
+        try:
+            response = future.result(timeout=API_TIMEOUT)
+        except FutureTimeout:
+            self.send_json({"error": "Timed out fetching forks", "forks": []},
+                           status=504)
+            return
+        self.send_json(response)
+
+    def forks_payload(self, cursor=None):
+        """Response body for /api/forks?live=1 (runs on the API pool)"""
+        if not HAS_GITHUB:
+            return {"error": "GitHub integration unavailable", "forks": []}
+
         token = os.getenv("GITHUB_TOKEN")
         if not token:
             # Fallback for local testing without token - return dummy data
-            response = {
+            return {
                 "warning": "No GITHUB_TOKEN set",
-                "forks": self._get_dummy_forks()
+                "forks": self._get_dummy_forks(),
+                "next": None
             }
-            self.wfile.write(json.dumps(response).encode())
-            return
 
         try:
-            # Fetch real data (threaded/cached)
-            forks_data = self._fetch_forks_data(token)
-            response = {"forks": forks_data}
-            self.wfile.write(json.dumps(response).encode())
+            # Fetch real data (cached)
+            return self._fetch_forks_data(token, cursor)
         except Exception as e:
             print(f"Error handling forks request: {e}")
-            response = {"error": str(e), "forks": []}
-            self.wfile.write(json.dumps(response).encode())
+            return {"error": str(e), "forks": []}
 
     def _get_dummy_forks(self):
         """Return dummy data for testing without API access"""
@@ -103,75 +616,88 @@ class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
             }
         ]
 
-    def _fetch_forks_data(self, token):
+    def _fetch_forks_data(self, token, cursor=None):
         """Fetch data from GitHub with caching"""
-        global FORK_CACHE
-        
-        # Check cache validity
-        now = datetime.now()
-        cache_key = "all_forks"
-        
-        if cache_key in FORK_CACHE:
-            cached = FORK_CACHE[cache_key]
-            if now - cached['timestamp'] < CACHE_DURATION:
-                print("Using cached fork data")
-                return cached['data']
-        
+        try:
+            # Keyed by repo: the cache file outlives a change of GITHUB_REPOSITORY
+            key = f"forks:{source_repo()}:{cursor or 'start'}"
+            return FORK_CACHE.get(key, lambda: self._crawl_forks(token, cursor))
+        except Exception as e:
+            print(f"Error fetching from GitHub: {e}")
+            return {"forks": [], "next": None}
+
+    def _crawl_forks(self, token, cursor=None):
+        """
+        Fetch the root repo and its forks from GitHub (raises on API errors)
+
+        Repos are fetched concurrently until FETCH_BUDGET runs out. Forks are
+        returned in listing order up to the first one that hadn't finished,
+        whose position becomes the `next` cursor (None once all are listed).
+        The root repo only appears on the first page, so that page waits for
+        it even past the budget.
+        """
+        deadline = time.monotonic() + FETCH_BUDGET
+        page, index = decode_cursor(cursor) if cursor else (0, 0)
+
         # Determine root repo
         g = Github(token)
-        repo_name = os.getenv("GITHUB_REPOSITORY")
+        # Locally, without GITHUB_REPOSITORY, list the main repo's forks
+        repo = g.get_repo(source_repo())
         
-        if not repo_name:
-            # If running locally and not set, try to guess or use default
-            # This is a bit tricky locally, let's assume we want to see forks of THIS repo
-            # or if we are a fork, the parent's forks.
-            # providing a reasonable default for testing:
-            repo_name = "forkZoo/forkMonkey" 
-
-        try:
-            repo = g.get_repo(repo_name)
-            
-            # If we are a fork, find the parent to get siblings
-            if repo.fork and repo.parent:
-                root_repo = repo.parent
-            else:
-                root_repo = repo
-                
-            print(f"Fetching forks for {root_repo.full_name}...")
-            forks = root_repo.get_forks()
-            
-            results = []
+        # If we are a fork, find the parent to get siblings
+        if repo.fork and repo.parent:
+            root_repo = repo.parent
+        else:
+            root_repo = repo
             
-            # Add root repo itself
-            root_data = self._fetch_single_repo_data(root_repo)
-            if root_data:
-                root_data['is_root'] = True
-                results.append(root_data)
-            
-            # Add forks (limit to 15 most recent to avoid timeouts)
-            count = 0
-            for fork in forks.get_page(0): # Process first page only for speed
-                if count >= 15: break
-                
-                # Skip if it's the root (already added)
+        print(f"Fetching forks for {root_repo.full_name}...")
+        forks = root_repo.get_forks()
+        pool = fetch_pool()
+        
+        # The root repo itself leads the first page of results
+        root_job = pool.submit(self._fetch_single_repo_data, root_repo) if cursor is None else None
+        
+        # List forks and start fetching them while there's budget left
+        jobs = []  # (page, index, future)
+        exhausted = False
+        while len(jobs) < MAX_FORKS and time.monotonic() < deadline:
+            listing = forks.get_page(page)
+            if not listing:
+                exhausted = True
+                break
+            for i in range(index, len(listing)):
+                if len(jobs) >= MAX_FORKS:
+                    index = i
+                    break
+                fork = listing[i]
+                # Skip if it's the root (added above)
                 if fork.full_name == root_repo.full_name: continue
-                
-                data = self._fetch_single_repo_data(fork)
-                if data:
-                    results.append(data)
-                    count += 1
-            
-            # Update cache
-            FORK_CACHE[cache_key] = {
-                'data': results,
-                'timestamp': now
-            }
-            
-            return results
-            
-        except Exception as e:
-            print(f"Error fetching from GitHub: {e}")
-            return []
+                jobs.append((page, i, pool.submit(self._fetch_single_repo_data, fork)))
+            else:
+                page, index = page + 1, 0
+        
+        pending = [future for _, _, future in jobs] + ([root_job] if root_job else [])
+        wait(pending, timeout=max(0.0, deadline - time.monotonic()))
+        
+        results = []
+        root_data = root_job.result() if root_job else None
+        if root_data:
+            root_data['is_root'] = True
+            results.append(root_data)
+        
+        next_cursor = None if exhausted else encode_cursor(page, index)
+        for position, (job_page, job_index, future) in enumerate(jobs):
+            if not future.done():
+                # Out of budget: continue from here next time
+                next_cursor = encode_cursor(job_page, job_index)
+                for _, _, unfinished in jobs[position:]:
+                    unfinished.cancel()
+                break
+            data = future.result()
+            if data:
+                results.append(data)
+        
+        return {"forks": results, "next": next_cursor}
 
     def _fetch_single_repo_data(self, repo):
         """Fetch monkey data from a single repo"""
@@ -204,6 +730,14 @@ class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
             print(f"Error processing {repo.full_name}: {e}")
             return None
 
+def make_server(port=PORT, directory=None, handler=MyHTTPRequestHandler,
+                api_workers=API_WORKERS, api_queue=API_QUEUE):
+    """Create the server, serving files from `directory` (default: project root)"""
+    directory = directory or Path(__file__).parent.parent
+    return MonkeyHTTPServer(("", port), partial(handler, directory=str(directory)),
+                            api_workers=api_workers, api_queue=api_queue)
+
+
 def main():
     # Change to project root directory (parent of web/)
     project_root = Path(__file__).parent.parent
@@ -211,9 +745,7 @@ def main():
     
     print(f"Serving from: {project_root}")
     
-    Handler = MyHTTPRequestHandler
-    
-    with socketserver.TCPServer(("", PORT), Handler) as httpd:
+    with make_server(PORT, project_root) as httpd:
         print(f"""
 ╔═══════════════════════════════════════════╗
 ║     🐵 ForkMonkey Web Interface 🐵       ║